@@ -0,0 +1,368 @@
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from cleaning import OTHER_LABEL, OTHER_MIN_COUNT, rare_labels
+from data_loader import (SURVEY_CSV, DEMOGRAPHIC_COLUMNS, CHALLENGE_COLUMNS, EMPLOY_IMPACT_COLUMNS,
+                         EMPLOY_IMPACT_OPTIONS, EMPLOY_IMPACT_OTHER, POLICY_COLUMNS, WELLBEING_COLUMNS, ZIP_COLUMN, file_sha256, load_survey, tail_sha256)
+from multiselect import build_multiselect
+from setops import embed_regions, multiselect_masks, project_regions, region_counts, set_totals
+
+AGGREGATES_PATH = 'aggregates.json'
+
+# Larger surveys are not loaded at once but aggregated in chunks
+IN_MEMORY_MAX_BYTES = int(os.environ.get('AGGREGATE_IN_MEMORY_MAX_BYTES', 512 * 2 ** 20))
+
+# Bump whenever the layout of the artifact changes; older files are then ignored
+AGGREGATES_VERSION = 11
+
+COUNTED_COLUMNS = DEMOGRAPHIC_COLUMNS + CHALLENGE_COLUMNS + POLICY_COLUMNS + WELLBEING_COLUMNS
+
+# Columns the charts can be split by in the group comparison mode
+GROUP_COLUMNS = ['p36_community', 'p_agerange', 'p41_gender1', 'p38_race1']
+
+# The two Chapter 3 Venn diagrams share freelance work and industry shutdown,
+# and differ in their first set
+VENN_SETS = {
+    'furloughed': ['furloughed', 'freelanceworkcanceled', 'industryshutdown'],
+    'laidofforfired': ['laidofforfired', 'freelanceworkcanceled', 'industryshutdown'],
+}
+
+
+def count_values(series):
+    # Same ordering as Series.value_counts(), without the empty categories
+    counts = series.value_counts()
+    counts = counts[counts > 0]
+    return {'labels': [str(label) for label in counts.index], 'counts': [int(c) for c in counts.values]}
+
+
+def employ_impact_options(df):
+    # The answer codes found in the slots, most frequent first, any other answer
+    # counted as EMPLOY_IMPACT_OTHER
+    answers = pd.concat([df[column].astype(object) for column in EMPLOY_IMPACT_COLUMNS]).dropna().astype(str)
+    answers = answers.where(answers.isin(EMPLOY_IMPACT_OPTIONS), EMPLOY_IMPACT_OTHER)
+    return [str(option) for option in answers.value_counts().index]
+
+
+def employ_impact_masks(df, options):
+    return multiselect_masks(df, EMPLOY_IMPACT_COLUMNS, options, other=EMPLOY_IMPACT_OTHER)
+
+
+def employ_impact_regions(df):
+    # The exact region histogram over the answers found in the slots, from which
+    # any Venn or UpSet view is derived
+    options = employ_impact_options(df)
+    masks = employ_impact_masks(df, options)
+    return {'options': options, 'regions': region_counts(masks, len(options)).tolist()}
+
+
+def venn_regions(aggregates, sets):
+    # An option nobody picked maps to a bit that is never set, i.e. an empty set
+    options = aggregates['employ_impact']['options']
+    keep = [options.index(s) if s in options else len(options) for s in sets]
+    return project_regions(np.array(aggregates['employ_impact']['regions']), keep)
+
+
+def multiselect_aggregates(questions):
+    result = {}
+    for name, question in questions.items():
+        result[name] = {
+            'options': question.options,
+            'totals': question.totals().tolist(),
+            'cooccurrence': question.cooccurrence().values.tolist(),
+        }
+    return result
+
+
+def crosstab(group_codes, answer_codes, n_groups, n_answers):
+    # groups x answers counts from one bincount over the combined codes.
+    # answer_codes has a row of respondent codes per column; a code of -1 (no
+    # answer, or a respondent left out) is not counted.
+    members = np.flatnonzero(group_codes >= 0)
+    answers = answer_codes[:, members]
+    keys = group_codes[members].astype(np.int64) * n_answers + answers
+    return np.bincount(keys[answers >= 0], minlength=n_groups * n_answers).reshape(n_groups, n_answers)
+
+
+def _by_frequency(totals):
+    # Indices of the non-zero totals, largest first
+    order = np.argsort(-totals, kind='stable')
+    return order[totals[order] > 0]
+
+
+def group_counts(df, rows=None, questions=None, groups=GROUP_COLUMNS, columns=COUNTED_COLUMNS):
+    # For each grouping column, group x answer counts of every counted column and
+    # group x option totals of every multi-select question. The answer codes of
+    # all columns share one code space, so a grouping is a single crosstab pass
+    # instead of a value_counts per group per chart. rows optionally restricts
+    # the counts to a boolean mask of respondents.
+    categories = [df[column].cat.categories for column in columns]
+    offsets = np.cumsum([0] + [len(labels) for labels in categories])
+    # the codes are int8 for a column with few answers, so they are widened
+    # before the offsets of the later columns (past 127) are added
+    answers = np.stack([np.where(codes >= 0, codes + offset, -1) for codes, offset in
+                        zip((df[column].cat.codes.to_numpy().astype(np.int64) for column in columns), offsets)])
+    questions = build_multiselect(df) if questions is None else questions
+
+    result = {}
+    for group in groups:
+        if group not in df:
+            continue
+        group_codes = df[group].cat.codes.to_numpy()
+        if rows is not None:
+            group_codes = np.where(rows, group_codes, -1)
+        n_groups = len(df[group].cat.categories)
+        sizes = np.bincount(group_codes[group_codes >= 0], minlength=n_groups)
+        kept = _by_frequency(sizes)
+        counts = crosstab(group_codes, answers, n_groups, offsets[-1])[kept]
+
+        value_tables = {}
+        for column, labels, start, end in zip(columns, categories, offsets[:-1], offsets[1:]):
+            block = counts[:, start:end]
+            order = _by_frequency(block.sum(axis=0))
+            value_tables[column] = {'labels': [str(labels[i]) for i in order], 'counts': block[:, order].tolist()}
+        option_tables = {}
+        for name, question in questions.items():
+            block = question.group_totals(group_codes, n_groups)[kept]
+            order = _by_frequency(block.sum(axis=0))
+            option_tables[name] = {'options': [question.options[i] for i in order], 'counts': block[:, order].tolist()}
+
+        result[group] = {
+            'groups': [str(df[group].cat.categories[i]) for i in kept],
+            'sizes': sizes[kept].tolist(),
+            'value_counts': value_tables,
+            'multiselect': option_tables,
+        }
+    return result
+
+
+def compute_aggregates(df):
+    # Duplicate labels (e.g. 'Prefer not to answer ' in p14_carryingdebt) are
+    # already merged by the cleaning stage in load_survey()
+    counts = {column: count_values(df[column]) for column in COUNTED_COLUMNS}
+    # ZIP codes feed only the point map, so they get counts but no comparison
+    # tables or filter bitmaps
+    if ZIP_COLUMN in df:
+        counts[ZIP_COLUMN] = count_values(df[ZIP_COLUMN])
+    questions = build_multiselect(df)
+
+    return {
+        'version': AGGREGATES_VERSION,
+        'rows': len(df),
+        'value_counts': counts,
+        'employ_impact': employ_impact_regions(df),
+        'multiselect': multiselect_aggregates(questions),
+        'by_group': group_counts(df, questions=questions),
+    }
+
+
+# Every part of the aggregates is a count, so the aggregates of two batches of
+# rows merge into the aggregates of both (used for appended survey waves)
+
+def merge_counts(a, b):
+    totals = dict(zip(a['labels'], a['counts']))
+    for label, count in zip(b['labels'], b['counts']):
+        totals[label] = totals.get(label, 0) + count
+    ordered = sorted(totals.items(), key=lambda item: -item[1])
+    return {'labels': [label for label, _ in ordered], 'counts': [count for _, count in ordered]}
+
+
+def _frequency_order(options, totals):
+    # Most frequent first, like the options of a fresh computation
+    return sorted(range(len(options)), key=lambda i: -totals[i])
+
+
+def merge_regions(a, b):
+    options = list(dict.fromkeys(a['options'] + b['options']))
+    regions = sum(embed_regions(np.array(part['regions']), [options.index(o) for o in part['options']], len(options))
+                  for part in (a, b))
+    order = _frequency_order(options, set_totals(regions))
+    regions = embed_regions(regions, [order.index(i) for i in range(len(options))], len(options))
+    return {'options': [options[i] for i in order], 'regions': regions.tolist()}
+
+
+def merge_multiselect(a, b):
+    options = list(dict.fromkeys(a['options'] + b['options']))
+    totals = np.zeros(len(options), dtype=np.int64)
+    cooccurrence = np.zeros((len(options), len(options)), dtype=np.int64)
+    for part in (a, b):
+        index = [options.index(o) for o in part['options']]
+        totals[index] += part['totals']
+        cooccurrence[np.ix_(index, index)] += np.array(part['cooccurrence'], dtype=np.int64).reshape(len(index), len(index))
+    order = _frequency_order(options, totals)
+    return {
+        'options': [options[i] for i in order],
+        'totals': totals[order].tolist(),
+        'cooccurrence': cooccurrence[np.ix_(order, order)].tolist(),
+    }
+
+
+def merge_table(groups, a_groups, a, b_groups, b, key):
+    # Sums two group x answer tables ({key: [...], 'counts': [[...]]}), each over
+    # its own groups, into one over `groups` and the union of their answers
+    labels = list(dict.fromkeys(a[key] + b[key]))
+    counts = np.zeros((len(groups), len(labels)), dtype=np.int64)
+    for part_groups, part in ((a_groups, a), (b_groups, b)):
+        if part[key]:
+            index = np.ix_([groups.index(g) for g in part_groups], [labels.index(label) for label in part[key]])
+            counts[index] += np.array(part['counts'], dtype=np.int64)
+    order = _by_frequency(counts.sum(axis=0))
+    return {key: [labels[i] for i in order], 'counts': counts[:, order].tolist()}
+
+
+def merge_group_counts(a, b):
+    empty = {'groups': [], 'sizes': [], 'value_counts': {}, 'multiselect': {}}
+    merged = {}
+    for group in dict.fromkeys([*a, *b]):
+        part_a, part_b = a.get(group, empty), b.get(group, empty)
+        sizes = dict(zip(part_a['groups'], part_a['sizes']))
+        for name, size in zip(part_b['groups'], part_b['sizes']):
+            sizes[name] = sizes.get(name, 0) + size
+        groups = sorted(sizes, key=lambda name: -sizes[name])
+
+        merged[group] = {'groups': groups, 'sizes': [sizes[name] for name in groups]}
+        for section, key in (('value_counts', 'labels'), ('multiselect', 'options')):
+            missing = {key: [], 'counts': []}
+            merged[group][section] = {
+                name: merge_table(groups, part_a['groups'], part_a[section].get(name, missing),
+                                  part_b['groups'], part_b[section].get(name, missing), key)
+                for name in dict.fromkeys([*part_a[section], *part_b[section]])
+            }
+    return merged
+
+
+def merge_aggregates(a, b):
+    counts = dict(a['value_counts'])
+    for column, entry in b['value_counts'].items():
+        counts[column] = merge_counts(counts[column], entry) if column in counts else entry
+    multiselect = dict(a['multiselect'])
+    for name, entry in b['multiselect'].items():
+        multiselect[name] = merge_multiselect(multiselect[name], entry) if name in multiselect else entry
+
+    return {
+        'version': AGGREGATES_VERSION,
+        'rows': a['rows'] + b['rows'],
+        'value_counts': counts,
+        'employ_impact': merge_regions(a['employ_impact'], b['employ_impact']),
+        'multiselect': multiselect,
+        'by_group': merge_group_counts(a['by_group'], b['by_group']),
+    }
+
+
+def source_info(csv_path):
+    stat = os.stat(csv_path)
+    return {
+        'file': os.path.basename(csv_path),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': file_sha256(csv_path),
+        'tail_sha256': tail_sha256(csv_path, stat.st_size),
+        'deltas': [],
+    }
+
+
+def write_aggregates(aggregates, out_path=AGGREGATES_PATH):
+    tmp_path = out_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(aggregates, f, separators=(',', ':'))
+    os.replace(tmp_path, out_path)
+
+
+def aggregate_file(csv_path=SURVEY_CSV, chunk_rows=None):
+    # Surveys over IN_MEMORY_MAX_BYTES, Parquet files, or any survey when
+    # chunk_rows is given, are aggregated a chunk at a time (see chunked.py)
+    if chunk_rows or csv_path.endswith('.parquet') or os.path.getsize(csv_path) > IN_MEMORY_MAX_BYTES:
+        from chunked import CHUNK_ROWS, aggregate_chunks
+        aggregates = aggregate_chunks(csv_path, chunk_rows or CHUNK_ROWS)
+    else:
+        aggregates = compute_aggregates(load_survey(csv_path))
+    aggregates['source'] = source_info(csv_path)
+    return aggregates
+
+
+def build_aggregates(csv_path=SURVEY_CSV, out_path=AGGREGATES_PATH, chunk_rows=None):
+    aggregates = aggregate_file(csv_path, chunk_rows)
+    write_aggregates(aggregates, out_path)
+    return aggregates
+
+
+def load_aggregates(path=AGGREGATES_PATH):
+    # Returns None when the artifact is missing or was written by another version
+    try:
+        with open(path) as f:
+            aggregates = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if aggregates.get('version') != AGGREGATES_VERSION:
+        return None
+    return aggregates
+
+
+def folded_labels(aggregates, column):
+    # The answers of column shown as OTHER_LABEL. Filtered aggregates name them
+    # in 'rare', from the counts of the whole survey, so a filter never changes
+    # which categories a chart has.
+    if 'rare' in aggregates:
+        return set(aggregates['rare'].get(column, ()))
+    entry = aggregates['value_counts'].get(column) if column in OTHER_MIN_COUNT else None
+    return rare_labels(column, entry['labels'], entry['counts']) if entry else set()
+
+
+def fold_label(rare):
+    return lambda label: OTHER_LABEL if label in rare else label
+
+
+def value_counts(aggregates, column, normalize=False):
+    # Rebuilds the Series df[column].value_counts() would have returned, with the
+    # rare answers folded into OTHER_LABEL
+    entry = aggregates['value_counts'][column]
+    counts = pd.Series(entry['counts'], index=pd.Index(entry['labels'], name=column), name='count')
+    rare = folded_labels(aggregates, column)
+    if rare:
+        counts = counts.groupby(counts.index.map(fold_label(rare)), sort=False).sum()
+        counts = counts.sort_values(ascending=False, kind='stable').rename_axis(column)
+    if normalize:
+        return (counts / counts.sum()).rename('proportion')
+    return counts
+
+
+def group_table(aggregates, group, name, normalize=False):
+    # Long frame (Group, Response, Count) of a counted column or multi-select
+    # question split by a grouping column. normalize gives percentages within
+    # each group: of its answers, or of its respondents for a multi-select.
+    entry = aggregates['by_group'][group]
+    table = entry['value_counts'].get(name) or entry['multiselect'][name]
+    labels = table['labels'] if 'labels' in table else table['options']
+    counts = pd.DataFrame(table['counts'], index=pd.Index(entry['groups'], name='Group'),
+                          columns=pd.Index(labels, name='Response'), dtype='int64')
+    rare = folded_labels(aggregates, name)
+    if rare:
+        counts = counts.T.groupby(counts.columns.map(fold_label(rare)), sort=False).sum().T.rename_axis(
+            columns='Response')
+    if normalize:
+        totals = counts.sum(axis=1) if 'labels' in table else pd.Series(entry['sizes'], index=counts.index)
+        counts = counts.div(totals.where(totals > 0), axis=0) * 100
+    return counts.stack().rename('Percentage' if normalize else 'Count').reset_index()
+
+
+def multiselect_totals(aggregates, name):
+    # Option totals for a multi-select question, or None when it was not in the data
+    entry = aggregates['multiselect'].get(name)
+    if entry is None:
+        return None
+    return pd.Series(entry['totals'], index=pd.Index(entry['options'], name=name), name='count')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precompute every chapter aggregate into one file.')
+    parser.add_argument('--csv', default=SURVEY_CSV, help='raw survey CSV, or a Parquet file')
+    parser.add_argument('--out', default=AGGREGATES_PATH, help='where to write the aggregates')
+    parser.add_argument('--chunk-rows', type=int,
+                        help='read the survey this many rows at a time (default: only past IN_MEMORY_MAX_BYTES)')
+    args = parser.parse_args()
+
+    result = build_aggregates(args.csv, args.out, args.chunk_rows)
+    print(f"Wrote {args.out} ({result['rows']} rows, {os.path.getsize(args.out)} bytes)")
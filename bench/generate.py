@@ -0,0 +1,131 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_loader import SURVEY_CSV, EMPLOY_IMPACT_COLUMNS, MULTISELECT_QUESTIONS
+from geo import GAZETTEER_PATH, load_gazetteer
+
+# Synthetic survey files in the layout of gi_and_poa_survey_data.csv, for the
+# benchmarks. Answer shares follow the published figures quoted in the chapters.
+
+SIZES = {'12k': 12_000, '100k': 100_000, '1m': 1_000_000}
+
+# column -> (answers, shares); None is a blank answer
+ANSWERS = {
+    'p38_race1': (['White', 'Black/African-American', 'Hispanic/Latin-American', 'Asian', 'Prefer not to answer',
+                   'Other', 'Arab or Middle Eastern', 'Indigenous American', 'Pacific Islander'],
+                  [.310, .294, .159, .095, .055, .045, .020, .014, .008]),
+    'p41_gender1': (['Woman', 'Man', 'Non-binary', 'Prefer not to answer', 'Other', 'Two-spirit'],
+                    [.421, .414, .116, .027, .016, .006]),
+    'p36_community': (['Urban', 'Suburban', 'Rural'], [.811, .112, .077]),
+    'p_agerange': (['18-24', '25-34', '35-44', '45-54', '55-64', '65+'], [.128, .431, .220, .111, .066, .044]),
+    'p43_lgbtqiap': (['No', 'Yes', 'Prefer not to answer'], [.478, .437, .085]),
+    # includes spellings the cleaning stage merges or folds into 'Other'
+    'p40_language': (['English', 'Spanish', 'Other (please specify)', 'Mandarin', 'Russian', 'Korean', 'Italian',
+                      'Polish', 'Haitian Creole', 'Arabic', 'Bengali', 'english', 'Prefer not to answer', 'Tagalog'],
+                     [.9095, .0448, .0150, .0146, .0030, .0025, .0022, .0020, .0018, .0015, .0012, .0010, .0006, .0003]),
+    'p5_amountofenergy': (['More than enough energy', 'Enough energy', 'Very little energy', 'Some days yes, some days no',
+                           'No energy', None], [.331, .330, .210, .072, .027, .030]),
+    'p6_amountoftime': (['Some days yes, some days no', 'Enough time', 'More than enough time', 'Very little time',
+                         'No time', None], [.385, .236, .185, .161, .015, .018]),
+    'p26_awareofgi': (['No', 'Yes', 'Not sure'], [.695, .250, .055]),
+    'p28_policygroup': (['No', 'Yes'], [.8147, .1853]),
+    'p12_healthinsurance': (['Yes', 'No', 'Prefer not to answer'], [.780, .190, .030]),
+    'p17_stablehousing': (['Yes', 'No', 'Prefer not to answer'], [.610, .350, .040]),
+    'p15_physicalhealth': (['Good', 'Fair', 'Excellent', 'Poor'], [.440, .300, .170, .090]),
+    'p16_mentalhealth': (['Fair', 'Good', 'Poor', 'Excellent'], [.380, .320, .220, .080]),
+    # the trailing-space duplicate is merged by the cleaning stage
+    'p14_carryingdebt': (['Yes', 'No', 'Prefer not to answer', 'Prefer not to answer '], [.680, .270, .035, .015]),
+    'p14b_debtmanageable': (['Somewhat manageable', 'Not manageable', 'Manageable', None], [.380, .250, .170, .200]),
+}
+
+# Heavier weights for the counties with most respondents; the rest share what is left
+COUNTY_WEIGHTS = {
+    'Kings': .21, 'New York': .16, 'Queens': .09, 'Bronx': .04, 'Westchester': .04, 'Erie': .035,
+    'Ulster': .03, 'Monroe': .025, 'Albany': .02, 'Onondaga': .02, 'Suffolk': .02, 'Nassau': .02,
+    'Richmond': .015, 'Dutchess': .015, 'Tompkins': .01, 'Columbia': .01,
+}
+
+# Multi-select questions: option -> share of respondents picking it. Picks are
+# correlated through one hidden factor per respondent, so the overlaps behave
+# like real answers (e.g. canceled freelance work with an industry shutdown).
+OPTIONS = {
+    'employ_impact': {
+        'freelanceworkcanceled': .42, 'laidofforfired': .30, 'industryshutdown': .28, 'reducedhours': .22,
+        'furloughed': .14, 'lostincome': .18, 'other': .05, 'none': .08,
+    },
+    'discipline': {
+        'Visual Arts': .42, 'Music': .33, 'Film': .23, 'Media Arts': .20, 'Design': .18, 'Interdisciplinary Arts': .18,
+        'Theater': .17, 'Literary Arts': .16, 'Craft': .16, 'Dance': .10,
+    },
+    'art_practice_impact': {
+        'I could no longer collaborate safely with others': .63,
+        'My scheduled exhibitions/shows/performances/gigs were canceled': .56,
+        'I was less motivated to pursue my artistic practice': .42,
+        'Canceled travel prevented me from attending my exhibitions/shows/performances/gigs': .35,
+        'I could no longer afford a studio/rehearsal space': .31,
+        'My studio/rehearsal space closed due to the pandemic': .27,
+    },
+}
+SLOTS = {'employ_impact': len(EMPLOY_IMPACT_COLUMNS), 'discipline': 10, 'art_practice_impact': 6}
+
+
+def pick(rng, rows, answers, shares):
+    shares = np.asarray(shares, dtype=float)
+    values = np.array(answers, dtype=object)
+    return values[rng.choice(len(values), size=rows, p=shares / shares.sum())]
+
+
+def county_answers(rng, rows):
+    names = load_gazetteer(os.path.join(ROOT, GAZETTEER_PATH))['county'].tolist()
+    rest = (1 - sum(COUNTY_WEIGHTS.values())) / (len(names) - len(COUNTY_WEIGHTS))
+    return pick(rng, rows, [f'{name} County' for name in names], [COUNTY_WEIGHTS.get(name, rest) for name in names])
+
+
+def slot_answers(rng, rows, options, slots):
+    # Each respondent's picks, written into the first slots in option order
+    labels = np.array(list(options) + [None], dtype=object)
+    factor = rng.uniform(0.5, 1.5, size=(rows, 1))
+    picked = rng.random((rows, len(options))) < np.minimum(np.array(list(options.values())) * factor, 1)
+    order = np.argsort(~picked, axis=1, kind='stable')[:, :slots]
+    filled = np.take_along_axis(picked, order, axis=1)
+    return labels[np.where(filled, order, len(options))]
+
+
+def generate_survey(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = {'response_id': np.arange(1, rows + 1)}
+    for column, (answers, shares) in ANSWERS.items():
+        columns[column] = pick(rng, rows, answers, shares)
+    columns['p34_county'] = county_answers(rng, rows)
+    for name, options in OPTIONS.items():
+        slots = slot_answers(rng, rows, options, SLOTS[name])
+        for i in range(SLOTS[name]):
+            columns[f'{MULTISELECT_QUESTIONS[name]}{i + 1}'] = slots[:, i]
+    # free text the dashboard never reads, which the CSV parser still has to skip
+    columns['p45_comments'] = pick(rng, rows, ['', 'Thank you for this program.', 'More funding for rural artists, please.'],
+                                   [.8, .1, .1])
+    return pd.DataFrame(columns)
+
+
+def write_survey(rows, path=SURVEY_CSV, seed=0):
+    generate_survey(rows, seed).to_csv(path, index=False)
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write a synthetic survey CSV for benchmarking.')
+    parser.add_argument('--rows', default='12k', help=f"row count or one of {', '.join(SIZES)}")
+    parser.add_argument('--out', default=SURVEY_CSV, help='where to write the CSV')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rows = SIZES.get(args.rows) or int(args.rows)
+    write_survey(rows, args.out, args.seed)
+    print(f'Wrote {args.out} ({rows} rows, {os.path.getsize(args.out)} bytes)')
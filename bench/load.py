@@ -0,0 +1,252 @@
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_loader import SURVEY_CSV
+from generate import SIZES
+
+# Starts the dashboard with `streamlit run` and drives N concurrent sessions
+# over Streamlit's websocket protocol, the way browsers do: each session sends
+# rerun requests with its widget values and waits for the script to finish.
+# Reports rerun latency percentiles and the server's CPU and memory for each
+# session count. CPU and RSS are read from /proc, so they need Linux.
+
+# One scripted visit: (widget label, option) to change before each rerun;
+# None is the first page load
+SCRIPT = [
+    None,
+    ('Chapter', '1. Who Are They?'),
+    ('Chapter', '2. Challenges'),
+    ('Chapter', '3. Pandemic'),
+    ('Chapter', '4. Support'),
+    ('Split charts by', 'Community'),
+    ('Chapter', '1. Who Are They?'),
+    ('Split charts by', 'No comparison'),
+    ('Chapter', '5. GI Impact'),
+    ('Chapter', '6. Reflections'),
+    ('Chapter', 'Introduction'),
+]
+
+SAMPLE_SECONDS = 0.25
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+class Session:
+    # One simulated browser tab
+
+    def __init__(self, url):
+        self.url = url
+        self.widgets = {}  # label -> (widget id, options)
+        self.values = {}  # widget id -> option index
+        self.latencies = []
+        self.errors = 0
+
+    async def connect(self):
+        self.connection = await websocket_connect(self.url.replace('http', 'ws', 1) + '/_stcore/stream')
+
+    async def rerun(self):
+        message = BackMsg()
+        message.rerun_script.query_string = ''
+        for widget_id, index in self.values.items():
+            message.rerun_script.widget_states.widgets.append(WidgetState(id=widget_id, int_value=index))
+
+        start = time.perf_counter()
+        await self.connection.write_message(message.SerializeToString(), binary=True)
+        while True:
+            data = await self.connection.read_message()
+            if data is None:
+                raise ConnectionError('the server closed the websocket')
+            reply = ForwardMsg()
+            reply.ParseFromString(data)
+            kind = reply.WhichOneof('type')
+            if kind == 'delta':
+                self.collect(reply.delta)
+            elif kind == 'script_finished':
+                break
+        self.latencies.append(time.perf_counter() - start)
+        if reply.script_finished != ForwardMsg.FINISHED_SUCCESSFULLY:
+            self.errors += 1
+
+    def collect(self, delta):
+        element = delta.new_element
+        kind = element.WhichOneof('type')
+        if kind == 'exception':
+            self.errors += 1
+        elif kind in ('radio', 'selectbox'):
+            widget = getattr(element, kind)
+            self.widgets[widget.label] = (widget.id, list(widget.options))
+
+    def choose(self, label, option):
+        widget_id, options = self.widgets[label]
+        self.values[widget_id] = options.index(option)
+
+    async def run(self, script, think):
+        await self.connect()
+        try:
+            for step in script:
+                if step is not None:
+                    self.choose(*step)
+                await self.rerun()
+                await asyncio.sleep(think)
+        finally:
+            self.connection.close()
+
+
+def read_proc(pid):
+    # (cpu seconds, rss bytes) of a process
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    with open(f'/proc/{pid}/status') as f:
+        rss = next(int(line.split()[1]) * 1024 for line in f if line.startswith('VmRSS:'))
+    return cpu, rss
+
+
+async def sample(pid, samples, stop):
+    while not stop.is_set():
+        samples.append((time.perf_counter(), *read_proc(pid)))
+        await asyncio.sleep(SAMPLE_SECONDS)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+async def load_phase(url, pid, sessions, script, think):
+    samples, stop = [], asyncio.Event()
+    sampler = asyncio.create_task(sample(pid, samples, stop)) if pid else None
+    clients = [Session(url) for _ in range(sessions)]
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(client.run(script, think) for client in clients), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    if sampler:
+        stop.set()
+        await sampler
+        samples.append((time.perf_counter(), *read_proc(pid)))
+
+    latencies = [latency for client in clients for latency in client.latencies]
+    result = {
+        'sessions': sessions,
+        'reruns': len(latencies),
+        'errors': sum(client.errors for client in clients) + sum(isinstance(o, Exception) for o in outcomes),
+        'seconds': round(elapsed, 3),
+    }
+    if latencies:
+        result.update({f'p{q}_ms': round(percentile(latencies, q) * 1000, 1) for q in (50, 90, 99)})
+        result['max_ms'] = round(max(latencies) * 1000, 1)
+    if len(samples) > 1:
+        (t0, cpu0, rss0), (t1, cpu1, _) = samples[0], samples[-1]
+        peak = max(rss for _, _, rss in samples)
+        result['cpu_percent'] = round(100 * (cpu1 - cpu0) / (t1 - t0), 1)
+        result['peak_rss_mb'] = round(peak / 2 ** 20, 1)
+        result['rss_per_session_mb'] = round((peak - rss0) / 2 ** 20 / sessions, 2)
+    return result
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def app_dir(survey):
+    # A working directory that links to the project, with `survey` as the survey CSV
+    workdir = tempfile.mkdtemp(prefix='load-app-')
+    for name in os.listdir(ROOT):
+        if name not in (SURVEY_CSV, 'aggregates.json', '.cache'):
+            os.symlink(os.path.join(ROOT, name), os.path.join(workdir, name))
+    os.symlink(os.path.abspath(survey), os.path.join(workdir, SURVEY_CSV))
+    return workdir
+
+
+def start_server(cwd, port, timeout=120):
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', 'main.py', '--server.headless', 'true',
+         '--server.port', str(port), '--server.fileWatcherType', 'none', '--browser.gatherUsageStats', 'false'],
+        cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'streamlit exited with status {server.returncode}')
+        try:
+            with urllib.request.urlopen(url + '/_stcore/health', timeout=1) as response:
+                if response.status == 200:
+                    return server, url
+        except OSError:
+            time.sleep(0.25)
+    server.terminate()
+    raise RuntimeError(f'streamlit did not answer on {url} within {timeout} seconds')
+
+
+def report(results):
+    columns = ['sessions', 'reruns', 'errors', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms',
+               'cpu_percent', 'peak_rss_mb', 'rss_per_session_mb']
+    print(''.join(f'{column:>{max(len(column), 8) + 2}}' for column in columns))
+    for result in results:
+        print(''.join(f"{result.get(column, '-'):>{max(len(column), 8) + 2}}" for column in columns))
+
+
+async def main(args):
+    workdir = server = None
+    url, pid = args.url, args.pid
+    try:
+        if url is None:
+            if args.size or args.survey:
+                from run import survey_path
+                workdir = app_dir(args.survey or survey_path(args.size))
+            server, url = start_server(workdir or ROOT, free_port())
+            pid = server.pid
+        # one visit first, so the results measure warm caches like a running replica
+        await Session(url).run(SCRIPT, 0)
+
+        results = []
+        for sessions in args.sessions:
+            results.append(await load_phase(url, pid, sessions, SCRIPT * args.rounds, args.think))
+            print(f"{sessions} sessions: p50 {results[-1].get('p50_ms')} ms, p99 {results[-1].get('p99_ms')} ms",
+                  flush=True)
+        return results
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load-test the dashboard with concurrent simulated sessions.')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 5, 10, 25, 50],
+                        help='concurrent session counts to run, one phase each')
+    parser.add_argument('--rounds', type=int, default=1, help='times each session repeats the scripted visit')
+    parser.add_argument('--think', type=float, default=0.0, help='seconds a session waits between interactions')
+    parser.add_argument('--size', choices=list(SIZES), help='serve a synthetic survey of this size (see run.py)')
+    parser.add_argument('--survey', help='serve this survey CSV instead of the one in the project root')
+    parser.add_argument('--url', help='test an already running server instead of starting one')
+    parser.add_argument('--pid', type=int, help="that server's process id, to report its CPU and memory")
+    parser.add_argument('--json', metavar='PATH', help='also write the results here')
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    print()
+    report(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,264 @@
+import argparse
+import json
+import math
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from generate import SIZES, write_survey
+
+# Times every step between the survey CSV and the figure specs the dashboard
+# sends, headlessly, on synthetic surveys of each size, and checks the medians
+# against budgets.json. Exits with status 1 when any step is over its budget.
+
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'budgets.json')
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# --update-budgets writes the measured medians times this
+HEADROOM = 3.0
+
+# A typical sidebar selection for the cross-filter steps
+FILTERS = {'p36_community': ['Urban'], 'p_agerange': ['25-34', '35-44']}
+
+# What main.py imports before any page is shown, then each page it imports on demand
+STARTUP_MODULES = ['streamlit', 'metrics', 'shared']
+PAGE_MODULES = ['intro', 'chapter1', 'chapter2', 'chapter3', 'chapter4', 'chapter5', 'chapter6']
+
+# Packages listed in the import report
+TOP_IMPORTS = 12
+
+
+def survey_path(size):
+    # Generated once per size and reused by later runs
+    path = os.path.join(DATA_DIR, size, 'gi_and_poa_survey_data.csv')
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        print(f'generating {size} survey ...', flush=True)
+        write_survey(SIZES[size], path)
+    return path
+
+
+def data_steps(csv_path):
+    # (name, function) for the data preparation shared by every chapter, in order;
+    # each step gets the result of the previous ones in `state`
+    from aggregates import compute_aggregates
+    from bitmap_index import BitmapIndex
+    from chunked import aggregate_chunks
+    from data_loader import load_survey
+
+    def load_csv(state):
+        # parse and clean, without a sidecar from an earlier repeat
+        shutil.rmtree(state['cache_dir'], ignore_errors=True)
+        return load_survey(csv_path, state['cache_dir'])
+
+    return [
+        ('load_csv', load_csv),
+        ('load_sidecar', lambda state: load_survey(csv_path, state['cache_dir'], memory_map=True)),
+        ('compute_aggregates', lambda state: compute_aggregates(state['load_sidecar'])),
+        # parse, clean and aggregate in chunks, straight from the CSV
+        ('aggregate_chunks', lambda state: aggregate_chunks(csv_path, spill_dir=state['cache_dir'])),
+        ('bitmap_index', lambda state: BitmapIndex.from_frame(state['load_sidecar'])),
+        ('filter', lambda state: state['bitmap_index'].aggregates(
+            state['bitmap_index'].select(FILTERS), like=state['compute_aggregates'], groups=('p_agerange',))),
+    ]
+
+
+def figure_steps():
+    # (name, builder, args) for the figures the chapters draw from the aggregates
+    from chapter1 import county_choropleth, county_maps, demographic_figures, discipline_chart
+    from chapter2 import energy_figure, time_figure
+    from chapter3 import art_impact_chart, upset_chart
+    from chapter4 import policy_charts
+    from data_loader import WELLBEING_COLUMNS
+    from shared import create_altair_bar_chart
+
+    return [
+        ('chapter1.demographics', demographic_figures, ()),
+        ('chapter1.disciplines', discipline_chart, ()),
+        ('chapter1.county_maps', county_maps, ()),
+        ('chapter1.county_maps_server', county_maps, ('server',)),
+        ('chapter1.county_choropleth', county_choropleth, ()),
+        ('chapter2.energy', energy_figure, ()),
+        ('chapter2.time', time_figure, ()),
+        ('chapter3.upset', upset_chart, ()),
+        ('chapter3.art_impact', art_impact_chart, ()),
+        ('chapter4.policy', policy_charts, ()),
+        *[(f'chapter4.{column}', create_altair_bar_chart, (column, column)) for column in WELLBEING_COLUMNS],
+        ('comparison.p34_county', create_altair_bar_chart, ('p34_county', 'County', 'p36_community', True)),
+        ('comparison.discipline', create_altair_bar_chart, ('discipline', 'Disciplines', 'p_agerange')),
+    ]
+
+
+def venn_step(aggregates):
+    from aggregates import VENN_SETS, venn_regions
+    from setops import venn_subsets
+    from venn import render_venn3
+    return [render_venn3(venn_subsets(venn_regions(aggregates, sets)), sets, ('orange', 'lightgreen', 'royalblue'))
+            for sets in VENN_SETS.values()]
+
+
+def respondent_points(frame, seed=0):
+    # One point per respondent for the hexagon pyramid steps, as ZIP centroids
+    # would give: the centroid of their county, spread by about 10 km
+    from geo import GAZETTEER_PATH, county_key, load_gazetteer
+    gazetteer = load_gazetteer(os.path.join(ROOT, GAZETTEER_PATH))
+    keys = frame['p34_county'].astype(str).map(county_key)
+    known = keys[keys.isin(gazetteer.index)]
+    rng = np.random.default_rng(seed)
+    lat = gazetteer.loc[known, 'latitude'].to_numpy() + rng.normal(0, 0.1, len(known))
+    lon = gazetteer.loc[known, 'longitude'].to_numpy() + rng.normal(0, 0.1, len(known))
+    return lat, lon
+
+
+def import_trace(modules, after=()):
+    # {module: (self, cumulative) seconds} from `python -X importtime` in a fresh
+    # interpreter, for the modules imported by `modules` once `after` is loaded
+    code = ''.join(f'import {module}\n' for module in after)
+    code += "import sys; sys.stderr.write('import time: --- start ---\\n')\n"
+    code += ''.join(f'import {module}\n' for module in modules)
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+    trace = {}
+    lines = process.stderr.split('import time: --- start ---\n', 1)[1].splitlines()
+    for line in lines:
+        fields = line.split('|')
+        if line.startswith('import time:') and len(fields) == 3 and fields[1].strip().isdigit():
+            trace[fields[2].strip()] = (int(fields[0].split(':')[1]) / 1e6, int(fields[1]) / 1e6)
+    return trace
+
+
+def import_steps(repeat):
+    # Seconds to import the startup modules, and each page on top of them; and the
+    # median startup trace, for the report
+    results, traces = {}, []
+    for name, modules, after in [('startup', STARTUP_MODULES, ()),
+                                 *[(module, [module], STARTUP_MODULES) for module in PAGE_MODULES]]:
+        times = []
+        for _ in range(repeat):
+            trace = import_trace(modules, after)
+            times.append(sum(trace[module][1] for module in modules))
+            if name == 'startup':
+                traces.append(trace)
+        results[f'import.{name}'] = statistics.median(times)
+    traces.sort(key=lambda trace: sum(trace[module][1] for module in STARTUP_MODULES))
+    return results, traces[len(traces) // 2]
+
+
+def report_imports(trace, top=TOP_IMPORTS):
+    # The top-level packages behind the startup time, like `python -X importtime`
+    # sorted by cumulative time
+    packages = sorted(((cumulative, name) for name, (_, cumulative) in trace.items() if '.' not in name), reverse=True)
+    print(f"\nstartup imports\n{'package':<32}{'seconds':>10}")
+    for cumulative, name in packages[:top]:
+        print(f'{name:<32}{cumulative:>10.3f}')
+
+
+def timed(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def run_size(size, repeat):
+    from figure_cache import _serialize_all
+
+    results = {}
+    state = {'cache_dir': tempfile.mkdtemp(prefix='bench-cache-')}
+    try:
+        for name, step in data_steps(survey_path(size)):
+            results[name], state[name] = timed(lambda: step(state), repeat)
+    finally:
+        shutil.rmtree(state['cache_dir'], ignore_errors=True)
+
+    from maps import hex_levels, hex_tiles
+    lat, lon = respondent_points(state['load_sidecar'])
+    results['maps.hex_levels'], levels = timed(lambda: hex_levels(lat, lon, np.ones(len(lat))), repeat)
+    results['maps.hex_tiles'], _ = timed(lambda: hex_tiles(levels), repeat)
+
+    # a figure step covers building the chart and serializing it to the JSON spec
+    aggregates = state['compute_aggregates']
+    for name, build, args in figure_steps():
+        results[name], _ = timed(lambda: _serialize_all(build(aggregates, *args)), repeat)
+    results['chapter3.venns'], _ = timed(lambda: venn_step(aggregates), repeat)
+    return results
+
+
+def load_budgets(path=BUDGETS_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def check(heading, results, budgets):
+    # Prints one line per step; returns the steps over budget
+    over = []
+    print(f"\n{heading}\n{'step':<32}{'seconds':>10}{'budget':>10}")
+    for name, seconds in results.items():
+        budget = budgets.get(name)
+        status = '' if budget is None else ('OVER BUDGET' if seconds > budget else 'ok')
+        print(f"{name:<32}{seconds:>10.3f}{'-' if budget is None else f'{budget:.3f}':>10}  {status}")
+        if budget is not None and seconds > budget:
+            over.append(name)
+    return over
+
+
+def with_headroom(seconds):
+    # Rounded up to two significant digits, at least 10 ms
+    seconds = max(seconds * HEADROOM, 0.01)
+    digits = 1 - math.floor(math.log10(seconds))
+    scale = 10 ** -digits
+    # rounded again so the budget file doesn't get the float noise of the product
+    return round(math.ceil(seconds / scale) * scale, digits)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time the dashboard data preparation and figure construction.')
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=list(SIZES), help='survey sizes to run')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per step; the median is reported')
+    parser.add_argument('--budgets', default=BUDGETS_PATH, help='budget file to check against')
+    parser.add_argument('--update-budgets', action='store_true',
+                        help=f'write the measured medians x{HEADROOM:g} as the new budgets for these sizes')
+    parser.add_argument('--skip-imports', action='store_true', help='do not time the module imports')
+    parser.add_argument('--json', metavar='PATH', help='also write the measurements here')
+    args = parser.parse_args()
+
+    # the chapter builders read data files relative to the project root
+    os.chdir(ROOT)
+    budgets = load_budgets(args.budgets)
+    measured, failures = {}, []
+    if not args.skip_imports:
+        # in fresh interpreters, before this one imports the dashboard modules
+        measured['imports'], trace = import_steps(args.repeat)
+        report_imports(trace)
+        failures += [f'imports:{name}' for name in check('imports', measured['imports'], budgets.get('imports', {}))]
+    for size in args.sizes:
+        measured[size] = run_size(size, args.repeat)
+        failures += [f'{size}:{name}' for name in check(f'{size} rows', measured[size], budgets.get(size, {}))]
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(measured, f, indent=2)
+    if args.update_budgets:
+        for size, results in measured.items():
+            budgets[size] = {name: with_headroom(seconds) for name, seconds in results.items()}
+        with open(args.budgets, 'w') as f:
+            json.dump(budgets, f, indent=2)
+            f.write('\n')
+        print(f'\nWrote budgets for {", ".join(measured)} to {args.budgets}')
+    elif failures:
+        print(f'\nFAILED: {len(failures)} step(s) over budget: {", ".join(failures)}')
+        sys.exit(1)
@@ -0,0 +1,146 @@
+import numpy as np
+
+from aggregates import AGGREGATES_VERSION, COUNTED_COLUMNS, employ_impact_masks, employ_impact_options, group_counts
+from cleaning import OTHER_MIN_COUNT, rare_labels
+from data_loader import ZIP_COLUMN
+from multiselect import build_multiselect
+from setops import region_counts
+
+# Set bits per byte value, for counting rows in a packed bitmap
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint16)
+
+
+def popcount(bitmap):
+    return int(POPCOUNT[bitmap].sum())
+
+
+def pack(rows):
+    return np.packbits(np.asarray(rows, dtype=bool))
+
+
+def in_order(values, order):
+    # values sorted as in order, any not found there last
+    ranks = {value: rank for rank, value in enumerate(order)}
+    return sorted(values, key=lambda value: ranks.get(value, len(ranks)))
+
+
+class BitmapIndex:
+    # One packed bitmap (np.packbits, one bit per respondent) for every answer of
+    # every counted column and every option of every multi-select question, so a
+    # filter is a few ORs/ANDs and each count a popcount over len(df) / 8 bytes.
+    # Answers are kept in the order of the unfiltered counts, most common first.
+
+    def __init__(self, rows, bitmaps, employ_options, employ_masks, frame, questions):
+        self.rows = rows
+        self.bitmaps = bitmaps
+        self.employ_options = employ_options
+        self.employ_masks = employ_masks
+        # the group comparison tables are one crosstab pass over the selected rows
+        self.frame = frame
+        self.questions = questions
+        # answers shown as 'Other' are those rare in the whole survey, whatever the filter
+        self.rare = {column: sorted(rare_labels(column, list(bitmaps[column]),
+                                                [popcount(bitmap) for bitmap in bitmaps[column].values()]))
+                     for column in OTHER_MIN_COUNT if column in bitmaps}
+
+    @classmethod
+    def from_frame(cls, df, columns=COUNTED_COLUMNS):
+        bitmaps = {}
+        for column in columns:
+            codes = df[column].cat.codes.to_numpy()
+            counts = np.bincount(codes[codes >= 0], minlength=len(df[column].cat.categories))
+            bitmaps[column] = {str(df[column].cat.categories[code]): pack(codes == code)
+                               for code in np.argsort(-counts, kind='stable') if counts[code] > 0}
+        questions = build_multiselect(df)
+        for name, question in questions.items():
+            matrix = question.matrix.tocsc()
+            bitmaps[name] = {}
+            for j, option in enumerate(question.options):
+                picked = np.zeros(len(df), dtype=bool)
+                picked[matrix.indices[matrix.indptr[j]:matrix.indptr[j + 1]]] = True
+                bitmaps[name][option] = pack(picked)
+
+        # the employment impact histogram needs each respondent's combination, so
+        # those are kept as one small bitmask per respondent instead
+        employ_options = employ_impact_options(df)
+        employ_masks = employ_impact_masks(df, employ_options)
+        return cls(len(df), bitmaps, employ_options, employ_masks, df, questions)
+
+    def values(self, column):
+        return list(self.bitmaps.get(column, ()))
+
+    def all_rows(self):
+        return pack(np.ones(self.rows, dtype=bool))
+
+    def select(self, filters):
+        # filters maps columns to accepted answers: OR within a column, AND across
+        mask = self.all_rows()
+        for column, values in filters.items():
+            matched = np.zeros_like(mask)
+            for value in values:
+                if value in self.bitmaps[column]:
+                    matched |= self.bitmaps[column][value]
+            mask &= matched
+        return mask
+
+    # Filtered counts keep the unfiltered order and zero counts, so every chart
+    # keeps its categories (and colours) in place as the filters change
+
+    def count_values(self, column, mask, labels=None):
+        labels = labels or list(self.bitmaps[column])
+        return {'labels': labels, 'counts': [popcount(self.bitmaps[column][label] & mask) for label in labels]}
+
+    def multiselect_entry(self, name, mask, options=None):
+        options = options or list(self.bitmaps[name])
+        selected = [self.bitmaps[name][option] & mask for option in options]
+        cooccurrence = [[0] * len(options) for _ in options]
+        for i in range(len(options)):
+            for j in range(i, len(options)):
+                cooccurrence[i][j] = cooccurrence[j][i] = popcount(selected[i] & selected[j])
+        return {'options': options, 'totals': [cooccurrence[i][i] for i in range(len(options))],
+                'cooccurrence': cooccurrence}
+
+    def count_codes(self, column, rows):
+        # Counts of a column kept without bitmaps (the ZIP codes, too many answers
+        # for a bitmap each), most frequent first and without zeros, as the map
+        # using them needs no fixed order
+        categories = self.frame[column].cat.categories
+        codes = self.frame[column].cat.codes.to_numpy()
+        counts = np.bincount(codes[rows & (codes >= 0)], minlength=len(categories))
+        order = np.argsort(-counts, kind='stable')
+        order = order[counts[order] > 0]
+        return {'labels': [str(categories[code]) for code in order], 'counts': counts[order].tolist()}
+
+    def order(self, name, like):
+        # Answers in the order of the unfiltered aggregates `like`, which settles
+        # ties the same way the unfiltered charts do
+        if like is None:
+            return None
+        entry = like['value_counts'].get(name) or like['multiselect'].get(name) or {}
+        return in_order(self.bitmaps[name], entry.get('labels') or entry.get('options') or ())
+
+    def aggregates(self, mask, like=None, groups=()):
+        # The aggregates layout of compute_aggregates(), restricted to the rows in
+        # mask, so every chapter can draw a filtered view unchanged. Comparison
+        # tables are only counted for the grouping columns in groups.
+        rows = np.unpackbits(mask, count=self.rows).view(bool)
+        multiselect_names = [name for name in self.bitmaps if name not in COUNTED_COLUMNS]
+        value_counts = {column: self.count_values(column, mask, self.order(column, like))
+                        for column in self.bitmaps if column in COUNTED_COLUMNS}
+        if ZIP_COLUMN in self.frame:
+            value_counts[ZIP_COLUMN] = self.count_codes(ZIP_COLUMN, rows)
+        return {
+            'version': AGGREGATES_VERSION,
+            'rows': popcount(mask),
+            'value_counts': value_counts,
+            'employ_impact': {
+                'options': self.employ_options,
+                'regions': region_counts(self.employ_masks[rows], len(self.employ_options)).tolist(),
+            },
+            'multiselect': {name: self.multiselect_entry(name, mask, self.order(name, like))
+                            for name in multiselect_names},
+            # group_counts() lays out every answer of the survey first, so it is
+            # only called when a comparison is shown
+            'by_group': group_counts(self.frame, rows, self.questions, groups) if groups else {},
+            'rare': self.rare,
+        }
@@ -0,0 +1,444 @@
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+import altair as alt
+import pydeck as pdk
+import streamlit as st
+from pydeck.types import String
+
+from aggregates import multiselect_totals, value_counts
+from data_loader import ZIP_COLUMN
+from figure_cache import cached_figures, show_figure
+from geo import county_locations, zip_locations
+from images import HALF_WIDTH
+from maps import HEXAGON, heat_image, hex_bins, hex_columns, publish_hex_tiles, publish_image, publish_records
+from shapes import publish_choropleth
+from shared import get_aggregates, show_chart, show_image, static_url
+
+# The pies and bars use Plotly's own template: importing streamlit makes its
+# template, whose placeholder colours only its frontend fills in, the default
+pio.templates.default = "plotly"
+
+# 'server' bins the hexagons and draws the heatmap once on the server, so each
+# browser gets only the result; 'client' leaves that to deck.gl in the browser
+MAP_AGGREGATION = os.environ.get('MAP_AGGREGATION', 'client')
+
+# 'choropleth' shows the first county map as county outlines filled by count
+# (see shapes.py) instead of circles at the county centres
+COUNTY_MAP = os.environ.get('COUNTY_MAP', 'circles')
+
+
+def demographic_figures(aggregates):
+    # Ethnicity
+    ethnicity_counts_df = value_counts(aggregates, 'p38_race1')
+    ethnicity_categories = ethnicity_counts_df.index.tolist()
+    ethnicity_counts = ethnicity_counts_df.values.tolist()
+
+    ethnicity_data_list = {
+        'Ethnicity': ethnicity_categories,
+        'Count': ethnicity_counts
+    }
+
+    # Gender
+    gender_counts_df = value_counts(aggregates, 'p41_gender1')
+    gender_labels = gender_counts_df.index.tolist()
+    gender_counts = gender_counts_df.values.tolist()
+
+    gender_data_list = {
+        'Gender': gender_labels,
+        'Count': gender_counts
+    }
+
+    # Community
+    community_counts_df = value_counts(aggregates, 'p36_community')
+    community_labels = community_counts_df.index.tolist()
+    community_counts = community_counts_df.values.tolist()
+
+    community_data_list = {
+        'Community': community_labels,
+        'Count': community_counts
+    }
+
+
+    # Age Range
+    age_range_counts_df = value_counts(aggregates, 'p_agerange')
+    age_range_labels = age_range_counts_df.index.tolist()
+    age_range_counts = age_range_counts_df.values.tolist()
+
+    age_range_data_list = {
+        'Age Range': age_range_labels,
+        'Count': age_range_counts
+    }
+
+
+    # LGBTQIAP
+    lgbtqiap_counts_df = value_counts(aggregates, 'p43_lgbtqiap')
+    lgbtqiap_labels = lgbtqiap_counts_df.index.tolist()
+    lgbtqiap_counts = lgbtqiap_counts_df.values.tolist()
+
+    lgbtqiap_data_list = {
+        'LGBTQIAP': lgbtqiap_labels,
+        'Count': lgbtqiap_counts
+    }
+
+
+    # Language
+    language_counts_df = value_counts(aggregates, 'p40_language')
+    language_labels = language_counts_df.index.tolist()
+    language_counts = language_counts_df.values.tolist()
+
+    language_data_list = {
+        'Language': language_labels,
+        'Count': language_counts
+    }
+
+    language_df = pd.DataFrame(language_data_list)
+
+    fig_1 = px.pie(ethnicity_data_list, names='Ethnicity', values='Count', hole=.4)
+    fig_1.update_layout(width=None, height=500, legend=dict(font=dict(size=10)))
+
+    fig_2 = px.pie(gender_data_list, names='Gender', values='Count', hole=.4)
+    fig_2.update_layout(width=None, height=500, legend=dict(font=dict(size=10)))
+
+    fig_3 = px.pie(community_data_list, names='Community', values='Count', hole=.4)
+    fig_3.update_layout(width=500, height=500, legend=dict(font=dict(size=10)))
+
+    fig_4 = px.pie(age_range_data_list, names='Age Range', values='Count', hole=.4)
+    fig_4.update_layout(width=None, height=500, legend=dict(font=dict(size=10)))
+
+    fig_5 = px.pie(lgbtqiap_data_list, names='LGBTQIAP', values='Count', hole=.4)
+    fig_5.update_layout(width=500, height=500, legend=dict(font=dict(size=10)))
+
+    fig_6 = px.bar(language_df, x='Language', y='Count', text='Count', color_discrete_sequence=["Magenta"])
+    fig_6.update_layout(width=500, height=500, yaxis_type='log', legend=dict(font=dict(size=10)))
+    fig_6.update_xaxes(title_text='', showticklabels=True)
+
+    return {'ethnicity': fig_1, 'gender': fig_2, 'community': fig_3,
+            'age_range': fig_4, 'lgbtqiap': fig_5, 'language': fig_6}
+
+
+def discipline_chart(aggregates):
+    # what type of art
+    discipline_totals = multiselect_totals(aggregates, 'discipline')
+    if discipline_totals is not None:
+        dis_labels = discipline_totals.index.tolist()
+        dis_counts = discipline_totals.values.tolist()
+    else:
+        # published counts, for data files without the discipline columns
+        dis_labels = ['Craft', 'Dance', 'Design', 'Film', 'Literary Arts', 'Media Arts', 'Music', 'Theater', 'Visual Arts', 'Interdisciplinary Arts']
+        dis_counts = [2014, 1206, 2256, 2863, 2084, 2566, 4228, 2179, 5302, 2253]
+    dis_chart_data = pd.DataFrame({'Disciplines': dis_labels, 'Counts': dis_counts})
+
+    return alt.Chart(dis_chart_data).mark_bar().encode(
+            x='Disciplines',
+            y='Counts',
+            tooltip=['Disciplines', 'Counts']
+    )
+
+
+def county_chart_data(aggregates):
+    # County
+    county_counts_df = value_counts(aggregates, 'p34_county')
+    # filtered aggregates keep counties with no matching respondents at zero
+    county_counts_df = county_counts_df[county_counts_df > 0]
+
+    # Counties are joined to the bundled gazetteer by name, so coordinates can never
+    # drift out of line with the counts when a county is missing from the data
+    chart_data = county_locations(county_counts_df).rename(columns={'latitude': 'lat', 'longitude': 'lon'})
+
+    chart_data['log'] = np.log(chart_data['count'])
+    return chart_data
+
+
+def county_decks(chart_data, aggregation='client'):
+    # All three maps load the counties from one shared file (see maps.py)
+    points = static_url(f"maps/{publish_records(chart_data[['lon', 'lat', 'log']])}")
+
+    # Scatterplot proper
+    scatter = pdk.Deck(
+            map_style=None,
+        initial_view_state=pdk.ViewState(
+            latitude=41.730610,
+            longitude=-76,
+            zoom=6,
+            pitch=40,
+        ),
+        layers=[
+            pdk.Layer(
+            'ScatterplotLayer',
+            data=points,
+            opacity=0.2,
+            stroked=True,
+            filled=True,
+            radius_scale=3000,
+            line_width_min_pixels=1,
+            get_position='[lon, lat]',
+            get_radius='log',
+            get_fill_color=[255, 140, 0],
+            get_line_color=[0, 0, 0],
+
+                  ),
+               ],
+            )
+
+    #PyDeck with rising bars
+    if aggregation == 'server':
+        # the HexagonLayer's bins, elevations and colours, drawn as plain columns
+        bins = hex_bins(chart_data['lat'], chart_data['lon'], chart_data['log'], radius=2000)
+        hexagon_layer = pdk.Layer(
+            'ColumnLayer',
+            data=static_url(f"maps/{publish_records(hex_columns(bins, elevation_range=[0, 1000], elevation_scale=200))}"),
+            opacity=0.1,
+            get_position='[lon, lat]',
+            radius=2000,
+            disk_resolution=6,
+            vertices=HEXAGON,
+            get_elevation='elevation',
+            get_fill_color='color',
+            pickable=True,
+            extruded=True,
+        )
+    else:
+        hexagon_layer = pdk.Layer(
+            'HexagonLayer',
+            data=points,
+            opacity=0.1,
+            get_position='[lon, lat]',
+            radius=2000,
+            get_elevation_weight = 'log',
+            elevation_scale=200,
+            elevation_range=[0, 1000],
+            pickable=True,
+            extruded=True,
+        )
+    hexagons = pdk.Deck(
+        map_style=None,
+    initial_view_state=pdk.ViewState(
+        latitude=41.730610,
+        longitude=-76,
+        zoom=5,
+            pitch=50,
+    ),
+    layers=[
+        hexagon_layer,
+        pdk.Layer(
+            'ScatterplotLayer',
+            data=points,
+            get_position='[lon, lat]',
+            get_color='[255, 140, 0, 160]',
+            get_radius = 3000,
+        ),
+    ],
+    )
+
+    # heatmap
+    if aggregation == 'server':
+        # the HeatmapLayer's picture at the initial zoom, as one image
+        image, bounds = heat_image(chart_data['lat'], chart_data['lon'], chart_data['log'], radius_pixels=50, zoom=5,
+                                   threshold=0.9, mean=True)
+        heat_layer = pdk.Layer(
+            'BitmapLayer',
+            image=String(static_url(f'maps/{publish_image(image)}')),
+            bounds=bounds,
+            opacity=1,
+        )
+    else:
+        heat_layer = pdk.Layer(
+            'HeatmapLayer',
+            data=points,
+            opacity=1,
+            get_position='[lon, lat]',
+            threshold=0.9,
+            aggregation=String('MEAN'),
+            get_weight = 'log',
+        )
+    heatmap = pdk.Deck(
+            map_style=None,
+            initial_view_state=pdk.ViewState(
+            latitude=41.730610,
+            longitude=-76,
+            zoom=5,
+            pitch=50,
+        ),
+        layers=[
+        heat_layer,
+    ],
+    )
+
+    return scatter, hexagons, heatmap
+
+
+def county_maps(aggregates, aggregation='client'):
+    return county_decks(county_chart_data(aggregates), aggregation)
+
+
+def county_choropleth(aggregates):
+    # Counties joined to the bundled outlines by FIPS code; the outlines come in
+    # finer detail as the map zooms in, one tile at a time
+    chart_data = county_chart_data(aggregates).dropna(subset=['fips'])
+    fills, borders, tiles = publish_choropleth(chart_data.groupby('fips')['count'].sum())
+    return pdk.Deck(
+        map_style=None,
+        initial_view_state=pdk.ViewState(
+            latitude=42.9,
+            longitude=-75.8,
+            zoom=6,
+        ),
+        layers=[
+            pdk.Layer(
+                'TileLayer',
+                data=static_url(f'maps/{fills}/{{z}}/{{x}}/{{y}}.json'),
+                **tiles,
+                opacity=0.7,
+                stroked=False,
+                get_fill_color='properties.color',
+                pickable=True,
+            ),
+            pdk.Layer(
+                'TileLayer',
+                data=static_url(f'maps/{borders}/{{z}}/{{x}}/{{y}}.json'),
+                **tiles,
+                get_line_color=[255, 255, 255],
+                line_width_min_pixels=1,
+            ),
+        ],
+        tooltip={'text': '{name}: {count} respondents'},
+    )
+
+
+def zip_map(aggregates):
+    # Respondents by ZIP code, binned server-side into hexagons that get finer as
+    # the map zooms in; the browser loads only the tiles in view (see maps.py)
+    points = zip_locations(value_counts(aggregates, ZIP_COLUMN))
+    layers = []
+    if len(points):
+        directory, tiles = publish_hex_tiles(points['latitude'], points['longitude'], points['count'])
+        layers.append(pdk.Layer(
+            'TileLayer',
+            data=static_url(f'maps/{directory}/{{z}}/{{x}}/{{y}}.json'),
+            **tiles,
+            opacity=0.6,
+            stroked=False,
+            get_fill_color='properties.color',
+            pickable=True,
+        ))
+    return pdk.Deck(
+        map_style=None,
+        initial_view_state=pdk.ViewState(
+            latitude=41.730610,
+            longitude=-76,
+            zoom=6,
+        ),
+        layers=layers,
+        tooltip={'text': '{count} respondents'},
+    )
+
+
+def chapter1():
+    with st.container():
+        st.write("\n")
+        st.title("Chapter 1: The Artists of New York - Who Are They?")
+        st.markdown('<span style="font-size:18px; font-style: italic; font-family: \'Times New Roman\', Times, serif;"> Let\'s dive a bit deeper into the demographics of our artists. </span>', unsafe_allow_html=True)
+
+    aggregates = get_aggregates()
+    figures = cached_figures(demographic_figures, aggregates)
+
+    with st.container():
+
+        col_1, col_2 = st.columns([1, 1], gap="large")
+
+        # Ethnicity
+        with col_1:
+            st.markdown('<span style="font-size:30px; font-style: italic; font-family: \'Times New Roman\', Times, serif;"> Ethnicity </span>', unsafe_allow_html=True)
+            show_image('ethnicity.jpg', sizes=HALF_WIDTH)
+            st.write("New York's ethnic fabric is diverse, with Whites leading at 31%, showcasing a substantial demographic presence. Close behind, African Americans at 29.4% and Hispanics at 15.9% contribute significantly to the community's diversity. Representations from Indigenous American and Pacific Islander communities are smaller but integral. This snapshot reflects the intricate and varied mosaic of ethnicities, emphasizing the richness of New York's cultural landscape.")
+            show_chart(figures['ethnicity'], 'p38_race1', 'Ethnicity')
+
+        # Age Range
+        with col_2:
+            st.markdown('<span style="font-size:30px; font-style: italic; font-family: \'Times New Roman\', Times, serif;"> Age Range </span>', unsafe_allow_html=True)
+            show_image('age_range.jpg', sizes=HALF_WIDTH)
+            st.write("In New York's demographic tapestry, age diversity is apparent. The 25-34 age range dominates at 43.1%, indicating a substantial community presence. Following closely, the 35-44 age group represents 22%, and the 18-24 age range, at 12.8%, denotes a youthful presence. This concise overview captures the varied age distribution, highlighting the significance of the 25-34 age range in shaping the art community's demographic landscape.")
+            show_chart(figures['age_range'], 'p_agerange', 'Age Range')
+
+
+    with st.container():
+
+        col_1, col_2= st.columns([1, 1], gap="large")
+
+        # Gender
+        with col_1:
+            st.markdown('<span style="font-size:30px; font-style: italic; font-family: \'Times New Roman\', Times, serif;"> Gender </span>', unsafe_allow_html=True)
+            show_image('gender.jpg', sizes=HALF_WIDTH)
+            st.write("Gender diversity in New York's art community is evident, with men representing 41.4%, women at 42.1%, and non-binary individuals making up 11.6%. These statistics underscore a balanced distribution, reflecting an inclusive and varied representation across gender identities. The nearly equal percentages between men and women indicate a harmonious gender presence, while the acknowledgment of non-binary individuals emphasizes a commitment to embracing diverse gender expressions within the vibrant New York art scene.")
+            show_chart(figures['gender'], 'p41_gender1', 'Gender')
+
+        # LGBTQIAP
+        with col_2:
+            st.markdown('<span style="font-size:30px; font-style: italic; font-family: \'Times New Roman\', Times, serif;"> LGBTQIAP+ </span>', unsafe_allow_html=True)
+            show_image('LGBTQIAP.jpg', sizes=HALF_WIDTH)
+            st.write("In the New York art community, LGBTQIAP+ representation is diverse. About 43.7% openly identify, showing a vibrant presence. On the other hand, 47.8% choose not to, reflecting various viewpoints. Some, around 8.49%, prefer not to share, respecting their privacy. This mix highlights the different experiences within the community, creating an inclusive space that respects various perspectives, fostering an inclusive environment that values diverse perspectives on LGBTQIAP+ identity.")
+            show_chart(figures['lgbtqiap'], 'p43_lgbtqiap', 'LGBTQIAP+')
+
+    with st.container():
+
+        col_1, col_2 = st.columns([1, 1], gap="large")
+
+        # Language
+        with col_1:
+            st.markdown('<span style="font-size:30px; font-style: italic; font-family: \'Times New Roman\', Times, serif;"> Language </span>', unsafe_allow_html=True)
+            show_image('language.jpg', sizes=HALF_WIDTH)
+            st.write("New York artists embrace linguistic diversity, with English as the predominant language spoken by 11,552 individuals. Spanish follows with 569 speakers, contributing to the multicultural fabric. Additionally, Mandarin boasts 185 speakers, and 377 artists communicate in other languages. This linguistic panorama underscores the rich tapestry of cultural backgrounds, fostering a vibrant and inclusive environment within the artistic community. Some other spoken languages include Russian, Korean, Italian, Polish, Haitian, Arabic, and Bengali.")
+            show_chart(figures['language'], 'p40_language', 'Language')
+
+        # Community
+        with col_2:
+            st.markdown('<span style="font-size:30px; font-style: italic; font-family: \'Times New Roman\', Times, serif;"> Community </span>', unsafe_allow_html=True)
+            show_image('community.jpg', sizes=HALF_WIDTH)
+            st.write("The majority of New York artists, approximately 81.1%, call urban areas home, illustrating the state's overall development. About 11.2% prefer suburban surroundings, offering a mix of urban and residential features. A smaller, yet notable, fraction of 7.16% originates from rural settings. These statistics unveil the diverse geographic backgrounds of artists, emphasizing the prevalent influence of urban development in shaping the cultural tapestry. This varied residential landscape reflects the dynamic choices artists make, contributing to the rich artistic fabric of New York.")
+            show_chart(figures['community'], 'p36_community', 'Community')
+
+    with st.container():
+
+        st.markdown('<span style="font-size:18px; font-style: italic; font-family: \'Times New Roman\', Times, serif;"> What kind of disciplines do our artists practise? </span>', unsafe_allow_html=True)
+
+        col_1, col_2 = st.columns([1, 1], gap="large")
+
+        with col_1:
+            st.write("New York's vibrant artistic community is a dynamic tapestry of creativity, with visual arts taking the lead at 5302 practitioners, a testament to the city's thriving visual culture. The resonant chords of music echo closely behind, with 4228 artists practising music. 2863 artists are in the Film discipline, entailing storytelling, cinematics, and filmmaking. Meanwhile, the impactful world of media arts finds expression through 2566 dedicated creators. These diverse disciplines collectively shape the city's cultural landscape, reflecting a kaleidoscope of talents. From the visual richness of photography and videography to the rhythmic landscapes of music and the narrative power of film and media arts, New York artists navigate and contribute to an artistic realm that celebrates diversity and innovation.")
+
+        with col_2:
+            show_chart(cached_figures(discipline_chart, aggregates), 'discipline', 'Disciplines')
+
+    # Location
+
+    with st.container():
+        st.write("\n")
+        st.markdown('<span style="font-size:18px; font-style: italic; font-family: \'Times New Roman\', Times, serif;"> Let\'s see where our artists are from. </span>', unsafe_allow_html=True)
+        show_image('county_ny.jpg')
+        st.write("Kings County, harboring major cities like Brooklyn, takes the lead with 4434 artists, a vibrant hub in the competition's dataset. Following closely, New York County with New York City contribute 2837 artists, marking a significant artistic presence. Queens County secures the third spot with 1618 artists. Impressively, 62 New York state counties are represented, showcasing diverse geographic origins. Notably, Schuyler County, Genesee County, Wayne County, and Madison County, primarily suburban and rural, have the least artist representation. The below scatterplot, followed by a deck chart and heatmap, vividly depict the nuanced population distribution of artists across the New York State Counties.")
+
+    scatter, hexagons, heatmap = cached_figures(county_maps, aggregates, MAP_AGGREGATION)
+
+    if COUNTY_MAP == 'choropleth':
+        show_figure(cached_figures(county_choropleth, aggregates), use_container_width=False)
+    else:
+        show_figure(scatter, use_container_width=False)
+
+    with st.container():
+        col_1, col_2= st.columns([1, 1], gap="small")
+
+        with col_1:
+            show_figure(hexagons, use_container_width=False)
+
+        with col_2:
+            show_figure(heatmap, use_container_width=False)
+
+    # ZIP codes, when the survey has them (see data_loader.ZIP_COLUMN)
+    if ZIP_COLUMN in aggregates['value_counts']:
+        with st.container():
+            st.write("Zooming in on the map below splits the hexagons into smaller ones, down to about a mile and a half across, so clusters of artists within each county show up.")
+            show_figure(cached_figures(zip_map, aggregates), use_container_width=False)
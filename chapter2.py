@@ -0,0 +1,112 @@
+import plotly.graph_objects as go
+import streamlit as st
+
+from aggregates import value_counts
+from figure_cache import cached_figures
+from shared import get_aggregates, show_chart, show_image
+
+# Given sizes of the bubbles (radius) and the data to show on hover
+bubble_sizes = [150, 110, 90, 70, 55]  # Radii provided by you
+
+
+def bubble_figure(frequency, bubble_colors, hover_text, legend_name):
+    # Concentric bubbles, one per answer, resting on the bottom of the largest one.
+    # hover_text and legend_name are format strings taking data and legend.
+    frequency_df = frequency.reset_index()
+
+    legend_details = frequency_df[frequency.index.name].values
+    hover_data = frequency_df['count'].values
+
+    bubble_colors = bubble_colors[::-1]
+    # Create a figure
+    fig = go.Figure()
+
+    # The largest bubble's bottom will serve as the reference for 'y' positions of other bubbles
+    reference_bottom = -max(bubble_sizes) / 2
+
+    # Add bubbles to the figure, with the bottom of the largest bubble at y=0
+    for size, data, legend, color in zip(bubble_sizes, hover_data, legend_details, bubble_colors):
+        fig.add_trace(go.Scatter(
+            x=[0],  # Centered on x=0
+            y=[reference_bottom + size / 2],  # Adjust y to make bubbles concentric from the bottom
+            marker=dict(
+                size=[size * 2],  # Multiply by 2 to get diameter
+                sizemode='diameter',
+                color = color
+            ),
+            mode='markers',
+            hoverinfo='text',
+            text=[hover_text.format(data=data, legend=legend)],  # Text to show on hover
+            name=legend_name.format(legend=legend),  # Legend entry
+        ))
+
+    # Update the layout
+    fig.update_layout(
+        template='plotly_white',
+        xaxis=dict(
+            showgrid=False,
+            showticklabels=False,
+            zeroline=False,
+            range=[-max(bubble_sizes), max(bubble_sizes)]  # Set x-axis range to fit the largest bubble
+        ),
+        yaxis=dict(
+            showgrid=False,
+            showticklabels=False,
+            zeroline=False,
+            scaleanchor="x",
+            scaleratio=1,
+            range=[reference_bottom * 2, max(bubble_sizes)]  # Set y-axis range to fit the stack
+        ),
+        margin=dict(l=0, r=0, b=0, t=0)
+    )
+
+    # Hide axis lines
+    fig.update_xaxes(visible=False)
+    fig.update_yaxes(visible=False)
+    return fig
+
+
+def energy_figure(aggregates):
+    return bubble_figure(value_counts(aggregates, 'p5_amountofenergy'),
+                         ['#fff5eb', '#fee6ce', '#fdd0a2', '#fdae6b', '#fd8d3c'],
+                         '{data} people expended {legend} ', 'Energy {legend}')
+
+
+def time_figure(aggregates):
+    return bubble_figure(value_counts(aggregates, 'p6_amountoftime'),
+                         ['#b2ebf2', '#80deea', '#4dd0e1', '#26c6da', '#00bcd4'],
+                         '{data} people spent {legend}', 'time {legend}')
+
+
+def chapter2():
+    with st.container():
+        st.title("Chapter 2: The Challenges They Face")
+        show_image('artist_problem.jpg')
+        st.write("\n")
+
+    aggregates = get_aggregates()
+
+    # --------------------------------------------------------------energy expended------------------------------------------------------------------
+
+    with st.container():
+        col_1,col_2 = st.columns([1,1], gap= "large")
+
+        with col_1:
+           show_chart(cached_figures(energy_figure, aggregates), 'p5_amountofenergy', 'Energy Pulse of Artists')
+
+        with col_2:
+            st.markdown('<span style="font-size:30px; font-style: italic; font-family: \'Times New Roman\', Times, serif;"> Energy Pulse of Artists </span>', unsafe_allow_html=True)
+            st.write("Assessing energy levels among New York artists, the data provides a comprehensive view of the artists' capacity for engaging in their practices. There were 221 artists (2.83%) who reported having no energy, indicating severe barriers to artistic activity. A significant number, 1,685 artists (21.61%), experienced very low energy, highlighting considerable challenges in their creative endeavors. A smaller group, comprising 578 artists (7.41%), had fluctuating energy levels, potentially leading to inconsistent artistic engagement. Positively, 2,654 artists (34.04%) felt they had sufficient energy, suggesting a stable ability to pursue their art. Lastly, the survey revealed that 2,658 artists (34.09%) had more than enough energy, indicating a strong capacity for sustained artistic involvement. These figures underscore the varied energy levels within the artist community, from significant challenges to robust engagement.")
+
+    # --------------------------------------------------------------time expended------------------------------------------------------------------
+
+    with st.container():
+        col_1,col_2 = st.columns([1,1], gap= "large")
+
+        with col_1:
+            st.markdown('<span style="font-size:30px; font-style: italic; font-family: \'Times New Roman\', Times, serif;"> Artists\' Financial Spectrum </span>', unsafe_allow_html=True)
+            st.write("The CRNY survey on New York artists reveals a diverse landscape of time availability for artistic and cultural practices. When the responses are broken down, 206 artists (1.5%) report having no time at all, highlighting a critical barrier in their pursuit of creative work. A significant portion, representing 2,250 individuals (16.4%), faces the challenge of very little time, underscoring a common struggle among artists to balance their craft with other demands. The largest group, with 5,387 respondents (39.2%), experiences fluctuating time availability, indicating a level of unpredictability in their ability to consistently engage in their art. On a more positive note, 3,304 artists (24.0%) have sufficient time, suggesting a stable opportunity for artistic endeavors. Remarkably, 2,603 respondents (18.9%) enjoy more than enough time, placing them in an advantageous position to fully embrace their artistic pursuits. This spectrum of time availability, from severe constraints to ample freedom, paints a vivid picture of the varying conditions under which New York's artists operate.")
+
+        with col_2:
+
+            show_chart(cached_figures(time_figure, aggregates), 'p6_amountoftime', 'Time for Artistic Practice')
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+import altair as alt
+import streamlit as st
+
+from aggregates import VENN_SETS, multiselect_totals, venn_regions
+from figure_cache import cached_figures
+from metrics import span
+from setops import upset_table, venn_subsets
+from shared import get_aggregates, show_chart, show_image
+from venn import render_venn3
+
+impact_labels = {
+    'laidofforfired': 'Laid off or Fired',
+    'furloughed': 'Furloughed',
+    'freelanceworkcanceled': 'Freelance Work Canceled',
+    'industryshutdown': 'Industry Shutdown',
+}
+
+
+# Keyed by the subset counts, so each diagram is drawn once per data version and
+# the PNG is shared by every session
+@st.cache_data
+def venn_image(subsets, set_labels, set_colors):
+    with span('figure.chapter3.venn_image'):
+        return render_venn3(subsets, set_labels, set_colors)
+
+
+def upset_chart(aggregates):
+    # UpSet view of every combination of the employment impact answers
+    impact_options = [impact_labels.get(option, option) for option in aggregates['employ_impact']['options']]
+    upset_data = upset_table(np.array(aggregates['employ_impact']['regions']), impact_options, top=15)
+    upset_data['Intersection'] = upset_data['sets'].str.join(' + ')
+    intersection_order = upset_data['Intersection'].tolist()
+
+    # one dot per (intersection, answer), lit when the answer is part of the intersection
+    upset_matrix = upset_data[['Intersection', 'sets']].merge(pd.DataFrame({'Answer': impact_options}), how='cross')
+    upset_matrix['Member'] = [answer in sets for answer, sets in zip(upset_matrix['Answer'], upset_matrix['sets'])]
+
+    upset_bars = alt.Chart(upset_data.drop(columns='sets')).mark_bar(color='#4c78a8').encode(
+        x=alt.X('Intersection:N', sort=intersection_order, axis=None),
+        y=alt.Y('count:Q', title='Artists'),
+        tooltip=['Intersection:N', alt.Tooltip('count:Q', title='Artists')]
+    ).properties(
+        height=250
+    )
+
+    upset_dots = alt.Chart(upset_matrix.drop(columns='sets')).mark_circle(size=90).encode(
+        x=alt.X('Intersection:N', sort=intersection_order, axis=None),
+        y=alt.Y('Answer:N', title=None, sort=impact_options),
+        color=alt.condition('datum.Member', alt.value('white'), alt.value('#444444')),
+        tooltip=['Intersection:N']
+    )
+
+    return alt.vconcat(upset_bars, upset_dots).resolve_scale(x='shared')
+
+
+def art_impact_chart(aggregates):
+    # art practise impact
+    art_practice_totals = multiselect_totals(aggregates, 'art_practice_impact')
+    if art_practice_totals is not None:
+        ap_labels = art_practice_totals.index.tolist()
+        ap_counts = art_practice_totals.values.tolist()
+    else:
+        # published counts, for data files without the art practice impact columns
+        ap_labels = ['Canceled travel prevented me from attending my exhibitions/shows/performances/gigs',
+                     'I could no longer afford a studio/rehearsal space',
+                     'I was less motivated to pursue my artistic practice',
+                     'My scheduled exhibitions/shows/performances/gigs were canceled',
+                     'My studio/rehearsal space closed due to the pandemic',
+                     'I could no longer collaborate safely with others']
+        ap_counts = [4444, 3918, 5275, 7073, 3437, 7956]
+
+    ap_chart_data = pd.DataFrame({'Impact': ap_labels, 'Count': ap_counts})
+    chart = alt.Chart(ap_chart_data).mark_bar(color='#4c78a8').encode(
+        x=alt.X('Count:Q', title='Count'),
+        y=alt.Y('Impact:O', title=None, sort='-x'),
+        tooltip=['Impact:N', 'Count:Q']
+        ).properties(
+        height=400,
+    )
+
+    # Add text labels on the bars
+    text = chart.mark_text(
+        align='left',
+        baseline='middle',
+        dx=3,  # Nudges text to the right so it doesn't overlap with the bar
+        color='white'
+    ).encode(
+        text=alt.Text('Count:N', format=''),
+        detail='Impact:N',
+
+    )
+
+    # Combine the chart and text
+    return (chart + text).configure_axis(
+        labelFontSize=12,
+        titleFontSize=14
+    ).configure_title(
+        fontSize=16
+    )
+
+
+def chapter3():
+    with st.container():
+        st.title("Chapter 3: The Pandemics Toll")
+        st.write("\n")
+        show_image('pandemic.jpg')
+        st.write("\n")
+        st.write("\n")
+
+    aggregates = get_aggregates()
+
+    # employment impact
+
+    # Exact disjoint region counts for both diagrams, cut from the employment impact
+    # region histogram in aggregates.py
+    venn1_subsets = venn_subsets(venn_regions(aggregates, VENN_SETS['furloughed']))
+    venn2_subsets = venn_subsets(venn_regions(aggregates, VENN_SETS['laidofforfired']))
+
+    with st.container():
+        col_1, col_2, col_3= st.columns([1, 1, 1], gap="large")
+
+        with col_1:
+            st.write("The data starkly illustrates the profound ramifications of the COVID-19 pandemic on artists, encompassing 4,247 individuals. Predominantly, job loss was the prevailing impact, affecting a majority of respondents. Notably, 2,284 artists grappled with the dual hardship of losing their jobs and experiencing canceled freelance work. Moreover, 1,884 faced the complete cessation of their respective industries, exacerbating the economic strain. The data becomes even more poignant with 996 artists enduring the triple blow of furloughs, canceled freelance work, and a total industry shutdown. This collective narrative vividly captures the extensive employment challenges that artists confronted during the pandemic's upheaval.")
+
+        with col_2:
+            st.image(venn_image(venn2_subsets,
+            ('Laid off or Fired', 'Freelance Work Canceled', 'Industry Shutdown'),
+            ('orange', 'lightgreen', 'royalblue')), use_column_width=True)
+
+        with col_3:
+            st.image(venn_image(venn1_subsets,
+            ('Furloughed', 'Freelance Work Canceled', 'Industry Shutdown'),
+            ('skyblue', 'violet', 'grey')), use_column_width=True)
+
+    with st.container():
+        st.markdown('<span style="font-size:20px; font-style: italic; font-family: \'Times New Roman\', Times, serif;"> How the employment impacts combine </span>', unsafe_allow_html=True)
+        show_chart(cached_figures(upset_chart, aggregates), 'employ_impact', 'Employment Impact')
+
+    st.write("\n")
+
+    with st.container():
+        col_1, col_2= st.columns([1, 2], gap="large")
+
+        with col_1:
+            st.write("The relentless grip of the COVID-19 pandemic has reverberated through New York's artistic community, leaving a negative mark on the very fabric of creativity. A staggering 4,444 individuals lament the cancellation of travel, hindering their presence at exhibitions, shows, and performances—a profound disruption to the showcasing of their artistry. For 3,918 artists, the inability to sustain studio or rehearsal spaces became a harsh reality, jeopardizing their creativity. Safety concerns surrounding collaboration echoed in the minds of 7,956 individuals, casting shadows over the vibrant synergy that fuels artistic endeavors. Additionally, the cancellation of 7,073 paid shows and gigs dealt a severe blow to artists reliant on these platforms. The numbers paint a poignant picture of the immense artistic toll, revealing the pandemic's seismic impact on the essence of New York's artistic expression.")
+
+        with col_2:
+            #final_chart
+            show_chart(cached_figures(art_impact_chart, aggregates), 'art_practice_impact', 'Impact on Art Practice')
@@ -0,0 +1,99 @@
+import altair as alt
+import streamlit as st
+
+from aggregates import value_counts
+from figure_cache import cached_figures
+from shared import get_aggregates, show_bar_chart, show_chart, show_image
+
+
+def policy_charts(aggregates):
+    # Public Policy Awareness
+
+    aware_of_gi = value_counts(aggregates, 'p26_awareofgi', normalize=True) * 100
+    policy_group_participation = value_counts(aggregates, 'p28_policygroup', normalize=True) * 100
+
+    aware_of_gi_df = aware_of_gi.reset_index()
+    aware_of_gi_df.columns = ['Category', 'Percentage']
+    policy_group_participation_df = policy_group_participation.reset_index()
+    policy_group_participation_df.columns = ['Category', 'Percentage']
+
+    # Awareness of Guaranteed Income chart
+    chart1 = alt.Chart(aware_of_gi_df).mark_bar().encode(
+        x=alt.X('Category', axis=alt.Axis(labelAngle=0)),
+        y='Percentage',
+        color=alt.Color('Category', legend=alt.Legend(title="Responses"), scale=alt.Scale(scheme='tableau20'))
+    ).properties(
+        width=alt.Step(50)
+    )
+
+    # Participation in Policy/Advocacy Groups chart
+    chart2 = alt.Chart(policy_group_participation_df).mark_bar().encode(
+        x=alt.X('Category', axis=alt.Axis(labelAngle=0)),
+        y='Percentage',
+        color=alt.Color('Category', legend=alt.Legend(title="Responses"), scale=alt.Scale(scheme='tableau20'))
+    ).properties(
+        width=alt.Step(50)
+    )
+
+    return chart1, chart2
+
+
+def chapter4():
+    aggregates = get_aggregates()
+
+    with st.container():
+        st.title("Chapter 4: The Support They Need and Deserve")
+
+        chart1, chart2 = cached_figures(policy_charts, aggregates)
+
+        st.markdown('<span style="font-size:20px; font-style: italic; font-family: \'Times New Roman\', Times, serif;"> Public Policy Awareness among Artists </span>', unsafe_allow_html=True)
+        st.write(" The heart of every successful artistic community is connected to public policy. In New York, where creativity is essential for culture and the economy, it's crucial to know and get involved in policy matters. For artists, dealing with advocacy and laws can be complicated, but knowing about them is the first step in creating a future where art doesn't just mirror society, but helps change it.")
+
+        col1, col2 = st.columns(2)
+
+        # Awareness of Guaranteed Income chart
+        with col1:
+            st.subheader("Artists' Knowledge of Financial Aid Programs")
+            show_chart(chart1, 'p26_awareofgi', "Artists' Knowledge of Financial Aid Programs")
+            st.write("The data here reflects responses to whether artists were aware of concepts like guaranteed income or universal basic income before being introduced to Creatives Rebuild New York. With 25% answering yes, it's clear that there's awareness among some artists. Yet, a significant 70% were not aware, and about 6% were uncertain about these policies. This insight is crucial as it highlights a gap in knowledge that, if addressed, could open doors for many artists to financial resources aimed at sustaining their creative endeavors.")
+        # Participation in Policy/Advocacy Groups chart
+        with col2:
+            st.subheader("Artists' Engagement in Shaping Policy")
+            show_chart(chart2, 'p28_policygroup', "Artists' Engagement in Shaping Policy")
+            st.write("The chart presents a striking reality: only a small fraction of artists are actively involved in groups influencing public policy. With 81.47% not participating in such advocacy groups, it highlights an opportunity for more artists to voice their unique perspectives in forums that shape the legislative landscape. This low engagement rate suggests potential barriers that prevent artists from contributing to policy discussions that can significantly impact their professional and creative lives. Encouraging and facilitating artists' involvement in advocacy could pave the way for more inclusive and representative cultural policies.")
+
+        # Navigating Health, Housing, and Financial Wellbeing
+        st.markdown('<span style="font-size:20px; font-style: italic; font-family: \'Times New Roman\', Times, serif;"> Navigating Health, Housing, and Financial Wellbeing </span>', unsafe_allow_html=True)
+        show_image('health.jpg')
+        st.write("Let's dive into the crucial elements that form the bedrock of an artist's life: their health, housing, and financial stability. These are not mere conveniences, but the foundational pillars that support not only the creation of art but also the overall wellbeing and sustainability of an artist's career. Adequate health insurance, a stable home, a sound body and mind, and financial security are intertwined facets that fuel an artist's potential. Understanding how these elements interact is key to building robust support systems that ensure artists can thrive and contribute to our cultural fabric.")
+        st.write("\n")
+
+        # Health Insurance and Housing Stability
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("### Participants with Health Insurance Coverage")
+            show_bar_chart(aggregates, 'p12_healthinsurance', 'Participants with Health Insurance Coverage')
+        with col2:
+            st.write("### Stability of Housing")
+            show_bar_chart(aggregates, 'p17_stablehousing', 'Stability of Housing')
+
+        st.markdown("---")
+        # Physical and Mental Health Status
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("### Physical Health Status")
+            show_bar_chart(aggregates, 'p15_physicalhealth', 'Physical Health Status')
+        with col2:
+            st.write("### Mental Health Status")
+            show_bar_chart(aggregates, 'p16_mentalhealth', 'Mental Health Status')
+        st.markdown("---")
+
+        # debt and it's management.
+        col1, col2 = st.columns(2)
+        # Participants Carrying Debt
+        with col1:
+            st.write("### Participants Carrying Debt")
+            show_bar_chart(aggregates, 'p14_carryingdebt', 'Participants Carrying Debt')
+        with col2:
+            st.write("### Are they able to manage their debts?")
+            show_bar_chart(aggregates, 'p14b_debtmanageable', 'Debt Management')
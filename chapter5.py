@@ -0,0 +1,28 @@
+import streamlit as st
+
+from shared import QUARTER_WIDTH, show_image
+
+# AEP Image and Text
+# Text for AEP and Guaranteed Income
+text_content = """
+Inspiring Collaboration and Empowerment: The Artist Employment Program by Creatives Rebuild New York vividly comes to life in this illustration, where we see a tapestry of artists immersed in their crafts. From painters to musicians and dancers, these creators are not just engaging in artistic endeavors but are also forming synergistic partnerships with community organizations. Each artist, representing the diversity and vibrancy of New York, is empowered through a substantial salary, echoing the program's commitment to fostering both creative expression and financial stability. This image is a celebration of artistic collaboration, financial support, and the vibrant impact on local communities, encapsulating the essence of AEP's transformative vision.
+
+Empowerment through Unconditional Support: This depiction of the Guaranteed Income for Artists program captures the essence of financial liberation and artistic freedom. Here, we see a kaleidoscope of 2,400 artists from various backgrounds, each engaged in their unique creative process, receiving a symbolic lifeline of $1,000 monthly payments. This initiative by Creatives Rebuild New York transcends traditional grantmaking, providing no-strings-attached support that empowers artists to pursue their passions while meeting basic needs. The image radiates a sense of security and opportunity, highlighting how this groundbreaking program is not just supporting artists financially but also nurturing their creative spirits and enriching the cultural tapestry of New York.
+"""
+
+
+def chapter5():
+    st.title("Chapter 5: The Impact of CRNYs GI Program")
+    st.markdown('<span style="font-size:20px; font-style: italic; font-family: \'Times New Roman\', Times, serif;"> CRNY\'s Melody in the Lives of New York\'s Artists </span>', unsafe_allow_html=True)
+
+    # Define a layout with three columns
+    col1, col2, col3 = st.columns([1, 2, 1], gap="small")
+
+    with col1:
+        show_image('AEP.jpg', sizes=QUARTER_WIDTH, caption='Artist Employment Program by Creatives Rebuild New York')
+
+    with col2:
+        st.write(text_content)
+
+    with col3:
+        show_image('GIA.jpg', sizes=QUARTER_WIDTH, caption='Guaranteed Income for Artists Program by Creatives Rebuild New York')
@@ -0,0 +1,13 @@
+import streamlit as st
+
+from shared import show_image
+
+
+def chapter6():
+    with st.container():
+        st.subheader("Chapter 6: Reflections and Future Pathways")
+        show_image('future.jpg')
+        st.write("\n")
+        st.write("In conclusion, our exploration into New York's artistic community has revealed a multifaceted landscape, rich in diversity and creativity. Creatives Rebuild New York (CRNY) has positively influenced New York’s artistic landscape, enhancing artists’ financial, health, and housing stability. Acknowledging the demographic diversity of applicants, CRNY tailors support to artists of various ages, races, ethnicities, genders, and LGBTQIAP+ identities, recognizing the unique challenges each group faces. However, the COVID-19 pandemic's impact, which led to job losses and financial instability, underscores the need for ongoing and expanded public awareness. Effective outreach is essential to ensure artists are fully aware of the resources available to them. Moving forward, CRNY's continued collaboration with communities will be key in amplifying its initiatives, providing artists not only with the support they need but also the platforms to advocate for sustained change in public policy and social support systems.")
+        st.markdown('<span style="font-size:30px; font-style: italic; font-family: \'Times New Roman\', Times, serif;"> Thank You. </span>', unsafe_allow_html=True)
+        st.markdown('<span style="font-size:15px; font-style: italic; font-family: \'Times New Roman\', Times, serif;"> by Atharv Pramod Jangam, Smit Raichura, Subhadeep Jana </span>', unsafe_allow_html=True)
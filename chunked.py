@@ -0,0 +1,75 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+from aggregates import compute_aggregates, merge_aggregates
+from cleaning import clean_chunk, survey_mappings
+from data_loader import CACHE_DIR, LABEL_FORMATS, is_used_column
+
+# Out-of-core aggregation, for surveys too large to load at once. The survey is
+# read CHUNK_ROWS rows at a time, from a CSV or from a Parquet file's row groups,
+# in two passes:
+# 1. each column's raw answers are counted, so the cleaning stage picks its labels
+#    (spellings of the same answer) from the totals of the whole survey, and the
+#    parsed chunk is spilled to an Arrow file under CACHE_DIR;
+# 2. each spilled chunk is cleaned with those labels and aggregated, and its
+#    aggregates are folded into the running ones with merge_aggregates, since
+#    every part of them (value counts, group crosstabs, Venn region totals,
+#    multi-select co-occurrences) is a count.
+# Memory holds one chunk and the counts, however many rows the file has, and the
+# result is that of compute_aggregates(load_survey(path)) up to the order of
+# answers with equal counts. The spilled chunks (categorical codes, about 30
+# bytes a row) are deleted at the end.
+CHUNK_ROWS = 100_000
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    # The survey's used columns, as frames of categorical answers like
+    # read_survey_csv() returns
+    if path.endswith('.parquet'):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        survey = pq.ParquetFile(path)
+        columns = [column for column in survey.schema_arrow.names if is_used_column(column)]
+        # answers are labels whatever type the file stores them as, as in the CSV
+        schema = pa.schema([(column, pa.string()) for column in columns])
+        for batch in survey.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield pa.Table.from_batches([batch]).cast(schema).to_pandas().astype('category')
+    else:
+        yield from pd.read_csv(path, usecols=is_used_column, dtype='category', chunksize=chunk_rows)
+
+
+def count_answers(df, totals):
+    # Adds the chunk's raw answer counts to totals, {column: {raw answer: count}}
+    for column in df.columns:
+        categories, codes = df[column].cat.categories, df[column].cat.codes.to_numpy()
+        counts = totals.setdefault(column, {})
+        for answer, count in zip(categories, np.bincount(codes[codes >= 0], minlength=len(categories))):
+            if count:
+                counts[answer] = counts.get(answer, 0) + int(count)
+    return totals
+
+
+def aggregate_chunks(path, chunk_rows=CHUNK_ROWS, spill_dir=CACHE_DIR):
+    os.makedirs(spill_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix='chunks-', dir=spill_dir) as chunk_dir:
+        totals, chunk_paths = {}, []
+        for df in read_chunks(path, chunk_rows):
+            count_answers(df, totals)
+            chunk_paths.append(os.path.join(chunk_dir, f'{len(chunk_paths)}.arrow'))
+            feather.write_feather(df, chunk_paths[-1], compression='uncompressed')
+        mappings = survey_mappings(totals, formats=LABEL_FORMATS)
+
+        aggregates = None
+        for chunk_path in chunk_paths:
+            part = compute_aggregates(clean_chunk(feather.read_feather(chunk_path), mappings))
+            aggregates = part if aggregates is None else merge_aggregates(aggregates, part)
+    if aggregates is None:
+        # a survey without rows
+        empty = pd.DataFrame({column: pd.Categorical([]) for column in mappings})
+        aggregates = compute_aggregates(clean_chunk(empty, mappings))
+    return aggregates
@@ -0,0 +1,136 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Bump whenever the rules below change; the survey sidecar is rebuilt on a new version
+CLEANING_VERSION = 4
+
+OTHER_LABEL = 'Other'
+
+# Explicit merges per column, applied after whitespace and case normalization
+LABEL_ALIASES = {
+    'p38_race1': {
+        'Prefer not to answer': 'No answer',
+    },
+    'p41_gender1': {
+        'Prefer not to answer': 'No answer',
+        'Two-spirit': 'Twospirit',
+    },
+    'p40_language': {
+        'Other (please specify)': OTHER_LABEL,
+        'Prefer not to answer': 'No answer',
+    },
+}
+
+# Answers picked by fewer respondents than this are shown as OTHER_LABEL. They
+# keep their own label in the cleaned data and in the aggregates, whose counts
+# then add up across survey waves, and are folded when read (see rare_labels())
+OTHER_MIN_COUNT = {
+    'p40_language': 10,
+}
+
+
+def normalize_label(label):
+    # 'Prefer not to answer ' and 'Prefer  not to answer' -> 'Prefer not to answer'
+    return ' '.join(str(label).split())
+
+
+def zip5(label):
+    # '12345-6789', '12345.0' and ' 12345' -> '12345'; '6390' (a leading zero lost
+    # to a spreadsheet) -> '06390'; anything else is dropped
+    match = re.fullmatch(r'\s*(\d{4,5})(?:-\d{4}|\.0+)?\s*', str(label))
+    return match.group(1).zfill(5) if match else ''
+
+
+def rare_labels(column, labels, counts):
+    # The labels of column shown as OTHER_LABEL, given their counts in the whole survey
+    min_count = OTHER_MIN_COUNT.get(column)
+    if not min_count:
+        return set()
+    return {label for label, count in zip(labels, counts) if count < min_count and label != OTHER_LABEL}
+
+
+def label_mapping(categories, counts, aliases=None, normalize=normalize_label, known=()):
+    # Maps every raw category to its cleaned label (None drops it). Labels that
+    # differ only in case are merged under the spelling most respondents used.
+    labels = [normalize(category) for category in categories]
+
+    # alias targets, OTHER_LABEL and the labels in known (e.g. already shown for
+    # earlier survey waves) keep their own spelling
+    aliases = {key.casefold(): target for key, target in (aliases or {}).items()}
+    spelling = {label.casefold(): label for label in [OTHER_LABEL, *aliases.values()]}
+    for label in known:
+        spelling.setdefault(label.casefold(), label)
+    for label, count in sorted(zip(labels, counts), key=lambda item: -item[1]):
+        spelling.setdefault(label.casefold(), label)
+
+    mapping = []
+    for label in labels:
+        key = label.casefold()
+        target = aliases.get(key, label)
+        mapping.append(spelling.get(target.casefold(), target) if label else None)
+    return mapping
+
+
+def relabel(series, mapping, categories=None):
+    # Replaces each category of the categorical `series` by its label in mapping
+    # (aligned with the categories; None drops the answer). categories fixes the
+    # cleaned categories and their order, by default the labels in mapping order.
+    # Works on the categorical codes, so no per-row string handling is needed.
+    if categories is None:
+        categories = list(dict.fromkeys(label for label in mapping if label is not None))
+    index = {label: i for i, label in enumerate(categories)}
+    lookup = np.array([index[label] if label is not None else -1 for label in mapping] + [-1])
+    codes = lookup[series.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories),
+                     index=series.index, name=series.name)
+
+
+def clean_column(series, aliases=None, normalize=normalize_label, known=()):
+    series = series.astype('category')
+    counts = np.bincount(series.cat.codes[series.cat.codes >= 0], minlength=len(series.cat.categories))
+    return relabel(series, label_mapping(series.cat.categories, counts, aliases, normalize, known))
+
+
+def clean_survey(df, formats=None, known_labels=None):
+    # One pass over every column: whitespace/case normalization for all answers,
+    # plus the per-column aliases above. formats maps columns to a normalization
+    # used instead of normalize_label (e.g. zip5). known_labels maps columns to
+    # spellings that win over the frame's own, so a batch of appended rows is
+    # labelled like the data it is merged into. Returns a new frame.
+    formats = formats or {}
+    known_labels = known_labels or {}
+    return pd.DataFrame({
+        column: clean_column(df[column], LABEL_ALIASES.get(column), formats.get(column, normalize_label),
+                             known_labels.get(column, ()))
+        for column in df.columns
+    })
+
+
+def survey_mappings(answer_counts, formats=None):
+    # {column: {raw answer: cleaned label or None}} from each column's raw answer
+    # counts over the whole survey ({column: {raw answer: count}}): the labels
+    # clean_survey() gives a frame holding every row at once, for cleaning the
+    # survey a chunk of rows at a time (see chunked.py) with clean_chunk()
+    formats = formats or {}
+    mappings = {}
+    for column, counts in answer_counts.items():
+        # in the order read_csv gives the categories, which breaks spelling ties
+        answers = sorted(counts)
+        mapping = label_mapping(answers, [counts[answer] for answer in answers], LABEL_ALIASES.get(column),
+                                formats.get(column, normalize_label))
+        mappings[column] = dict(zip(answers, mapping))
+    return mappings
+
+
+def clean_chunk(df, mappings):
+    # Like clean_survey(), with the labels of survey_mappings(); every chunk gets
+    # the same categories, in the same order
+    result = {}
+    for column in df.columns:
+        series = df[column].astype('category')
+        mapping = mappings[column]
+        categories = list(dict.fromkeys(label for label in mapping.values() if label is not None))
+        result[column] = relabel(series, [mapping.get(answer) for answer in series.cat.categories], categories)
+    return pd.DataFrame(result)
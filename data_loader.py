@@ -0,0 +1,239 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from cleaning import CLEANING_VERSION, OTHER_LABEL, clean_survey, zip5
+
+SURVEY_CSV = 'gi_and_poa_survey_data.csv'
+CACHE_DIR = '.cache'
+
+# Bump when the sidecar layout changes so old sidecars get rebuilt
+SIDECAR_VERSION = 1
+
+# Columns the dashboard chapters actually read
+DEMOGRAPHIC_COLUMNS = ['p38_race1', 'p41_gender1', 'p36_community', 'p_agerange',
+                       'p43_lgbtqiap', 'p40_language', 'p34_county']
+CHALLENGE_COLUMNS = ['p5_amountofenergy', 'p6_amountoftime']
+EMPLOY_IMPACT_COLUMNS = [f'p30_employimpact{i}' for i in range(1, 9)]
+# The answer codes of the employment impact question, as cleaned (its 'other' is
+# spelled OTHER_LABEL); any other answer found in its slots is counted as
+# EMPLOY_IMPACT_OTHER, so the Venn sets stay this few
+EMPLOY_IMPACT_OTHER = OTHER_LABEL
+EMPLOY_IMPACT_OPTIONS = ['freelanceworkcanceled', 'laidofforfired', 'industryshutdown', 'reducedhours',
+                         'furloughed', 'lostincome', EMPLOY_IMPACT_OTHER, 'none']
+POLICY_COLUMNS = ['p26_awareofgi', 'p28_policygroup']
+WELLBEING_COLUMNS = ['p12_healthinsurance', 'p17_stablehousing', 'p15_physicalhealth',
+                     'p16_mentalhealth', 'p14_carryingdebt', 'p14b_debtmanageable']
+
+# Respondents' ZIP codes, for the point-level map in chapter 1. Surveys without
+# the column have no point map; SURVEY_ZIP_COLUMN names a different column.
+ZIP_COLUMN = os.environ.get('SURVEY_ZIP_COLUMN', 'p35_zipcode')
+
+USED_COLUMNS = (DEMOGRAPHIC_COLUMNS + CHALLENGE_COLUMNS + EMPLOY_IMPACT_COLUMNS
+                + POLICY_COLUMNS + WELLBEING_COLUMNS + [ZIP_COLUMN])
+
+# Columns whose answers are reduced to a canonical form by the cleaning stage
+LABEL_FORMATS = {ZIP_COLUMN: zip5}
+
+# Multi-select questions are stored as numbered slot columns (prefix1, prefix2, ...);
+# a question whose slots are not in the file is simply skipped
+MULTISELECT_QUESTIONS = {
+    'employ_impact': 'p30_employimpact',
+    'discipline': 'p_discipline',
+    'art_practice_impact': 'p_artpracticeimpact',
+}
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def tail_sha256(path, end, length=1 << 16):
+    # Hash of the bytes just before `end`; cheap evidence that a file was only
+    # appended to since `end` bytes of it were read
+    with open(path, 'rb') as f:
+        f.seek(max(0, end - length))
+        return hashlib.sha256(f.read(end - max(0, end - length))).hexdigest()
+
+
+def sidecar_paths(csv_path, cache_dir=CACHE_DIR):
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    base = os.path.join(cache_dir, stem)
+    return base + '.arrow', base + '.json'
+
+
+def slot_columns(columns, prefix):
+    pattern = re.compile(re.escape(prefix) + r'\d+$')
+    return sorted((c for c in columns if pattern.match(c)), key=lambda c: int(c[len(prefix):]))
+
+
+def is_used_column(column):
+    return column in USED_COLUMNS or any(slot_columns([column], prefix) for prefix in MULTISELECT_QUESTIONS.values())
+
+
+def read_survey_csv(csv_path=SURVEY_CSV):
+    # Every used column is a survey answer, so they are all read as categoricals
+    return pd.read_csv(csv_path, usecols=is_used_column, dtype='category')
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = meta_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, meta_path)
+
+
+def _sidecar_is_fresh(meta, stat, csv_path, meta_path):
+    if meta is None or meta.get('version') != SIDECAR_VERSION:
+        return False
+    if meta.get('columns') != USED_COLUMNS or meta.get('multiselect') != MULTISELECT_QUESTIONS:
+        return False
+    if meta.get('cleaning') != CLEANING_VERSION:
+        return False
+    if meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size:
+        return True
+    # mtime moved (e.g. a fresh checkout); only rebuild if the content changed
+    if meta.get('size') == stat.st_size and meta.get('sha256') == file_sha256(csv_path):
+        meta['mtime_ns'] = stat.st_mtime_ns
+        _write_meta(meta_path, meta)
+        return True
+    return False
+
+
+def load_survey(csv_path=SURVEY_CSV, cache_dir=CACHE_DIR, memory_map=False):
+    # Loads the pruned, cleaned survey columns (see cleaning.py), going through an
+    # Arrow sidecar that is rebuilt whenever the source CSV or the cleaning rules
+    # change (checked by mtime, then sha256), so cleaning runs once per version.
+    # With memory_map the sidecar is mapped instead of read into the heap, so
+    # worker processes on one host decode it from the same page-cache pages.
+    arrow_path, meta_path = sidecar_paths(csv_path, cache_dir)
+    stat = os.stat(csv_path)
+
+    if os.path.exists(arrow_path) and _sidecar_is_fresh(_read_meta(meta_path), stat, csv_path, meta_path):
+        return feather.read_feather(arrow_path, memory_map=memory_map)
+
+    df = clean_survey(read_survey_csv(csv_path), formats=LABEL_FORMATS)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = arrow_path + '.tmp'
+    feather.write_feather(df, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, arrow_path)
+    _write_meta(meta_path, {
+        'version': SIDECAR_VERSION,
+        'source': os.path.basename(csv_path),
+        'columns': USED_COLUMNS,
+        'multiselect': MULTISELECT_QUESTIONS,
+        'cleaning': CLEANING_VERSION,
+        'rows': len(df),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': file_sha256(csv_path),
+        'arrow_version': pa.__version__,
+    })
+    return df
+
+
+def _reject(*args, **kwargs):
+    raise TypeError('the shared survey frame is read-only; work on a .copy() instead')
+
+
+def _inplace_guard(method):
+    @functools.wraps(method)
+    def guarded(self, *args, **kwargs):
+        if kwargs.get('inplace'):
+            _reject()
+        return method(self, *args, **kwargs)
+    return guarded
+
+
+def _guard_inplace_methods(cls):
+    # Wraps every pandas method taking inplace= so that inplace=True raises
+    base = cls.__mro__[1]
+    for name in dir(base):
+        method = getattr(base, name, None)
+        if name.startswith('_') or not inspect.isfunction(method):
+            continue
+        try:
+            if 'inplace' in inspect.signature(method).parameters:
+                setattr(cls, name, _inplace_guard(method))
+        except (TypeError, ValueError):
+            pass
+    return cls
+
+
+@_guard_inplace_methods
+class ReadOnlySeries(pd.Series):
+    # A column taken straight from a ReadOnlyFrame; results computed from it are
+    # ordinary Series
+
+    @property
+    def _constructor(self):
+        return pd.Series
+
+    __setitem__ = __delitem__ = _update_inplace = _reject
+
+
+@_guard_inplace_methods
+class ReadOnlyFrame(pd.DataFrame):
+    # The survey frame shared by every session. Column assignment, deletion and
+    # inplace=True methods raise, and the column arrays are flagged read-only so
+    # .loc/.iloc writes raise too. Its columns are ReadOnlySeries; anything
+    # derived from it (filters, groupbys, rows, reductions, .copy()) is an
+    # ordinary, writable DataFrame or Series.
+
+    _frozen = False
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    __setitem__ = __delitem__ = insert = pop = isetitem = _update_inplace = _reject
+
+    def _box_col_values(self, values, loc):
+        # what df[column], df.column and df.items() return
+        column = ReadOnlySeries._from_mgr(values, axes=values.axes)
+        column._name = self.columns[loc]
+        return column.__finalize__(self)
+
+    def _set_axis(self, axis, labels):
+        if self._frozen:
+            _reject()
+        super()._set_axis(axis, labels)
+
+    def __setattr__(self, name, value):
+        if self._frozen and not name.startswith('_'):
+            _reject()
+        super().__setattr__(name, value)
+
+
+def _freeze_array(values):
+    for array in (getattr(values, 'codes', None), getattr(values, '_ndarray', None), values):
+        if isinstance(array, np.ndarray):
+            array.flags.writeable = False
+
+
+def freeze_frame(df):
+    frame = ReadOnlyFrame(df, copy=False)
+    for i in range(frame.shape[1]):
+        _freeze_array(frame.iloc[:, i].array)
+    frame._frozen = True
+    return frame
@@ -0,0 +1,427 @@
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import shutil
+from contextlib import contextmanager
+from importlib import import_module
+from io import BytesIO
+
+import plotly.io as pio
+import streamlit as st
+from markdown_it import MarkdownIt
+
+from figure_cache import fingerprint, serialize
+from shared import CHAPTERS, aggregate_store
+
+# A read-only copy of the dashboard as static HTML, for serving the visitors who
+# only read it from a plain web server or CDN instead of a Streamlit session
+# each. Every chapter page runs against a recorder that stands in for the
+# Streamlit calls it makes, so the pages come out exactly as the live app builds
+# them for a visitor without filters or comparison: text, images, and the
+# Plotly, Vega-Lite and pydeck specs, drawn in the browser by the same
+# libraries. Static files the pages refer to are copied under app/static/, where
+# Streamlit serves them, so their URLs work unchanged; the rest go in assets/
+# under content-hash names.
+#
+# `python export.py` writes SITE_DIR, and does nothing when neither the data nor
+# the code has changed since the last export.
+SITE_DIR = 'site'
+STATIC_DIR = 'static'
+ASSETS = 'assets'
+# Part of the export fingerprint, so changing the page markup below re-exports
+EXPORT_VERSION = 2
+
+# The files whose changes make a new export: the code, the artwork and the
+# bundled data (the survey data counts through the aggregates' fingerprint)
+SOURCE_PATTERNS = (r'[^/]+\.py', r'assets/.+', r'data/[^/]+\.(csv|npz)')
+# Environment settings that change what the pages show
+SETTINGS = ('MAP_AGGREGATION', 'COUNTY_MAP', 'COMPACT_SPECS')
+
+# Plotly.js and deck.gl come with the plotly and pydeck packages, so they are
+# bundled; no Python package ships Vega, so it loads from jsDelivr at the
+# versions Altair writes specs for.
+LIBRARIES = {
+    'plotly': [('package', 'plotly', 'package_data/plotly.min.js')],
+    'deck': [('package', 'pydeck', 'nbextension/static/index.js')],
+    'vega-lite': [('url', 'https://cdn.jsdelivr.net/npm/vega@{vega}'),
+                  ('url', 'https://cdn.jsdelivr.net/npm/vega-lite@{vega_lite}'),
+                  ('url', 'https://cdn.jsdelivr.net/npm/vega-embed@{vega_embed}')],
+}
+
+# Streamlit's column gaps
+GAPS = {'small': '1rem', 'medium': '2rem', 'large': '4rem'}
+DECK_HEIGHT = 500
+
+STYLE = """
+body { margin: 0; font-family: "Source Sans Pro", system-ui, sans-serif; color: #31333f; line-height: 1.6; }
+nav { display: flex; flex-wrap: wrap; gap: 0.25rem 1.25rem; padding: 1rem 5rem; border-bottom: 1px solid #e6e6e6; }
+nav a { color: inherit; text-decoration: none; }
+nav a[aria-current] { font-weight: 600; border-bottom: 2px solid #ff4b4b; }
+nav .live { margin-left: auto; }
+main { padding: 1rem 5rem 4rem; }
+p { text-align: justify; }
+img { max-width: 100%; }
+.row { display: flex; }
+.row > div { min-width: 0; }
+.chart { width: 100%; }
+.deck { position: relative; width: 100%; }
+.caption { font-size: 14px; color: gray; }
+@media (max-width: 640px) {
+  nav, main { padding-left: 1rem; padding-right: 1rem; }
+  .row { flex-direction: column; }
+}
+"""
+
+# Draws the figures listed in the page's #figures script element
+SCRIPT = """
+for (const figure of JSON.parse(document.getElementById('figures').textContent)) {
+  const element = document.getElementById(figure.id);
+  if (figure.kind === 'plotly') {
+    Plotly.newPlot(element, figure.spec.data, figure.spec.layout, {responsive: true, displaylogo: false});
+  } else if (figure.kind === 'vega-lite') {
+    vegaEmbed(element, figure.spec, {actions: false});
+  } else {
+    createDeck({container: element, jsonInput: figure.spec, tooltip: figure.spec.tooltip || false});
+  }
+}
+"""
+
+markdown = MarkdownIt('commonmark', {'html': True}).enable(['table', 'strikethrough'])
+escaped_markdown = MarkdownIt('commonmark', {'html': False}).enable(['table', 'strikethrough'])
+
+
+class Block:
+    # A container, column or expander, and the markup recorded into it
+
+    def __init__(self, recorder, tag='div', attributes=''):
+        self.recorder = recorder
+        self.tag = tag
+        self.attributes = attributes
+        self.children = []
+
+    def __enter__(self):
+        self.recorder.blocks.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.recorder.blocks.pop()
+
+    def render(self):
+        inner = ''.join(child if isinstance(child, str) else child.render() for child in self.children)
+        return f'<{self.tag}{self.attributes}>{inner}</{self.tag}>'
+
+
+class PageRecorder:
+    # Stands in for the streamlit module while a chapter runs (see recording()),
+    # turning each call into HTML; figures and images are kept aside for the page
+    # script and the assets
+
+    def __init__(self):
+        self.root = Block(self, 'main')
+        self.blocks = [self.root]
+        self.figures = []
+        self.images = {}
+
+    def emit(self, markup):
+        self.blocks[-1].children.append(markup)
+
+    def add(self, block):
+        self.blocks[-1].children.append(block)
+        return block
+
+    def markdown(self, body, unsafe_allow_html=False, help=None):
+        self.emit((markdown if unsafe_allow_html else escaped_markdown).render(str(body)))
+
+    def write(self, *args, unsafe_allow_html=False):
+        for arg in args:
+            self.markdown(arg, unsafe_allow_html)
+
+    def title(self, body, anchor=None, help=None):
+        self.emit(f'<h1>{html.escape(body)}</h1>')
+
+    def header(self, body, anchor=None, help=None, divider=False):
+        self.emit(f'<h2>{html.escape(body)}</h2>')
+
+    def subheader(self, body, anchor=None, help=None, divider=False):
+        self.emit(f'<h3>{html.escape(body)}</h3>')
+
+    def caption(self, body, unsafe_allow_html=False, help=None):
+        self.emit(f'<div class="caption">{(markdown if unsafe_allow_html else escaped_markdown).render(body)}</div>')
+
+    def container(self, border=None):
+        return self.add(Block(self))
+
+    def expander(self, label, expanded=False):
+        block = self.add(Block(self, 'details', ' open' if expanded else ''))
+        block.children.append(f'<summary>{html.escape(label)}</summary>')
+        return block
+
+    def columns(self, spec, gap='small'):
+        weights = [1] * spec if isinstance(spec, int) else list(spec)
+        row = self.add(Block(self, 'div', f' class="row" style="gap: {GAPS[gap]}"'))
+        columns = [Block(self, 'div', f' style="flex: {weight} 1 0"') for weight in weights]
+        row.children += columns
+        return columns
+
+    def image(self, image, caption=None, width=None, use_column_width=None, clamp=False, channels='RGB',
+              output_format='auto'):
+        if isinstance(image, str):
+            with open(image, 'rb') as f:
+                image = f.read()
+        if not isinstance(image, bytes):
+            buffer = BytesIO()
+            image.save(buffer, format='PNG')
+            image = buffer.getvalue()
+        extension = 'svg' if image.lstrip()[:5] in (b'<?xml', b'<svg ') else 'png'
+        name = f'{ASSETS}/{hashlib.sha1(image).hexdigest()[:16]}.{extension}'
+        self.images[name] = image
+        style = 'width: 100%' if use_column_width else f'width: {width}px' if width else ''
+        markup = f'<img src="{name}" alt="{html.escape(caption or "")}" style="{style}">'
+        if caption:
+            markup += f'<div class="caption" style="text-align: center">{html.escape(caption)}</div>'
+        self.emit(markup)
+
+    def figure(self, kind, spec, css_class='chart', style=''):
+        element_id = f'figure-{len(self.figures)}'
+        self.figures.append({'id': element_id, 'kind': kind, 'spec': spec})
+        self.emit(f'<div id="{element_id}" class="{css_class}" style="{style}"></div>')
+
+    def plotly_chart(self, figure, use_container_width=False, **kwargs):
+        self.figure('plotly', json.loads(serialize(figure).spec))
+
+    def vega_lite_chart(self, data=None, spec=None, use_container_width=False, **kwargs):
+        spec = dict(data if spec is None else spec)
+        # as in Streamlit, a single view takes the column's width
+        if use_container_width and not {'vconcat', 'hconcat', 'concat', 'facet', 'repeat'} & spec.keys():
+            spec['width'] = 'container'
+        self.figure('vega-lite', spec)
+
+    def altair_chart(self, chart, use_container_width=False, **kwargs):
+        self.vega_lite_chart(json.loads(serialize(chart).spec), use_container_width=use_container_width)
+
+    def pydeck_chart(self, deck, use_container_width=False):
+        self.figure('deck', json.loads(deck.to_json()), 'deck', f'height: {DECK_HEIGHT}px')
+
+    def agraph(self, nodes, edges, config):
+        # streamlit_agraph's network, drawn once as an SVG
+        self.emit(graph_svg(nodes, edges, config))
+
+
+@contextmanager
+def recording(recorder, module):
+    # Routes the streamlit calls of `module`, and of the helpers it calls, to the
+    # recorder; `module`'s own custom components too
+    names = [name for name in vars(PageRecorder) if not name.startswith('_') and hasattr(st, name)]
+    saved = {name: getattr(st, name) for name in names}
+    component = getattr(module, 'agraph', None)
+    # Streamlit's default Plotly template holds placeholder colours that only its
+    # frontend fills in, so the pages use Plotly's own
+    template = pio.templates.default
+    try:
+        for name in names:
+            setattr(st, name, getattr(recorder, name))
+        if component is not None:
+            module.agraph = recorder.agraph
+        pio.templates.default = 'plotly'
+        yield recorder
+    finally:
+        for name, value in saved.items():
+            setattr(st, name, value)
+        if component is not None:
+            module.agraph = component
+        pio.templates.default = template
+
+
+def graph_svg(nodes, edges, config, width=600):
+    # Nodes in rows by their distance from the nodes nothing points to, each with
+    # its image in a circle and its label below, and the edges as labelled arrows
+    height = int(str(config.height).rstrip('px') or 300)
+    targets = {edge.to for edge in edges}
+    level = {node.id: 0 for node in nodes if node.id not in targets}
+    for _ in nodes:
+        for edge in edges:
+            if edge.source in level:
+                level[edge.to] = max(level.get(edge.to, 0), level[edge.source] + 1)
+    rows = {}
+    for node in nodes:
+        rows.setdefault(level.get(node.id, 0), []).append(node)
+    position = {}
+    for row, members in rows.items():
+        for i, node in enumerate(members):
+            position[node.id] = (width * (i + 1) / (len(members) + 1), height * (row + 1) / (len(rows) + 1) - 10)
+
+    parts = ['<defs><marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="8" markerHeight="8" '
+             'orient="auto-start-reverse"><path d="M0 0L10 5L0 10z" fill="#F7A7A6"/></marker></defs>']
+    for edge in edges:
+        (x1, y1), (x2, y2) = position[edge.source], position[edge.to]
+        size = next(node.size for node in nodes if node.id == edge.to)
+        length = max(((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5, 1)
+        x2, y2 = x2 - (x2 - x1) * size / length, y2 - (y2 - y1) * size / length
+        parts.append(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" stroke="{edge.color}" '
+                     f'stroke-width="1.5" marker-end="url(#arrow)"/>')
+        label = getattr(edge, 'label', None)
+        if label:
+            parts.append(f'<text x="{(x1 + x2) / 2:.1f}" y="{(y1 + y2) / 2:.1f}" font-size="11" text-anchor="middle" '
+                         f'fill="#666">{html.escape(label)}</text>')
+    for k, node in enumerate(nodes):
+        x, y = position[node.id]
+        image = getattr(node, 'image', None)
+        if image:
+            parts.append(f'<clipPath id="node-{k}"><circle cx="{x:.1f}" cy="{y:.1f}" r="{node.size}"/></clipPath>'
+                         f'<image href="{html.escape(image)}" x="{x - node.size:.1f}" y="{y - node.size:.1f}" '
+                         f'width="{2 * node.size}" height="{2 * node.size}" preserveAspectRatio="xMidYMid slice" '
+                         f'clip-path="url(#node-{k})"/>')
+        parts.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{node.size}" fill="{"none" if image else "#97c2fc"}" '
+                     f'stroke="#2b7ce9" stroke-width="2"/>')
+        parts.append(f'<text x="{x:.1f}" y="{y + node.size + 16:.1f}" font-size="13" text-anchor="middle">'
+                     f'{html.escape(node.label or node.id)}</text>')
+    return (f'<svg viewBox="0 0 {width} {height}" style="width: 100%; max-height: {height}px" role="img">'
+            + ''.join(parts) + '</svg>')
+
+
+def render_chapter(module_name):
+    module = import_module(module_name)
+    recorder = PageRecorder()
+    with recording(recorder, module):
+        getattr(module, module_name)()
+    return recorder
+
+
+def page_file(chapter_id):
+    return 'index.html' if chapter_id == next(iter(CHAPTERS)) else f'{chapter_id}.html'
+
+
+def page_html(chapter_id, recorder, scripts, app_url=None):
+    links = [f'<a href="{page_file(other)}"{" aria-current=page" if other == chapter_id else ""}>'
+             f'{html.escape(label)}</a>' for other, (label, _) in CHAPTERS.items()]
+    if app_url:
+        links.append(f'<a class="live" href="{html.escape(app_url)}?chapter={chapter_id}">Interactive version</a>')
+    # the specs go in a JSON script element; '</' must not close it early
+    figures = json.dumps(recorder.figures, separators=(',', ':')).replace('</', '<\\/')
+    return ('<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+            '<meta name="viewport" content="width=device-width, initial-scale=1">\n'
+            f'<title>{html.escape(CHAPTERS[chapter_id][0])} | CRNY Data Visualization</title>\n'
+            f'<style>{STYLE}</style>\n'
+            + ''.join(f'<script src="{src}"></script>\n' for src in scripts)
+            + '</head>\n<body>\n'
+            f'<nav>{"".join(links)}</nav>\n'
+            f'{recorder.root.render()}\n'
+            f'<script type="application/json" id="figures">{figures}</script>\n'
+            f'<script>{SCRIPT}</script>\n'
+            '</body>\n</html>\n')
+
+
+def library_scripts(kind, site_dir):
+    # The script URLs of a figure kind, copying bundled libraries into the site
+    # under content-hash names
+    import altair
+
+    scripts = []
+    for source, *location in LIBRARIES[kind]:
+        if source == 'url':
+            scripts.append(location[0].format(vega=altair.VEGA_VERSION, vega_lite=altair.VEGALITE_VERSION,
+                                              vega_embed=altair.VEGAEMBED_VERSION))
+            continue
+        package, path = location
+        with open(os.path.join(os.path.dirname(import_module(package).__file__), path), 'rb') as f:
+            payload = f.read()
+        name = f'{ASSETS}/{kind}-{hashlib.sha1(payload).hexdigest()[:16]}.js'
+        write_file(os.path.join(site_dir, name), payload)
+        scripts.append(name)
+    return scripts
+
+
+def write_file(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(payload)
+
+
+def copy_static(pages, site_dir, static_dir=STATIC_DIR):
+    # Copies the static files (or tile directories) the pages refer to; returns
+    # how many
+    paths = set()
+    for page in pages:
+        paths.update(match.rstrip('/') for match in re.findall(r'app/static/([\w./-]+)', page))
+    for path in paths:
+        source, target = os.path.join(static_dir, path), os.path.join(site_dir, 'app', 'static', path)
+        if os.path.isdir(source):
+            shutil.copytree(source, target)
+        elif os.path.isfile(source):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+    return len(paths)
+
+
+def source_fingerprint(root='.'):
+    digest = hashlib.sha1()
+    for folder, directories, files in os.walk(root):
+        directories[:] = sorted(d for d in directories if not d.startswith('.') and d != '__pycache__')
+        for name in sorted(files):
+            path = os.path.relpath(os.path.join(folder, name), root).replace(os.sep, '/')
+            if any(re.fullmatch(pattern, path) for pattern in SOURCE_PATTERNS):
+                digest.update(path.encode())
+                with open(os.path.join(folder, name), 'rb') as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def export_site(site_dir=SITE_DIR, app_url=None, force=False):
+    # Writes the site and returns its manifest, or None when it is up to date
+    aggregates = aggregate_store().aggregates
+    key = fingerprint(EXPORT_VERSION, aggregates['fingerprint'], source_fingerprint(), app_url,
+                      {name: os.environ.get(name) for name in SETTINGS})
+    manifest_path = os.path.join(site_dir, 'manifest.json')
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            if json.load(f).get('fingerprint') == key:
+                return None
+
+    # written next to the old site and swapped in, so it is never served half done
+    tmp_dir = f'{site_dir}.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    pages, libraries = {}, {}
+    for chapter_id, (_, module_name) in CHAPTERS.items():
+        recorder = render_chapter(module_name)
+        scripts = []
+        for kind in dict.fromkeys(figure['kind'] for figure in recorder.figures):
+            if kind not in libraries:
+                libraries[kind] = library_scripts(kind, tmp_dir)
+            scripts += libraries[kind]
+        for name, payload in recorder.images.items():
+            write_file(os.path.join(tmp_dir, name), payload)
+        # the live app's URLs are absolute; the site's are relative, so it can be
+        # served from any path
+        page = re.sub(r'(["\s])/app/static/', r'\1app/static/', page_html(chapter_id, recorder, scripts, app_url))
+        pages[page_file(chapter_id)] = page
+    for name, page in pages.items():
+        write_file(os.path.join(tmp_dir, name), page.encode())
+    static_files = copy_static(pages.values(), tmp_dir)
+
+    manifest = {'fingerprint': key, 'rows': aggregates['rows'], 'pages': list(pages), 'static': static_files}
+    write_file(os.path.join(tmp_dir, 'manifest.json'), json.dumps(manifest, indent=2).encode())
+    old_dir = f'{site_dir}.old'
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(site_dir):
+        os.replace(site_dir, old_dir)
+    os.replace(tmp_dir, site_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return manifest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export every chapter of the dashboard as a static HTML site.')
+    parser.add_argument('--out', default=SITE_DIR, help='site directory')
+    parser.add_argument('--app-url', help='link each page to this live dashboard, for filters and comparisons')
+    parser.add_argument('--force', action='store_true', help='export even if nothing has changed')
+    args = parser.parse_args()
+
+    manifest = export_site(args.out, args.app_url, args.force)
+    if manifest is None:
+        print(f'{args.out} is up to date')
+    else:
+        size = sum(os.path.getsize(os.path.join(folder, name)) for folder, _, files in os.walk(args.out) for name in files)
+        print(f"Wrote {args.out} ({len(manifest['pages'])} pages, {manifest['static']} static files, {size} bytes)")
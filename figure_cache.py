@@ -0,0 +1,258 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict, namedtuple
+from contextlib import nullcontext
+
+import streamlit as st
+
+from metrics import record_payload, span
+
+# Process-wide bounds; the least recently shown specs are dropped first
+MAX_ENTRIES = 256
+MAX_BYTES = 64 * 1024 * 1024
+
+# kind is 'plotly', 'vega-lite' or 'deck'; spec is the JSON text Streamlit sends;
+# name is the builder that made it, which labels its bytes in the debug panel;
+# files are the published files and tile directories the spec loads by URL
+FigureSpec = namedtuple('FigureSpec', ['kind', 'spec', 'name', 'files'], defaults=[None, ()])
+
+# Specs are compacted before they are cached, since every byte is sent to each
+# browser on each rerun that shows them (COMPACT_SPECS=0 sends them as built, to
+# compare in the ?debug=1 payload table):
+# - Plotly templates keep only the trace types and subplots the figure has; the
+#   Streamlit template alone holds 3.5 KB of defaults for other trace types.
+# - Numbers are rounded to SIGNIFICANT_DIGITS.
+# - Vega-Lite tables are published as content-hashed files under DATA_DIR and
+#   loaded by URL. Streamlit would otherwise send each one as Arrow (about 1 KB of
+#   schema per table) inside every chart; as files, charts drawn from the same
+#   table share one download, which the browser keeps across reruns.
+COMPACT_SPECS = os.environ.get('COMPACT_SPECS', '1') == '1'
+SIGNIFICANT_DIGITS = 6
+DATA_DIR = os.path.join('static', 'data')
+
+# URLs of the files published under static/maps (see maps.py) and DATA_DIR, which
+# are pruned when unused; each cache hit marks the files of its specs as used
+STATIC_FILE_URL = re.compile(r'/app/static/((?:maps|data)/[\w.-]+)')
+
+# Template sections only figures with one of these trace types use
+TEMPLATE_SUBPLOTS = {
+    'geo': {'choropleth', 'scattergeo'},
+    'polar': {'barpolar', 'scatterpolar', 'scatterpolargl'},
+    'ternary': {'scatterternary'},
+    'scene': {'cone', 'isosurface', 'mesh3d', 'scatter3d', 'streamtube', 'surface', 'volume'},
+    'mapbox': {'choroplethmapbox', 'densitymapbox', 'scattermapbox'},
+}
+
+
+def fingerprint(*parts):
+    # Stable hash of JSON-able inputs, e.g. the aggregates and chart parameters
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def data_fingerprint(aggregates):
+    # get_aggregates() stores this once, so it is not rehashed on every chart
+    return aggregates.get('fingerprint') or fingerprint(aggregates)
+
+
+def round_numbers(value, digits=SIGNIFICANT_DIGITS):
+    if isinstance(value, float):
+        return float(f'{value:.{digits}g}')
+    if isinstance(value, dict):
+        return {key: round_numbers(item, digits) for key, item in value.items()}
+    if isinstance(value, list):
+        return [round_numbers(item, digits) for item in value]
+    return value
+
+
+def trim_template(spec):
+    # Drops the template's defaults for trace types and subplots the figure lacks
+    template = spec.get('layout', {}).get('template')
+    if not isinstance(template, dict):
+        return spec
+    types = {trace.get('type', 'scatter') for trace in spec.get('data', ())}
+    template['data'] = {kind: traces for kind, traces in template.get('data', {}).items() if kind in types}
+    template['layout'] = {key: value for key, value in template.get('layout', {}).items()
+                          if key not in TEMPLATE_SUBPLOTS or types & TEMPLATE_SUBPLOTS[key]}
+    return spec
+
+
+def share_datasets(spec):
+    # Replaces the spec's inline datasets with URLs of published files
+    from maps import publish
+    from shared import static_url
+
+    urls = {name: static_url(f"data/{publish(json.dumps(records, separators=(',', ':')).encode(), 'json', DATA_DIR)}")
+            for name, records in spec.pop('datasets', {}).items()}
+
+    def point(value):
+        if isinstance(value, dict):
+            if value.keys() == {'name'} and value['name'] in urls:
+                return {'url': urls[value['name']], 'format': {'type': 'json'}}
+            return {key: point(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [point(item) for item in value]
+        return value
+    return point(spec)
+
+
+def serialize(figure, compact=COMPACT_SPECS):
+    # Plotly figures, Altair charts and pydeck Decks to the JSON Streamlit would send
+    module = type(figure).__module__.split('.')[0]
+    if module == 'plotly':
+        import plotly.io as pio
+        spec = pio.to_json(figure, validate=False)
+        if compact:
+            spec = json.dumps(round_numbers(trim_template(json.loads(spec))), separators=(',', ':'))
+        return FigureSpec('plotly', spec)
+    if module == 'altair':
+        import altair as alt
+        # st.altair_chart drops the default theme's fixed sizes the same way
+        with alt.themes.enable('none') if alt.themes.active == 'default' else nullcontext():
+            spec = figure.to_dict()
+        if compact:
+            return FigureSpec('vega-lite', json.dumps(share_datasets(round_numbers(spec)), separators=(',', ':')))
+        return FigureSpec('vega-lite', json.dumps(spec))
+    if module == 'pydeck':
+        spec = figure.to_json()
+        if compact:
+            spec = json.dumps(round_numbers(json.loads(spec)), separators=(',', ':'))
+        return FigureSpec('deck', spec)
+    raise TypeError(f'cannot cache a {type(figure).__name__} figure')
+
+
+class DeckSpec:
+    # Stands in for a pydeck Deck in st.pydeck_chart, which only calls to_json()
+    # and looks for a tooltip
+
+    def __init__(self, spec):
+        self.spec = spec
+        self._tooltip = json.loads(spec).get('tooltip') if '"tooltip"' in spec else None
+
+    def to_json(self):
+        return self.spec
+
+
+class FigureCache:
+    # LRU of serialized figure specs shared by every session, capped by entry
+    # count and by the total size of the stored JSON
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = _spec_bytes(value)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= _spec_bytes(self._entries.pop(key))
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = value
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= _spec_bytes(evicted)
+                self.evictions += 1
+        return value
+
+    def get_or_build(self, key, build, usable=None):
+        # Two sessions missing at once may both build; the second put just replaces
+        # the first, which is cheaper than holding the lock while building. A
+        # cached value for which usable(value) is false is rebuilt as well.
+        value = self.get(key)
+        if value is None or (usable is not None and not usable(value)):
+            value = self.put(key, build())
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.bytes, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
+
+
+def _specs(value):
+    # A cached value is one FigureSpec or a tuple/dict of them
+    if isinstance(value, FigureSpec):
+        yield value
+        return
+    for item in value.values() if isinstance(value, dict) else value:
+        yield from _specs(item)
+
+
+def _spec_bytes(value):
+    return sum(len(spec.spec) for spec in _specs(value))
+
+
+def static_files(spec):
+    return tuple(sorted({os.path.join('static', *path.split('/')) for path in STATIC_FILE_URL.findall(spec)}))
+
+
+def touch_files(value):
+    # Marks the files the cached specs load as used; false when one is gone, so
+    # the specs are rebuilt and publish it again
+    from maps import touch
+
+    return all([touch(path) for spec in _specs(value) for path in spec.files])
+
+
+def _serialize_all(figures, name=None):
+    if isinstance(figures, dict):
+        return {key: _serialize_all(figure, name and f'{name}.{key}') for key, figure in figures.items()}
+    if isinstance(figures, (tuple, list)):
+        return tuple(_serialize_all(figure, name and f'{name}[{i}]') for i, figure in enumerate(figures))
+    spec = serialize(figures)
+    return spec._replace(name=name, files=static_files(spec.spec))
+
+
+@st.cache_resource
+def figure_cache():
+    return FigureCache()
+
+
+def cached_figures(build, aggregates, *args):
+    # Runs build(aggregates, *args) only when no spec is cached for the same
+    # builder, data and arguments. Returns the same shape build returns (one
+    # figure, a tuple or a dict) with FigureSpecs in place of the figures.
+    name = f'{build.__module__}.{build.__qualname__}'
+    key = (name, data_fingerprint(aggregates), fingerprint(*args))
+
+    def build_specs():
+        with span(f'figure.{name}'):
+            return _serialize_all(build(aggregates, *args), name)
+    return figure_cache().get_or_build(key, build_specs, touch_files)
+
+
+def show_figure(figure, use_container_width=True):
+    # Emits a cached spec without rebuilding the chart object it came from
+    record_payload(figure.name or f'chart.{figure.kind}', figure.kind, len(figure.spec.encode()))
+    with span(f'chart.{figure.kind}'):
+        if figure.kind == 'plotly':
+            import plotly.graph_objects as go
+            # the spec was produced by plotly itself, so skip re-validating it
+            st.plotly_chart(go.Figure(json.loads(figure.spec), _validate=False),
+                            use_container_width=use_container_width)
+        elif figure.kind == 'vega-lite':
+            st.vega_lite_chart(json.loads(figure.spec), use_container_width=use_container_width)
+        else:
+            st.pydeck_chart(DeckSpec(figure.spec), use_container_width=use_container_width)
@@ -0,0 +1,191 @@
+import argparse
+import json
+import os
+import re
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+# New York counties keyed by name and FIPS code. Centroids are area-weighted
+# centroids of the 2016 Census cartographic boundary polygons.
+GAZETTEER_PATH = os.path.join('data', 'ny_counties.csv')
+GEOCODE_CACHE_PATH = os.path.join('.cache', 'geocode.json')
+# ZIP code centroids: the Census Bureau's ZCTA gazetteer file (e.g.
+# 2023_Gaz_zcta_national.txt), saved under this name. It is not bundled; without
+# it ZIP codes are located from the geocode cache only (see `--zips` below).
+ZCTA_PATH = os.path.join('data', 'zcta_gazetteer.txt')
+
+Point = namedtuple('Point', ['latitude', 'longitude'])
+
+
+def county_key(name):
+    # 'Kings County ', 'kings county, NY' and 'Kings' all map to 'kings'
+    key = ' '.join(str(name).split(',')[0].split()).lower()
+    key = re.sub(r'\s+county$', '', key)
+    return re.sub(r'^(saint|st)\.?\s+', 'st. ', key)
+
+
+def load_gazetteer(path=GAZETTEER_PATH):
+    gazetteer = pd.read_csv(path, dtype={'fips': str})
+    gazetteer['key'] = gazetteer['county'].map(county_key)
+    return gazetteer.set_index('key')
+
+
+def geocode_query(name):
+    return f"{' '.join(str(name).split())}, New York, USA"
+
+
+def load_zcta_gazetteer(path=ZCTA_PATH):
+    # Internal points of the ZIP Code Tabulation Areas, indexed by 5-digit ZIP;
+    # empty when the file is missing
+    if not os.path.exists(path):
+        return pd.DataFrame({'latitude': [], 'longitude': []}, index=pd.Index([], name='zip'))
+    zctas = pd.read_csv(path, sep='\t', dtype={'GEOID': str})
+    zctas.columns = zctas.columns.str.strip()
+    return zctas.rename(columns={'GEOID': 'zip', 'INTPTLAT': 'latitude', 'INTPTLONG': 'longitude'}).set_index('zip')[
+        ['latitude', 'longitude']]
+
+
+class GeocodeCache:
+    # Disk-backed query -> (lat, lon) cache; failed lookups are stored as None so
+    # they are not retried on every run
+
+    def __init__(self, path=GEOCODE_CACHE_PATH):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, query):
+        entry = self.entries.get(query)
+        return Point(*entry) if entry else None
+
+    def __contains__(self, query):
+        return query in self.entries
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def geocode_many(self, queries, geocoder, min_delay_seconds=1.0):
+        # Looks up only the queries missing from the cache, one request at a time
+        # (Nominatim allows one per second), and saves once at the end
+        missing = [q for q in dict.fromkeys(queries) if q not in self.entries]
+        for i, query in enumerate(missing):
+            if i and min_delay_seconds:
+                time.sleep(min_delay_seconds)
+            location = geocoder.geocode(query)
+            self.entries[query] = [location.latitude, location.longitude] if location else None
+        if missing:
+            self.save()
+        return {query: self.get(query) for query in queries}
+
+
+class GazetteerGeocoder:
+    # Offline stand-in for geopy geocoders, answering from the bundled gazetteer
+
+    def __init__(self, gazetteer=None):
+        self.gazetteer = load_gazetteer() if gazetteer is None else gazetteer
+
+    def geocode(self, query):
+        key = county_key(query)
+        if key not in self.gazetteer.index:
+            return None
+        row = self.gazetteer.loc[key]
+        return Point(row['latitude'], row['longitude'])
+
+
+def county_locations(counts, gazetteer=None, cache=None):
+    # Joins county counts (indexed by the raw p34_county answers) to coordinates by
+    # key, so a county missing from a data refresh cannot shift the others. Names
+    # outside the gazetteer come from the geocode cache only; nothing here touches
+    # the network.
+    gazetteer = load_gazetteer() if gazetteer is None else gazetteer
+    counts = counts.groupby(counts.index.map(county_key)).sum()
+
+    known = counts[counts.index.isin(gazetteer.index)]
+    locations = gazetteer.loc[known.index, ['county', 'fips', 'latitude', 'longitude']].copy()
+    locations['count'] = known.values
+
+    unknown = counts[~counts.index.isin(gazetteer.index)]
+    if len(unknown):
+        cache = GeocodeCache() if cache is None else cache
+        extra = []
+        for key, count in unknown.items():
+            point = cache.get(geocode_query(key))
+            if point:
+                extra.append({'county': key.title(), 'fips': None, 'latitude': point.latitude,
+                              'longitude': point.longitude, 'count': count})
+        if extra:
+            locations = pd.concat([locations, pd.DataFrame(extra)])
+
+    return locations.sort_values('county').reset_index(drop=True)
+
+
+def zip_locations(counts, zctas=None, cache=None):
+    # ZIP code counts (indexed by 5-digit ZIP) with the ZCTA centroid of each, or
+    # else its geocode cache entry; ZIP codes found in neither are left out.
+    # Nothing here touches the network.
+    zctas = load_zcta_gazetteer() if zctas is None else zctas
+    known = counts[counts.index.isin(zctas.index)]
+    locations = zctas.loc[known.index, ['latitude', 'longitude']].reset_index()
+    locations['count'] = known.values
+
+    unknown = counts[~counts.index.isin(zctas.index)]
+    if len(unknown):
+        cache = GeocodeCache() if cache is None else cache
+        extra = [{'zip': code, 'latitude': point.latitude, 'longitude': point.longitude, 'count': count}
+                 for code, count in unknown.items() if (point := cache.get(geocode_query(code)))]
+        if extra:
+            locations = pd.concat([locations, pd.DataFrame(extra)], ignore_index=True)
+    return locations
+
+
+def unresolved_zips(codes, zctas=None, cache=None):
+    # ZIP codes that are neither in the ZCTA gazetteer nor in the geocode cache
+    zctas = load_zcta_gazetteer() if zctas is None else zctas
+    cache = GeocodeCache() if cache is None else cache
+    return [code for code in dict.fromkeys(codes) if code not in zctas.index and geocode_query(code) not in cache]
+
+
+def unresolved_places(names, gazetteer=None, cache=None):
+    # Place names that are neither in the gazetteer nor in the geocode cache
+    gazetteer = load_gazetteer() if gazetteer is None else gazetteer
+    cache = GeocodeCache() if cache is None else cache
+    keys = dict.fromkeys(county_key(name) for name in names)
+    return [key for key in keys if key not in gazetteer.index and geocode_query(key) not in cache]
+
+
+if __name__ == '__main__':
+    from data_loader import SURVEY_CSV, ZIP_COLUMN, load_survey
+
+    parser = argparse.ArgumentParser(description='Geocode survey place names missing from the county gazetteer.')
+    parser.add_argument('--csv', default=SURVEY_CSV, help='raw survey CSV')
+    parser.add_argument('--offline', action='store_true', help='resolve from the gazetteer only (no network)')
+    parser.add_argument('--zips', action='store_true',
+                        help=f'geocode the {ZIP_COLUMN} answers missing from {ZCTA_PATH} instead of the counties')
+    args = parser.parse_args()
+    if args.zips and args.offline:
+        parser.error(f'ZIP codes are resolved offline from {ZCTA_PATH}; --offline has nothing more to look them up in')
+
+    survey = load_survey(args.csv)
+    if args.zips:
+        pending = unresolved_zips(survey[ZIP_COLUMN].dropna().unique()) if ZIP_COLUMN in survey else []
+    else:
+        pending = unresolved_places(survey['p34_county'].dropna().unique())
+    if args.offline:
+        geocoder = GazetteerGeocoder()
+    else:
+        from geopy.geocoders import Nominatim
+        geocoder = Nominatim(user_agent="county_locator")
+
+    results = GeocodeCache().geocode_many([geocode_query(name) for name in pending], geocoder)
+    for query, point in results.items():
+        print(f"{query}: {'not found' if point is None else f'{point.latitude:.5f}, {point.longitude:.5f}'}")
+    print(f'{len(pending)} place name(s) looked up')
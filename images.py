@@ -0,0 +1,100 @@
+import argparse
+import hashlib
+import html
+import os
+
+from PIL import Image, ImageOps
+
+ASSETS_DIR = 'assets'
+# Served by Streamlit at /app/static/ when server.enableStaticServing is on
+STATIC_DIR = 'static'
+DERIVED_DIR = os.path.join(STATIC_DIR, 'img')
+
+WIDTHS = (480, 960, 1600)
+FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+    'jpg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+# Part of every derivative hash, so changing the settings above renames the files
+PIPELINE_VERSION = 1
+
+# Most chapter images sit in one of two columns
+HALF_WIDTH = '(max-width: 640px) 100vw, 50vw'
+
+
+def source_digest(path):
+    digest = hashlib.sha256(f'{PIPELINE_VERSION}{WIDTHS}{FORMATS}'.encode())
+    with open(path, 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def _save(image, path, options):
+    tmp_path = path + '.tmp'
+    image.save(tmp_path, **options)
+    os.replace(tmp_path, path)
+
+
+def build_derivatives(name, assets_dir=ASSETS_DIR, out_dir=DERIVED_DIR):
+    # Resized WebP/JPEG copies of assets/<name>, one per width no larger than the
+    # original. File names carry the content hash, so existing files are reused
+    # as-is and can be cached by browsers indefinitely.
+    path = os.path.join(assets_dir, name)
+    stem = os.path.splitext(name)[0]
+    digest = source_digest(path)
+    os.makedirs(out_dir, exist_ok=True)
+
+    derivatives = []
+    with Image.open(path) as original:
+        widths = sorted({min(width, original.width) for width in WIDTHS})
+        source = None
+        for width in widths:
+            for ext, options in FORMATS.items():
+                file_name = f'{stem}-{width}w-{digest}.{ext}'
+                out_path = os.path.join(out_dir, file_name)
+                if not os.path.exists(out_path):
+                    if source is None:
+                        source = ImageOps.exif_transpose(original).convert('RGB')
+                    height = round(source.height * width / source.width)
+                    _save(source.resize((width, height), Image.LANCZOS), out_path, options)
+                derivatives.append({'width': width, 'format': ext, 'file': file_name, 'digest': digest})
+    return derivatives
+
+
+def srcset(derivatives, ext, url):
+    return ', '.join(f"{url('img/' + d['file'])} {d['width']}w" for d in derivatives if d['format'] == ext)
+
+
+def picture_html(derivatives, url, sizes='100vw', alt='', caption=None):
+    # url maps a path under STATIC_DIR to the address the server has it at (see
+    # shared.static_url, which follows server.baseUrlPath)
+    fallback = max((d for d in derivatives if d['format'] == 'jpg'), key=lambda d: d['width'])
+    markup = (
+        '<picture>'
+        f'<source type="image/webp" srcset="{srcset(derivatives, "webp", url)}" sizes="{sizes}">'
+        f'<img src="{url("img/" + fallback["file"])}" srcset="{srcset(derivatives, "jpg", url)}" '
+        f'sizes="{sizes}" alt="{html.escape(alt)}" loading="lazy" decoding="async" style="width: 100%; height: auto;">'
+        '</picture>'
+    )
+    if caption:
+        markup += f'<p style="text-align: center; font-size: 14px; color: gray;">{html.escape(caption)}</p>'
+    return markup
+
+
+def build_all(assets_dir=ASSETS_DIR, out_dir=DERIVED_DIR):
+    built = {}
+    for name in sorted(os.listdir(assets_dir)):
+        if name.lower().endswith(('.jpg', '.jpeg', '.png')):
+            built[name] = build_derivatives(name, assets_dir, out_dir)
+    return built
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pre-generate resized WebP/JPEG copies of the chapter artwork.')
+    parser.add_argument('--assets', default=ASSETS_DIR)
+    parser.add_argument('--out', default=DERIVED_DIR)
+    args = parser.parse_args()
+
+    for name, derivatives in build_all(args.assets, args.out).items():
+        size = sum(os.path.getsize(os.path.join(args.out, d['file'])) for d in derivatives if d['format'] == 'webp')
+        print(f"{name}: {len(derivatives)} files, webp {size // 1024} KB across {len(derivatives) // len(FORMATS)} widths")
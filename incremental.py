@@ -0,0 +1,121 @@
+import argparse
+import io
+import os
+import time
+
+import pandas as pd
+
+from aggregates import (AGGREGATES_PATH, aggregate_file, compute_aggregates, load_aggregates,
+                        merge_aggregates, write_aggregates)
+from cleaning import clean_survey
+from data_loader import (SURVEY_CSV, LABEL_FORMATS, MULTISELECT_QUESTIONS, is_used_column, slot_columns,
+                         tail_sha256)
+
+# New survey waves arrive either appended to the survey CSV or as separate CSV
+# files (same header) dropped into this directory
+DELTA_DIR = 'deltas'
+
+
+def known_labels(aggregates, columns):
+    # Labels the stored aggregates already have, per column of the new rows
+    labels = {column: entry['labels'] for column, entry in aggregates['value_counts'].items()}
+    options = {prefix: aggregates['multiselect'].get(name, {}).get('options', [])
+               for name, prefix in MULTISELECT_QUESTIONS.items()}
+    options[MULTISELECT_QUESTIONS['employ_impact']] = aggregates['employ_impact']['options']
+    for prefix, values in options.items():
+        for column in slot_columns(columns, prefix):
+            labels[column] = values
+    return labels
+
+
+def read_rows(data):
+    return pd.read_csv(io.BytesIO(data), usecols=is_used_column, dtype='category')
+
+
+def appended_bytes(csv_path, offset):
+    # Header plus the complete rows written after `offset`, and the new offset.
+    # A half-written last line is left for the next refresh.
+    with open(csv_path, 'rb') as f:
+        header = f.readline()
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b'\n') + 1
+    if end == 0:
+        return None, offset
+    return header + data[:end], offset + end
+
+
+def delta_files(aggregates, delta_dir=DELTA_DIR):
+    if not os.path.isdir(delta_dir):
+        return []
+    done = set(aggregates['source'].get('deltas', []))
+    return sorted(name for name in os.listdir(delta_dir) if name.endswith('.csv') and name not in done)
+
+
+def _merge_rows(aggregates, df):
+    # The new rows take the spellings the aggregates already have, and rare
+    # answers keep their own label (see OTHER_MIN_COUNT), so their counts simply
+    # add to the stored ones
+    delta = compute_aggregates(clean_survey(df, LABEL_FORMATS, known_labels(aggregates, df.columns)))
+    merged = merge_aggregates(aggregates, delta)
+    merged['source'] = aggregates['source']
+    return merged
+
+
+def refresh_aggregates(aggregates, csv_path=SURVEY_CSV, delta_dir=DELTA_DIR):
+    # Brings the aggregates up to date with rows appended to the CSV and with new
+    # files in the drop directory, reading only those rows. Falls back to a full
+    # rebuild when the CSV was rewritten rather than appended to. Returns the
+    # aggregates and the number of rows added (None after a full rebuild).
+    added = 0
+    source = (aggregates or {}).get('source', {})
+    if os.path.exists(csv_path):
+        stat = os.stat(csv_path)
+        offset = source.get('size', 0)
+        if ('tail_sha256' not in source or stat.st_size < offset
+                or tail_sha256(csv_path, offset) != source['tail_sha256']):
+            aggregates, added = aggregate_file(csv_path), None
+        elif stat.st_size > offset:
+            data, offset = appended_bytes(csv_path, offset)
+            if data is not None:
+                df = read_rows(data)
+                aggregates = _merge_rows(aggregates, df)
+                added += len(df)
+                aggregates['source'] = dict(source, mtime_ns=stat.st_mtime_ns, size=offset, sha256=None,
+                                            tail_sha256=tail_sha256(csv_path, offset))
+    if aggregates is None:
+        return None, 0
+
+    # files are expected to be moved into the directory once complete
+    for name in delta_files(aggregates, delta_dir):
+        with open(os.path.join(delta_dir, name), 'rb') as f:
+            df = read_rows(f.read())
+        aggregates = _merge_rows(aggregates, df)
+        if added is not None:
+            added += len(df)
+        aggregates['source'] = dict(aggregates['source'], deltas=aggregates['source'].get('deltas', []) + [name])
+    return aggregates, added
+
+
+def refresh_file(out_path=AGGREGATES_PATH, csv_path=SURVEY_CSV, delta_dir=DELTA_DIR):
+    aggregates, added = refresh_aggregates(load_aggregates(out_path), csv_path, delta_dir)
+    if added != 0:
+        write_aggregates(aggregates, out_path)
+    return aggregates, added
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Merge newly appended survey rows into the stored aggregates.')
+    parser.add_argument('--csv', default=SURVEY_CSV, help='raw survey CSV')
+    parser.add_argument('--deltas', default=DELTA_DIR, help='directory of additional CSV files')
+    parser.add_argument('--out', default=AGGREGATES_PATH, help='aggregates file to update')
+    parser.add_argument('--watch', type=float, metavar='SECONDS', help='keep polling at this interval')
+    args = parser.parse_args()
+
+    while True:
+        result, added = refresh_file(args.out, args.csv, args.deltas)
+        if added != 0:
+            print(f"{args.out}: {'rebuilt' if added is None else f'{added} rows added'}, {result['rows']} rows in total")
+        if not args.watch:
+            break
+        time.sleep(args.watch)
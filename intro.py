@@ -0,0 +1,80 @@
+import streamlit as st
+from streamlit_agraph import agraph, Node, Edge, Config
+
+from shared import show_image, static_url
+
+
+@st.cache_resource
+def data_source_graph():
+    # Graph Nodes
+    nodes = []
+    edges = []
+    nodes.append( Node(id="DA",
+                   label="Dataset",
+                   size=25,
+                   shape="circularImage",
+                   image=static_url("graph/dataset-8384e3b2ace2.jpg"))
+            ) # includes **kwargs
+    nodes.append( Node(id="GI",
+                   label="Guaranteed Income Application",
+                   size=25,
+                   shape="circularImage",
+                   image=static_url("graph/applicant-fb9ea73e56cc.png"))
+            )
+    nodes.append( Node(id="PA",
+                   label="Portrait of Artists Survey",
+                   size=25,
+                   shape="circularImage",
+                   image=static_url("graph/survey-ac41804788f4.png"))
+            )
+    edges.append( Edge(source="DA",
+                   label="sourced_from",
+                   target="GI",
+                   # **kwargs
+                   )
+            )
+    edges.append( Edge(source="DA",
+                   label="sourced_from",
+                   target="PA",
+                   # **kwargs
+                   )
+            )
+
+    config = Config(width=None,
+                height=300,
+                directed=True,
+                physics=False,
+                hierarchical=False,
+                nodeHighlightBehavior=True,
+                highlightColor="#F7A7A6",
+                collapsible=True,
+                # **kwargs
+                )
+
+    return nodes, edges, config
+
+
+def intro():
+    with st.container():
+        st.title("Bridging Gaps and Building Futures")
+        st.markdown('<span style="font-size:20px; font-style: italic;"> The Role of CRNY Guaranteed Income Program in Supporting New Yorks Artists</span>', unsafe_allow_html=True)
+
+    show_image('nyc_artists_1.jpg')
+
+    with st.container():
+        st.write("\n")
+        st.write("Embark on a journey through New York's artist community, uncovering the transformative impact of CRNY's Guaranteed Income (GI) Program. This data visualization dashboard peels back the layers, exploring the lives of artists, their challenges, and the unique role the GI program plays. From demographic breakdowns to pandemic struggles, each chapter unveils a different facet. Visualizations highlight how the GI program acts as a lifeline, offering financial stability and nurturing artistic resilience. Join us in envisioning a future where CRNY's GI program continues to bridge gaps, build futures, and uplift the heartbeat of New York's creative spirit.")
+        st.write("---")
+
+    with st.container():
+        st.subheader("Where's the Data Coming From?")
+        st.write("The dataset draws information from two primary sources. The first set of data originates from the applications submitted by individuals aspiring to enroll in the CRNY Guaranteed Income (GI) for Artists program. This comprehensive dataset encompasses details from all applicants, irrespective of their final acceptance into the program. The second data source is derived from the Portrait of Artists survey administered by CRNY. This survey aims to comprehend the needs, circumstances, and experiences of artists in New York. These combined datasets provide a rich pool of information to explore and analyze.")
+        nodes, edges, config = data_source_graph()
+        return_value = agraph(nodes=nodes,
+                          edges=edges,
+                          config=config)
+
+        st.write("---")
+
+        st.markdown('<span style="font-size:40px; font-style: italic;"> Let\'s begin our journey</span>', unsafe_allow_html=True)
+        show_image('nyc_artists_2.jpg')
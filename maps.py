@@ -0,0 +1,421 @@
+import hashlib
+import json
+import os
+import shutil
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+from scipy.ndimage import gaussian_filter
+
+from figure_cache import MAX_ENTRIES
+
+# Data for the pydeck map layers. Streamlit sends a Deck as JSON with its data
+# inlined, once per layer, so the layers instead load small files from
+# static/maps/ by URL: a file is written once per data version, fetched once by
+# each browser and shared by every layer and deck that draws it. The hexagon and
+# heatmap aggregation deck.gl does in the browser can also be done here, so the
+# browser only receives the aggregated geometry.
+MAPS_DIR = os.path.join('static', 'maps')
+# A cached figure refers to at most three files or tile directories
+MAX_FILES = 3 * MAX_ENTRIES
+
+EARTH_RADIUS = 6378137.0
+# Web Mercator metres per screen pixel at zoom 0 (deck.gl draws the world 512
+# pixels wide at zoom 0)
+ZOOM0_METRES_PER_PIXEL = 2 * np.pi * EARTH_RADIUS / 512
+
+# deck.gl's default colorRange for the HexagonLayer and HeatmapLayer
+COLOR_RANGE = [[255, 255, 178], [254, 217, 118], [254, 178, 76], [253, 141, 60], [240, 59, 32], [189, 0, 38]]
+
+# Unit pointy-top hexagon, the shape of d3-hexbin's bins, for ColumnLayer vertices
+HEXAGON = [[round(np.sin(a), 6), round(np.cos(a), 6)] for a in np.arange(6) * np.pi / 3]
+
+# The point map's hexagon pyramid: one level per zoom, with hexagons HEX_PIXELS
+# screen pixels in radius at the zoom they are shown at. Closer in, the zoom 9
+# hexagons (about 1.5 km across) are shown larger.
+POINT_ZOOMS = range(5, 10)
+HEX_PIXELS = 10
+# Its tiles are 2**TILE_ZOOM_OFFSET map tiles across, so a view needs about four
+# of them, a few thousand hexagons at most even with a point per respondent
+TILE_ZOOM_OFFSET = 1
+
+
+def touch(path):
+    # Marks a published file or tile directory as just used, so prune() keeps the
+    # ones in use however many others are published. False when it is gone, e.g.
+    # pruned by another server process sharing static/.
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return False
+    except OSError:
+        return os.path.exists(path)  # a read-only static/ is never pruned
+    return True
+
+
+def publish(payload, extension, maps_dir=MAPS_DIR):
+    # Writes bytes under a content-hash name and returns the name; the file is
+    # immutable, so browsers can cache it for good
+    file_name = f'{hashlib.sha1(payload).hexdigest()[:16]}.{extension}'
+    path = os.path.join(maps_dir, file_name)
+    if not touch(path):
+        os.makedirs(maps_dir, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        prune(maps_dir)
+    return file_name
+
+
+def publish_tiles(tiles, maps_dir=MAPS_DIR):
+    # Writes {(z, x, y): bytes} as a z/x/y.json tile directory under a content-hash
+    # name and returns the name
+    digest = hashlib.sha1()
+    for key in sorted(tiles):
+        digest.update(repr(key).encode())
+        digest.update(tiles[key])
+    directory = f'tiles-{digest.hexdigest()[:16]}'
+    path = os.path.join(maps_dir, directory)
+    if not touch(path):
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        for (z, x, y), payload in tiles.items():
+            os.makedirs(os.path.join(tmp_path, str(z), str(x)), exist_ok=True)
+            with open(os.path.join(tmp_path, str(z), str(x), f'{y}.json'), 'wb') as f:
+                f.write(payload)
+        os.makedirs(tmp_path, exist_ok=True)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            # another process published the same tiles first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        prune(maps_dir)
+    return directory
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0  # already deleted by another process
+
+
+def prune(maps_dir=MAPS_DIR, keep=MAX_FILES):
+    # Drops the least recently used files and tile directories beyond `keep`
+    # (see touch())
+    paths = [os.path.join(maps_dir, name) for name in os.listdir(maps_dir) if not name.endswith('.tmp')]
+    if len(paths) > keep:
+        for path in sorted(paths, key=_mtime)[:len(paths) - keep]:
+            try:
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+def publish_records(frame, decimals=5):
+    # Row records of `frame` as compact JSON, which deck.gl loads from a URL
+    # without a custom loader
+    records = frame.round(decimals).to_dict('records')
+    return publish(json.dumps(records, separators=(',', ':')).encode(), 'json')
+
+
+def mercator(lat, lon):
+    x = EARTH_RADIUS * np.radians(lon)
+    y = EARTH_RADIUS * np.log(np.tan(np.pi / 4 + np.radians(lat) / 2))
+    return x, y
+
+
+def inverse_mercator(x, y):
+    return np.degrees(2 * np.arctan(np.exp(y / EARTH_RADIUS)) - np.pi / 2), np.degrees(x / EARTH_RADIUS)
+
+
+def local_scale(lat):
+    # Mercator metres per ground metre at the middle of the data, which is where
+    # deck.gl measures its radius in metres
+    return 1 / np.cos(np.radians((np.min(lat) + np.max(lat)) / 2))
+
+
+def hex_index(x, y, r):
+    # d3-hexbin's bin of each Web Mercator point, for pointy-top hexagons of
+    # radius r: the nearest row, then the nearer of two candidate centres.
+    # Returns integer (column, row) indices.
+    dx, dy = r * np.sqrt(3), r * 1.5
+    py = y / dy
+    pj = np.round(py)
+    odd = pj % 2 != 0
+    px = x / dx - odd / 2
+    pi = np.round(px)
+    py1 = py - pj
+    px1 = px - pi
+    pi2 = pi + np.where(px < pi, -0.5, 0.5)
+    pj2 = pj + np.where(py < pj, -1, 1)
+    px2 = px - pi2
+    py2 = py - pj2
+    switch = (np.abs(py1) * 3 > 1) & (px1 ** 2 + py1 ** 2 > px2 ** 2 + py2 ** 2)
+    pi = np.where(switch, pi2 + np.where(odd, 0.5, -0.5), pi)
+    pj = np.where(switch, pj2, pj)
+    return pi.astype(np.int64), pj.astype(np.int64)
+
+
+def hex_centre(i, j, r):
+    return (i + (j % 2 != 0) / 2) * r * np.sqrt(3), j * r * 1.5
+
+
+def hex_sums(x, y, r, *weights):
+    # Centres of the non-empty bins and the sum of each weights array per bin
+    i, j = hex_index(x, y, r)
+    # rows and columns fit in 25 bits at any zoom deck.gl goes to
+    keys, bins = np.unique((i + 2 ** 24) * 2 ** 25 + (j + 2 ** 24), return_inverse=True)
+    centre_x, centre_y = hex_centre(keys // 2 ** 25 - 2 ** 24, keys % 2 ** 25 - 2 ** 24, r)
+    return centre_x, centre_y, [np.bincount(bins, weights=weight, minlength=len(keys)) for weight in weights]
+
+
+def hex_bins(lat, lon, weight, radius):
+    # The bins of deck.gl's CPU HexagonLayer: pointy-top hexagons of `radius`
+    # metres (centre to corner) laid out by d3-hexbin in Web Mercator. Returns one
+    # row per non-empty bin with its centre, point count and summed weight.
+    lat, lon, weight = (np.asarray(values, dtype=float) for values in (lat, lon, weight))
+    x, y = mercator(lat, lon)
+    x, y, (count, weight) = hex_sums(x, y, radius * local_scale(lat), np.ones(len(x)), weight)
+    lat, lon = inverse_mercator(x, y)
+    return pd.DataFrame({'lat': lat, 'lon': lon, 'count': count.astype(int), 'weight': weight})
+
+
+def hex_levels(lat, lon, weight, zooms=POINT_ZOOMS, hex_pixels=HEX_PIXELS):
+    # {zoom: Web Mercator centres and summed weight of each non-empty hexagon},
+    # with hexagons hex_pixels screen pixels in radius at their zoom. Only the
+    # finest level reads the points; each coarser level (twice the radius) bins
+    # the centres of the level below, weighted by their sums.
+    x, y = mercator(np.asarray(lat, dtype=float), np.asarray(lon, dtype=float))
+    weight = np.asarray(weight, dtype=float)
+    levels = {}
+    for zoom in sorted(zooms, reverse=True):
+        x, y, (weight,) = hex_sums(x, y, hex_pixels * ZOOM0_METRES_PER_PIXEL / 2 ** zoom, weight)
+        levels[zoom] = pd.DataFrame({'x': x, 'y': y, 'count': weight})
+    return levels
+
+
+def tile_index(x, y, zoom):
+    # The slippy-map tile (x, y) holding each Web Mercator point
+    world = 2 * np.pi * EARTH_RADIUS
+    n = 2 ** zoom
+    tile_x = np.clip(np.floor((x / world + 0.5) * n), 0, n - 1).astype(int)
+    tile_y = np.clip(np.floor((0.5 - y / world) * n), 0, n - 1).astype(int)
+    return tile_x, tile_y
+
+
+def hex_tiles(levels, hex_pixels=HEX_PIXELS, offset=TILE_ZOOM_OFFSET):
+    # GeoJSON tiles of the pyramid, {(z, x, y): bytes}. A level's hexagons go in
+    # the tiles of zoom `offset` lower, each in the tile holding its centre, with
+    # a colour quantized over the level's log counts. The count is a top-level
+    # member, as Streamlit's tooltips do not look into `properties`.
+    tiles = {}
+    corners = np.arange(7) * np.pi / 3
+    for zoom, level in levels.items():
+        if not len(level):
+            continue
+        r = hex_pixels * ZOOM0_METRES_PER_PIXEL / 2 ** zoom
+        x, y, count = (level[column].to_numpy() for column in ('x', 'y', 'count'))
+        lat, lon = inverse_mercator(x[:, None] + r * np.sin(corners), y[:, None] + r * np.cos(corners))
+        rings = np.dstack([lon.round(4), lat.round(4)]).tolist()
+        colors = quantize(np.log1p(count))
+        tile_x, tile_y = tile_index(x, y, zoom - offset)
+        features = {}
+        for k in range(len(level)):
+            features.setdefault((zoom - offset, tile_x[k], tile_y[k]), []).append({
+                'type': 'Feature',
+                'geometry': {'type': 'Polygon', 'coordinates': [rings[k]]},
+                'properties': {'color': colors[k]},
+                'count': int(round(count[k])),
+            })
+        for key, items in features.items():
+            tiles[key] = json.dumps({'type': 'FeatureCollection', 'features': items}, separators=(',', ':')).encode()
+    return tiles
+
+
+def tile_bounds(tile_x, tile_y, zoom):
+    # [west, south, east, north] of a slippy-map tile, in degrees
+    world = 2 * np.pi * EARTH_RADIUS
+    n = 2 ** zoom
+    (north, south), (west, east) = inverse_mercator(np.array([tile_x, tile_x + 1]) / n * world - world / 2,
+                                                    world / 2 - np.array([tile_y, tile_y + 1]) / n * world)
+    return west, south, east, north
+
+
+def covering_tiles(points, zoom):
+    # The tiles of `zoom` overlapping the bounding box of (n, 2) lon/lat points
+    (west, south), (east, north) = points.min(axis=0), points.max(axis=0)
+    (x0, x1), (y1, y0) = tile_index(*mercator(np.array([south, north]), np.array([west, east])), zoom)
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+def clip_ring(ring, west, south, east, north):
+    # Sutherland-Hodgman: the part of a closed lon/lat ring inside the box, as a
+    # closed ring, or None. Parts of the ring on either side of a gap outside the
+    # box are joined along its edge, which a fill does not show.
+    points = ring[:-1]
+    for axis, bound, above in ((0, west, True), (0, east, False), (1, south, True), (1, north, False)):
+        inside = points[:, axis] >= bound if above else points[:, axis] <= bound
+        if inside.all():
+            continue
+        previous, previous_inside = np.roll(points, 1, axis=0), np.roll(inside, 1)
+        crossing = inside != previous_inside
+        step = points[:, axis] - previous[:, axis]
+        t = np.divide(bound - previous[:, axis], step, out=np.zeros(len(points)), where=crossing)
+        candidates = np.stack([previous + t[:, None] * (points - previous), points], axis=1)
+        points = candidates[np.column_stack([crossing, inside])]
+        if len(points) < 3:
+            return None
+    return np.vstack([points, points[:1]])
+
+
+def polygon_tiles(levels, members, offset=TILE_ZOOM_OFFSET, decimals=4):
+    # GeoJSON tiles of the polygons of each level, {(z, x, y): bytes}. `levels` is
+    # {zoom: {key: [(outer ring, [hole, ...]), ...]}} and `members` {key: the
+    # feature's members besides its geometry}. A level goes in the tiles of zoom
+    # `offset` lower, as in hex_tiles, and each polygon is clipped to every tile
+    # it overlaps, so semi-transparent fills do not overlap at tile edges.
+    tiles = {}
+    for zoom, polygons in levels.items():
+        features = {}
+        for key, parts in polygons.items():
+            clipped = {}
+            for outer, holes in parts:
+                for tile in covering_tiles(outer, zoom - offset):
+                    bounds = tile_bounds(*tile, zoom - offset)
+                    rings = [clip_ring(ring, *bounds) for ring in [outer, *holes]]
+                    if rings[0] is not None:
+                        clipped.setdefault(tile, []).append(
+                            [ring.round(decimals).tolist() for ring in rings if ring is not None])
+            for (tile_x, tile_y), polygon in clipped.items():
+                features.setdefault((zoom - offset, tile_x, tile_y), []).append({
+                    'type': 'Feature',
+                    'geometry': {'type': 'MultiPolygon', 'coordinates': polygon},
+                    **members[key],
+                })
+        for key, items in features.items():
+            tiles[key] = json.dumps({'type': 'FeatureCollection', 'features': items}, separators=(',', ':')).encode()
+    return tiles
+
+
+def line_tiles(levels, offset=TILE_ZOOM_OFFSET, decimals=4):
+    # GeoJSON tiles of the lines of each level, {zoom: [(n, 2) lon/lat lines]}. A
+    # tile gets the runs of segments that overlap it, whole; drawn opaque, the
+    # segments that cross into the next tile are not seen twice.
+    tiles = {}
+    for zoom, lines in levels.items():
+        features = {}
+        for line in lines:
+            start, end = line[:-1], line[1:]
+            low, high = np.minimum(start, end), np.maximum(start, end)
+            for tile_x, tile_y in covering_tiles(line, zoom - offset):
+                west, south, east, north = tile_bounds(tile_x, tile_y, zoom - offset)
+                overlaps = (low[:, 0] <= east) & (high[:, 0] >= west) & (low[:, 1] <= north) & (high[:, 1] >= south)
+                edges = np.flatnonzero(np.diff(np.r_[0, overlaps.astype(int), 0]))
+                for first, last in zip(edges[::2], edges[1::2]):
+                    features.setdefault((zoom - offset, tile_x, tile_y), []).append({
+                        'type': 'Feature',
+                        'geometry': {'type': 'LineString', 'coordinates': line[first:last + 1].round(decimals).tolist()},
+                        'properties': {},
+                    })
+        for key, items in features.items():
+            tiles[key] = json.dumps({'type': 'FeatureCollection', 'features': items}, separators=(',', ':')).encode()
+    return tiles
+
+
+def tile_settings(zooms, extent):
+    # The TileLayer settings that read a pyramid with a level per zoom in `zooms`:
+    # tiles of zoom offset lower are 2**offset times the usual 512 pixels, and
+    # outside the data's [west, south, east, north] extent nothing is requested
+    return {
+        'min_zoom': min(zooms) - TILE_ZOOM_OFFSET,
+        'max_zoom': max(zooms) - TILE_ZOOM_OFFSET,
+        'tile_size': 512 * 2 ** TILE_ZOOM_OFFSET,
+        'extent': [float(bound) for bound in extent],
+    }
+
+
+def publish_hex_tiles(lat, lon, weight, zooms=POINT_ZOOMS):
+    # Bins the points into the pyramid and publishes its tiles. Returns the tile
+    # directory and the TileLayer settings that read it.
+    levels = hex_levels(lat, lon, weight, zooms)
+    directory = publish_tiles(hex_tiles(levels))
+    return directory, tile_settings(zooms, [np.min(lon), np.min(lat), np.max(lon), np.max(lat)])
+
+
+def quantize(values, colors=COLOR_RANGE):
+    # d3's quantize scale over the values' extent, as deck.gl colours hexagons
+    values = np.asarray(values, dtype=float)
+    low, high = values.min(), values.max()
+    if high <= low:
+        return [colors[0]] * len(values)
+    index = np.minimum(((values - low) / (high - low) * len(colors)).astype(int), len(colors) - 1)
+    return [colors[k] for k in index]
+
+
+def hex_columns(bins, elevation_range=(0, 1000), elevation_scale=1):
+    # ColumnLayer rows for the bins: elevation from the summed weight and colour
+    # from the point count, scaled over their extents as in the HexagonLayer
+    weight = bins['weight'].to_numpy(dtype=float)
+    low, high = weight.min(), weight.max()
+    share = (weight - low) / (high - low) if high > low else np.zeros(len(weight))
+    columns = bins[['lat', 'lon']].copy()
+    elevation = (elevation_range[0] + share * (elevation_range[1] - elevation_range[0])) * elevation_scale
+    columns['elevation'] = elevation.round(1)
+    columns['color'] = quantize(bins['count'])
+    return columns
+
+
+def heat_image(lat, lon, weight, radius_pixels, zoom, threshold=0.05, mean=False, resolution=16):
+    # The HeatmapLayer's picture at `zoom`, rendered once: a Gaussian kernel of
+    # `radius_pixels` screen pixels around each point, summed (or averaged, for
+    # mean=True), coloured along COLOR_RANGE and faded out below `threshold` of
+    # the maximum. Returns the RGBA image and its [west, south, east, north] bounds
+    # for a BitmapLayer; `resolution` is raster cells per kernel radius.
+    lat, lon, weight = (np.asarray(values, dtype=float) for values in (lat, lon, weight))
+    x, y = mercator(lat, lon)
+    radius = radius_pixels * ZOOM0_METRES_PER_PIXEL / 2 ** zoom
+    cell = radius / resolution
+    west, east = x.min() - radius, x.max() + radius
+    south, north = y.min() - radius, y.max() + radius
+    shape = (int(np.ceil((north - south) / cell)), int(np.ceil((east - west) / cell)))
+    row = np.clip(((north - y) / cell).astype(int), 0, shape[0] - 1)
+    col = np.clip(((x - west) / cell).astype(int), 0, shape[1] - 1)
+
+    # deck.gl's kernel reaches about zero at the radius
+    sigma = resolution / 3
+    weighted, density = np.zeros(shape), np.zeros(shape)
+    np.add.at(weighted, (row, col), weight)
+    np.add.at(density, (row, col), 1)
+    weighted = gaussian_filter(weighted, sigma, mode='constant', truncate=3)
+    density = gaussian_filter(density, sigma, mode='constant', truncate=3)
+
+    if mean:
+        # the mean is the same right up to the kernel's edge, so the fading uses
+        # how much of one point's peak density a cell is covered by
+        value = np.divide(weighted, density, out=np.zeros(shape), where=density > 1e-9)
+        value = value / value.max() * np.minimum(density * 2 * np.pi * sigma ** 2, 1)
+    else:
+        value = weighted / weighted.max()
+
+    colors = np.array(COLOR_RANGE, dtype=float)
+    position = value * (len(colors) - 1)
+    lower = np.minimum(position.astype(int), len(colors) - 2)
+    blend = (position - lower)[..., None]
+    rgb = colors[lower] * (1 - blend) + colors[lower + 1] * blend
+    alpha = np.clip(value / threshold, 0, 1) * 255 if threshold > 0 else (value > 0) * 255.0
+    image = Image.fromarray(np.dstack([rgb, alpha]).round().astype(np.uint8), 'RGBA')
+
+    (south_lat, north_lat), (west_lon, east_lon) = inverse_mercator(np.array([west, east]), np.array([south, north]))
+    return image, [west_lon, south_lat, east_lon, north_lat]
+
+
+def publish_image(image):
+    buffer = BytesIO()
+    image.save(buffer, format='PNG', optimize=True)
+    return publish(buffer.getvalue(), 'png')
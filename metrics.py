@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+import tracemalloc
+from collections import namedtuple
+from contextlib import contextmanager
+
+# Wall time, CPU time and allocations of each section of a rerun (data load,
+# chapter, figure build, chart call), kept per rerun for the ?debug=1 panel and
+# summed per process for Prometheus. The totals are written in the Prometheus
+# text format to static/metrics.prom, which Streamlit serves as text/plain at
+# /app/static/metrics.prom for scraping.
+METRICS_PATH = os.path.join('static', 'metrics.prom')
+WRITE_SECONDS = 15
+
+# Upper bounds of the wall time histogram, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# tracemalloc slows every allocation down, so allocated bytes are only measured
+# when the server is started with TRACE_ALLOCATIONS=1. They are process-wide, so
+# concurrent reruns show up in each other's numbers.
+if os.environ.get('TRACE_ALLOCATIONS') == '1' and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+# start is seconds since the rerun began; depth is the nesting level
+Span = namedtuple('Span', ['name', 'depth', 'start', 'wall', 'cpu', 'allocated'])
+
+# What the large elements of a rerun send to the browser: when a rerun is started
+# with payloads=True (the ?debug=1 panel), each chart records the size of its
+# serialized spec (see figure_cache.show_figure) and each chapter image the size
+# of its markup, under a label such as the figure builder's name. kind is the
+# chart library or element type.
+Payload = namedtuple('Payload', ['label', 'kind', 'bytes'])
+
+# The script of one session runs in one thread, so each thread holds its own rerun
+_local = threading.local()
+
+
+def start_rerun(payloads=False):
+    _local.spans = []
+    _local.payloads = [] if payloads else None
+    # depth 0 is the whole rerun, added by finish_rerun()
+    _local.depth = 1
+    _local.allocated = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+    _local.cpu = time.thread_time()
+    _local.started = time.perf_counter()
+
+
+@contextmanager
+def span(name):
+    spans = getattr(_local, 'spans', None)
+    if spans is None:
+        # outside a dashboard rerun (e.g. the benchmarks) nothing is recorded
+        yield
+        return
+    depth = _local.depth
+    _local.depth += 1
+    allocated = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        if allocated is not None:
+            allocated = tracemalloc.get_traced_memory()[0] - allocated
+        spans.append(Span(name, depth, wall - _local.started, time.perf_counter() - wall,
+                          time.thread_time() - cpu, allocated))
+        _local.depth = depth
+
+
+def record_payload(label, kind, size):
+    payloads = getattr(_local, 'payloads', None)
+    if payloads is not None:
+        payloads.append(Payload(label, kind, size))
+
+
+def rerun_payloads():
+    # This rerun's Payloads so far, largest first, or None when not counted
+    payloads = getattr(_local, 'payloads', None)
+    if payloads is None:
+        return None
+    return sorted(payloads, key=lambda p: -p.bytes)
+
+
+class Registry:
+    # Per-section totals over every rerun of the process
+
+    def __init__(self):
+        self.sections = {}
+        self.reruns = 0
+        self.written = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, spans):
+        with self._lock:
+            self.reruns += 1
+            for s in spans:
+                totals = self.sections.setdefault(s.name, {'count': 0, 'wall': 0.0, 'cpu': 0.0, 'allocated': 0,
+                                                           'buckets': [0] * len(BUCKETS)})
+                totals['count'] += 1
+                totals['wall'] += s.wall
+                totals['cpu'] += s.cpu
+                totals['allocated'] += s.allocated or 0
+                for i, bound in enumerate(BUCKETS):
+                    if s.wall <= bound:
+                        totals['buckets'][i] += 1
+
+    def render(self):
+        with self._lock:
+            sections = {name: dict(totals, buckets=list(totals['buckets'])) for name, totals in self.sections.items()}
+            reruns = self.reruns
+        lines = ['# HELP dashboard_reruns_total Completed dashboard reruns.',
+                 '# TYPE dashboard_reruns_total counter',
+                 f'dashboard_reruns_total {reruns}',
+                 '# HELP dashboard_section_seconds Wall time of each dashboard section.',
+                 '# TYPE dashboard_section_seconds histogram']
+        for name, totals in sorted(sections.items()):
+            for bound, count in zip(BUCKETS, totals['buckets']):
+                lines.append(f'dashboard_section_seconds_bucket{{section="{name}",le="{bound}"}} {count}')
+            lines.append(f'dashboard_section_seconds_bucket{{section="{name}",le="+Inf"}} {totals["count"]}')
+            lines.append(f'dashboard_section_seconds_sum{{section="{name}"}} {totals["wall"]:.6f}')
+            lines.append(f'dashboard_section_seconds_count{{section="{name}"}} {totals["count"]}')
+        lines += ['# HELP dashboard_section_cpu_seconds_total CPU time of each dashboard section.',
+                  '# TYPE dashboard_section_cpu_seconds_total counter']
+        lines += [f'dashboard_section_cpu_seconds_total{{section="{name}"}} {totals["cpu"]:.6f}'
+                  for name, totals in sorted(sections.items())]
+        if tracemalloc.is_tracing():
+            lines += ['# HELP dashboard_section_allocated_bytes_total Net bytes allocated by each dashboard section.',
+                      '# TYPE dashboard_section_allocated_bytes_total counter']
+            lines += [f'dashboard_section_allocated_bytes_total{{section="{name}"}} {totals["allocated"]}'
+                      for name, totals in sorted(sections.items())]
+
+        from figure_cache import figure_cache
+        stats = figure_cache().stats()
+        lines += ['# HELP dashboard_figure_cache_entries Figure specs in the shared cache.',
+                  '# TYPE dashboard_figure_cache_entries gauge',
+                  f'dashboard_figure_cache_entries {stats["entries"]}',
+                  '# HELP dashboard_figure_cache_bytes Size of the cached figure specs.',
+                  '# TYPE dashboard_figure_cache_bytes gauge',
+                  f'dashboard_figure_cache_bytes {stats["bytes"]}']
+        for name in ('hits', 'misses', 'evictions'):
+            lines += [f'# HELP dashboard_figure_cache_{name}_total Figure cache {name}.',
+                      f'# TYPE dashboard_figure_cache_{name}_total counter',
+                      f'dashboard_figure_cache_{name}_total {stats[name]}']
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path=METRICS_PATH, every=WRITE_SECONDS):
+        # At most once per `every` seconds, so reruns do not all rewrite the file
+        now = time.monotonic()
+        with self._lock:
+            if now - self.written < every:
+                return
+            self.written = now
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                f.write(self.render())
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # read-only deployments keep the totals in memory only
+
+
+registry = Registry()
+
+
+def finish_rerun():
+    # Adds this rerun's spans to the process totals; returns them, in start order
+    spans = getattr(_local, 'spans', None)
+    if spans is None:
+        return []
+    allocated = _local.allocated
+    if allocated is not None and tracemalloc.is_tracing():
+        allocated = tracemalloc.get_traced_memory()[0] - allocated
+    spans = [Span('rerun', 0, 0.0, time.perf_counter() - _local.started, time.thread_time() - _local.cpu, allocated),
+             *sorted(spans, key=lambda s: s.start)]
+    _local.spans = None
+    registry.record(spans)
+    registry.write()
+    return spans
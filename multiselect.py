@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from data_loader import MULTISELECT_QUESTIONS, slot_columns
+
+
+class MultiSelect:
+    # Respondent x option indicator matrix (CSR) for one multi-select question
+
+    def __init__(self, matrix, options):
+        self.matrix = matrix
+        self.options = list(options)
+
+    @classmethod
+    def from_slots(cls, df, columns, options=None):
+        if options is None:
+            # every distinct answer in the slots, most frequent first
+            answers = pd.concat([df[column].astype(object) for column in columns]).dropna()
+            options = [str(option) for option in answers.value_counts().index]
+
+        rows, cols = [], []
+        for column in columns:
+            codes = pd.Categorical(df[column], categories=options).codes
+            picked = np.flatnonzero(codes >= 0)
+            rows.append(picked)
+            cols.append(codes[picked])
+        rows = np.concatenate(rows) if rows else np.array([], dtype=np.int64)
+        cols = np.concatenate(cols) if cols else np.array([], dtype=np.int64)
+
+        matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)),
+                                   shape=(len(df), len(options)))
+        # the same option picked in two slots still counts once
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        return cls(matrix, options)
+
+    @property
+    def respondents(self):
+        return self.matrix.shape[0]
+
+    def totals(self):
+        return pd.Series(np.asarray(self.matrix.sum(axis=0)).ravel(), index=self.options, name='count')
+
+    def filtered_totals(self, rows):
+        # rows is a boolean mask over respondents, e.g. df['p36_community'] == 'Rural'
+        weights = np.asarray(rows, dtype=np.int32)
+        return pd.Series(self.matrix.T @ weights, index=self.options, name='count')
+
+    def group_totals(self, groups, n_groups):
+        # groups x options totals; groups holds each respondent's group code, -1 for none
+        picked = np.flatnonzero(groups >= 0)
+        members = sparse.csr_matrix((np.ones(len(picked), dtype=np.int32), (groups[picked], picked)),
+                                    shape=(n_groups, self.respondents))
+        return (members @ self.matrix).toarray()
+
+    def cooccurrence(self, rows=None):
+        # options x options counts of respondents picking both; the diagonal holds the totals
+        matrix = self.matrix if rows is None else self.matrix[np.asarray(rows, dtype=bool)]
+        counts = (matrix.T @ matrix).toarray()
+        return pd.DataFrame(counts, index=self.options, columns=self.options)
+
+
+def build_multiselect(df, questions=MULTISELECT_QUESTIONS):
+    # One MultiSelect per configured question whose slot columns are in the frame
+    result = {}
+    for name, prefix in questions.items():
+        columns = slot_columns(df.columns, prefix)
+        if columns:
+            result[name] = MultiSelect.from_slots(df, columns)
+    return result
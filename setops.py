@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+# Region histograms have 2**n entries, so keep n small enough to stay dense
+MAX_SETS = 20
+
+
+def mask_dtype(n_sets):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if n_sets <= np.iinfo(dtype).bits:
+            return dtype
+    return np.uint64
+
+
+def multiselect_masks(df, columns, options, other=None):
+    # One bitmask per respondent: bit i is set when options[i] was picked in any
+    # of the slot columns (e.g. p30_employimpact1..8). An answer that is not one
+    # of the options sets the bit of the option `other`, if given, or none.
+    dtype = mask_dtype(len(options))
+    other_bit = 1 << options.index(other) if other in options else 0
+    bits = np.append(np.left_shift(1, np.arange(len(options))), [other_bit, 0]).astype(dtype)
+    masks = np.zeros(len(df), dtype=dtype)
+    for column in columns:
+        codes = pd.Categorical(df[column], categories=options).codes.astype(np.int64)
+        codes[(codes < 0) & df[column].notna().to_numpy()] = len(options)
+        masks |= bits[codes]
+    return masks
+
+
+def flag_masks(df, columns, positive='Yes'):
+    # Same packing for a group of yes/no columns, one bit per column
+    dtype = mask_dtype(len(columns))
+    masks = np.zeros(len(df), dtype=dtype)
+    for bit, column in enumerate(columns):
+        masks |= (df[column].to_numpy() == positive).astype(dtype) << dtype(bit)
+    return masks
+
+
+def region_counts(masks, n_sets):
+    # Exact disjoint region sizes: entry m counts respondents whose membership is
+    # exactly the sets in m (entry 0 is respondents in none of them)
+    if n_sets > MAX_SETS:
+        raise ValueError(f'{n_sets} sets is too many for a dense region histogram (max {MAX_SETS})')
+    return np.bincount(masks.astype(np.int64), minlength=1 << n_sets)
+
+
+def project_regions(regions, keep):
+    # Marginalizes a region histogram onto the sets at bit positions `keep`,
+    # in that order, so any Venn can be cut from one stored histogram
+    masks = np.arange(len(regions))
+    projected = np.zeros(len(regions), dtype=np.int64)
+    for i, bit in enumerate(keep):
+        projected |= ((masks >> bit) & 1) << i
+    return np.bincount(projected, weights=regions, minlength=1 << len(keep)).astype(np.int64)
+
+
+def embed_regions(regions, positions, n_sets):
+    # The reverse of project_regions: moves set i to bit positions[i] of a histogram
+    # over n_sets sets, e.g. to line up histograms built over different options
+    if n_sets > MAX_SETS:
+        raise ValueError(f'{n_sets} sets is too many for a dense region histogram (max {MAX_SETS})')
+    masks = np.arange(len(regions))
+    moved = np.zeros(len(regions), dtype=np.int64)
+    for i, bit in enumerate(positions):
+        moved |= ((masks >> i) & 1) << bit
+    return np.bincount(moved, weights=regions, minlength=1 << n_sets).astype(np.int64)
+
+
+def set_totals(regions):
+    # Respondents in each set, from the exact region histogram
+    masks = np.arange(len(regions))
+    n_sets = len(regions).bit_length() - 1
+    return np.array([np.asarray(regions)[(masks >> bit) & 1 == 1].sum() for bit in range(n_sets)], dtype=np.int64)
+
+
+def venn_subsets(regions):
+    # matplotlib_venn orders subsets as '10', '01', '11' (or '100', '010', '110',
+    # '001', ...), which is exactly the region masks 1..2**n - 1
+    return tuple(int(count) for count in regions[1:])
+
+
+def intersection_sizes(regions):
+    # Inclusive counts: entry m is the number of respondents in at least the sets in m
+    sizes = np.array(regions, dtype=np.int64)
+    n_sets = len(sizes).bit_length() - 1
+    masks = np.arange(len(sizes))
+    for bit in range(n_sets):
+        without = (masks & (1 << bit)) == 0
+        sizes[without] += sizes[masks[without] | (1 << bit)]
+    return sizes
+
+
+def upset_table(regions, labels, top=None, include_empty=False):
+    # One row per non-empty exact intersection, largest first
+    masks = np.flatnonzero(regions)
+    if not include_empty:
+        masks = masks[masks != 0]
+    table = pd.DataFrame({
+        'mask': masks,
+        'count': np.asarray(regions)[masks],
+        'degree': [bin(mask).count('1') for mask in masks],
+    })
+    table['sets'] = [[label for bit, label in enumerate(labels) if mask >> bit & 1] for mask in masks]
+    table = table.sort_values(['count', 'degree'], ascending=[False, True], ignore_index=True)
+    if top is not None:
+        table = table.head(top)
+    return table
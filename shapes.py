@@ -0,0 +1,262 @@
+import os
+
+import numpy as np
+
+from maps import ZOOM0_METRES_PER_PIXEL, line_tiles, mercator, polygon_tiles, publish_tiles, quantize, tile_settings
+
+# New York county outlines for the choropleth map, simplified once at build time
+# and bundled as SHAPES_PATH, so the dashboard needs neither the shapefile nor
+# pyshp. `python shapes.py` rebuilds them from the Census cartographic boundary
+# file that ships with plotly-geo.
+#
+# The outlines are stored as a topology, like TopoJSON: each border between two
+# counties is one arc, and a county's rings are lists of arcs. Arcs are
+# simplified (Douglas-Peucker) rather than rings, so neighbouring counties keep
+# sharing the same simplified border and no gaps or overlaps open up between
+# them. Each point records the lowest zoom that needs it, so every level of
+# detail is read from the one set of points.
+SHAPES_PATH = os.path.join('data', 'ny_county_shapes.npz')
+SOURCE_SHAPEFILE = 'cb_2016_us_county_500k'
+STATE_FIPS = '36'
+
+# One level of detail per zoom; a level drops the points closer than a screen
+# pixel to its simplified line
+SHAPE_ZOOMS = range(4, 10)
+
+# Coordinates are stored as 16-bit steps across the state's bounding box, about
+# 10 metres
+QUANTIZATION = 2 ** 16
+
+# Fill of the counties without respondents
+EMPTY_COLOR = [220, 220, 220]
+
+
+def read_counties(path, state=STATE_FIPS):
+    # [(GEOID, name, [ring, ...])] of one state's counties from the shapefile, with
+    # rings as (n, 2) lon/lat arrays
+    import shapefile
+
+    counties = []
+    with shapefile.Reader(path, encoding='latin-1') as reader:
+        for record, shape in zip(reader.iterRecords(fields=['STATEFP', 'GEOID', 'NAME']), reader.iterShapes()):
+            if record['STATEFP'] != state:
+                continue
+            points = np.array(shape.points)
+            rings = np.split(points, shape.parts[1:])
+            counties.append((record['GEOID'], record['NAME'], rings))
+    return sorted(counties, key=lambda county: county[0])
+
+
+def signed_area(ring):
+    x, y = ring[:, 0], ring[:, 1]
+    return (np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)) / 2
+
+
+def quantize_rings(counties, steps=QUANTIZATION):
+    # Snaps every ring to the integer grid and drops repeated and closing points;
+    # shared borders then hold exactly equal points. Returns the grid's
+    # [west, south, east, north] and the counties with rings as (point keys,
+    # is-hole) pairs, where a key is x * steps + y.
+    points = np.concatenate([ring for _, _, rings in counties for ring in rings])
+    (west, south), (east, north) = points.min(axis=0), points.max(axis=0)
+    scale = np.array([east - west, north - south]) / (steps - 1)
+    quantized = []
+    for geoid, name, rings in counties:
+        county_rings = []
+        for ring in rings:
+            grid = np.round((ring - [west, south]) / scale).astype(np.int64)
+            keys = grid[:, 0] * steps + grid[:, 1]
+            keys = keys[np.r_[True, keys[1:] != keys[:-1]]]
+            if keys[0] == keys[-1]:
+                keys = keys[:-1]
+            if len(keys) >= 3:
+                # shapefiles wind outer rings clockwise and holes counter-clockwise
+                county_rings.append((keys, signed_area(grid) > 0))
+        quantized.append((geoid, name, county_rings))
+    return [float(west), float(south), float(east), float(north)], quantized
+
+
+def junctions(rings):
+    # Points where three or more edges meet (the ends of shared borders), or where
+    # a ring touches itself
+    neighbours = {}
+    for keys, _ in rings:
+        for a, b in zip(keys, np.roll(keys, -1)):
+            neighbours.setdefault(a, set()).add(b)
+            neighbours.setdefault(b, set()).add(a)
+    return {key for key, around in neighbours.items() if len(around) != 2}
+
+
+def cut_arcs(counties):
+    # Splits the rings at the junctions into arcs, stored once however many rings
+    # use them. Returns the arcs (tuples of point keys) and, per county, its rings
+    # as (arc references, is-hole), where ~i is arc i reversed.
+    joints = junctions([ring for _, _, rings in counties for ring in rings])
+    arcs, arc_ids, topology = [], {}, []
+    for _, _, rings in counties:
+        county_rings = []
+        for keys, hole in rings:
+            cuts = [i for i, key in enumerate(keys.tolist()) if key in joints]
+            # a ring with no junctions is one closed arc, started at its lowest
+            # point so the rings of two counties that share it agree
+            start = cuts[0] if cuts else int(np.argmin(keys))
+            keys = np.roll(keys, -start).tolist()
+            cuts = [i - start for i in cuts] or [0]
+            references = []
+            for a, b in zip(cuts, cuts[1:] + [len(keys)]):
+                arc = tuple(keys[a:b + 1] if b < len(keys) else keys[a:] + keys[:1])
+                forward, backward = arc, arc[::-1]
+                canonical = min(forward, backward)
+                if canonical not in arc_ids:
+                    arc_ids[canonical] = len(arcs)
+                    arcs.append(canonical)
+                references.append(arc_ids[canonical] if forward == canonical else ~arc_ids[canonical])
+            county_rings.append((references, hole))
+        topology.append(county_rings)
+    return arcs, topology
+
+
+def importance(x, y):
+    # Douglas-Peucker removal distance of each point: the point is kept for any
+    # tolerance below it. A point never outlasts the one that split its span, so
+    # the points kept at a tolerance are exactly Douglas-Peucker's result.
+    n = len(x)
+    result = np.full(n, np.inf)
+    if n < 3:
+        return result
+    if x[0] == x[-1] and y[0] == y[-1]:
+        # a closed arc is split at its farthest point from the start first
+        far = int(np.argmax(np.hypot(x - x[0], y - y[0])))
+        stack = [(0, far, np.inf), (far, n - 1, np.inf)]
+    else:
+        stack = [(0, n - 1, np.inf)]
+    while stack:
+        first, last, limit = stack.pop()
+        if last - first < 2:
+            continue
+        dx, dy = x[last] - x[first], y[last] - y[first]
+        span_x, span_y = x[first + 1:last] - x[first], y[first + 1:last] - y[first]
+        length = np.hypot(dx, dy)
+        if length > 0:
+            distance = np.abs(span_x * dy - span_y * dx) / length
+        else:
+            distance = np.hypot(span_x, span_y)
+        k = int(np.argmax(distance))
+        split = first + 1 + k
+        result[split] = min(distance[k], limit)
+        stack += [(first, split, result[split]), (split, last, result[split])]
+    return result
+
+
+def build_shapes(path, zooms=SHAPE_ZOOMS, steps=QUANTIZATION):
+    # The arrays stored in SHAPES_PATH
+    bbox, counties = quantize_rings(read_counties(path), steps)
+    arcs, topology = cut_arcs(counties)
+    west, south, east, north = bbox
+    scale = np.array([east - west, north - south]) / (steps - 1)
+    tolerances = ZOOM0_METRES_PER_PIXEL / 2.0 ** np.array(zooms)
+
+    arc_points, arc_zooms, offsets = [], [], [0]
+    for arc in arcs:
+        keys = np.array(arc)
+        grid = np.column_stack([keys // steps, keys % steps])
+        lon, lat = (grid * scale + [west, south]).T
+        # the lowest zoom whose tolerance the point's removal distance exceeds;
+        # points no zoom needs are not stored
+        point_zooms = np.searchsorted(-tolerances, -importance(*mercator(lat, lon)))
+        keep = point_zooms < len(zooms)
+        arc_points.append(grid[keep])
+        arc_zooms.append(np.asarray(zooms)[point_zooms[keep]])
+        offsets.append(offsets[-1] + int(keep.sum()))
+
+    rings = [ring for county_rings in topology for ring in county_rings]
+    return {
+        'bbox': np.array(bbox),
+        'zooms': np.asarray(zooms),
+        'geoid': np.array([geoid for geoid, _, _ in counties]),
+        'name': np.array([name for _, name, _ in counties]),
+        'arc_points': np.concatenate(arc_points).astype(np.uint16),
+        'arc_zooms': np.concatenate(arc_zooms).astype(np.uint8),
+        'arc_offsets': np.array(offsets, dtype=np.int32),
+        'ring_arcs': np.array([reference for references, _ in rings for reference in references], dtype=np.int32),
+        'ring_offsets': np.cumsum([0] + [len(references) for references, _ in rings], dtype=np.int32),
+        'ring_holes': np.array([hole for _, hole in rings]),
+        'county_offsets': np.cumsum([0] + [len(county_rings) for county_rings in topology], dtype=np.int32),
+    }
+
+
+def load_shapes(path=SHAPES_PATH):
+    with np.load(path) as shapes:
+        return {name: shapes[name] for name in shapes.files}
+
+
+def level_arcs(shapes, zoom):
+    # Each arc's (n, 2) lon/lat points at `zoom`; beyond the finest level, that
+    # level's points
+    west, south, east, north = shapes['bbox']
+    scale = np.array([east - west, north - south]) / (QUANTIZATION - 1)
+    keep = shapes['arc_zooms'] <= zoom
+    points = shapes['arc_points'] * scale + [west, south]
+    offsets = shapes['arc_offsets']
+    return [points[a:b][keep[a:b]] for a, b in zip(offsets[:-1], offsets[1:])]
+
+
+def county_polygons(shapes, zoom, arcs=None):
+    # {GEOID: [(outer ring, [hole, ...]), ...]} at `zoom`, rings as closed (n, 2)
+    # lon/lat arrays; rings simplified down to a line are left out
+    arcs = level_arcs(shapes, zoom) if arcs is None else arcs
+    ring_arcs, ring_offsets = shapes['ring_arcs'], shapes['ring_offsets']
+    polygons = {}
+    for county, geoid in enumerate(shapes['geoid']):
+        parts = []
+        for r in range(shapes['county_offsets'][county], shapes['county_offsets'][county + 1]):
+            pieces = [arcs[i] if i >= 0 else arcs[~i][::-1] for i in ring_arcs[ring_offsets[r]:ring_offsets[r + 1]]]
+            # consecutive arcs share their end points
+            ring = np.concatenate([pieces[0]] + [piece[1:] for piece in pieces[1:]])
+            if len(ring) < 4:
+                continue
+            if shapes['ring_holes'][r]:
+                if parts:
+                    parts[-1][1].append(ring)
+            else:
+                parts.append((ring, []))
+        polygons[str(geoid)] = parts
+    return polygons
+
+
+def publish_choropleth(counts, shapes=None):
+    # Publishes the county fills, coloured by `counts` (indexed by GEOID) on a log
+    # scale, and the borders, which depend on nothing else and are published once.
+    # Returns the fill and border tile directories and their TileLayer settings.
+    shapes = load_shapes() if shapes is None else shapes
+    counts = counts.reindex(shapes['geoid']).fillna(0).astype(int)
+    colors = dict(zip(counts.index[counts > 0], quantize(np.log(counts[counts > 0]))))
+    members = {geoid: {'properties': {'color': colors.get(geoid, EMPTY_COLOR)}, 'name': f'{name} County',
+                       'count': int(count)}
+               for geoid, name, count in zip(shapes['geoid'], shapes['name'], counts)}
+
+    arcs = {zoom: level_arcs(shapes, zoom) for zoom in shapes['zooms']}
+    polygons = {zoom: county_polygons(shapes, zoom, arcs[zoom]) for zoom in shapes['zooms']}
+    fills = publish_tiles(polygon_tiles(polygons, members))
+    borders = publish_tiles(line_tiles(arcs))
+    return fills, borders, tile_settings(shapes['zooms'], shapes['bbox'])
+
+
+if __name__ == '__main__':
+    import argparse
+
+    import _plotly_geo
+
+    parser = argparse.ArgumentParser(description='Build the simplified county outlines for the choropleth map.')
+    parser.add_argument('--shapefile', default=os.path.join(os.path.dirname(_plotly_geo.__file__), 'package_data',
+                                                             SOURCE_SHAPEFILE),
+                        help="Census county shapefile (default: plotly-geo's copy)")
+    parser.add_argument('--out', default=SHAPES_PATH)
+    args = parser.parse_args()
+
+    shapes = build_shapes(args.shapefile)
+    np.savez_compressed(args.out, **shapes)
+    counts = [sum(len(ring) for ring in level_arcs(shapes, zoom)) for zoom in shapes['zooms']]
+    print(f"Wrote {args.out} ({len(shapes['geoid'])} counties, {len(shapes['arc_offsets']) - 1} arcs, "
+          f"{os.path.getsize(args.out)} bytes); points per zoom: "
+          + ', '.join(f'{zoom}: {count}' for zoom, count in zip(shapes['zooms'], counts)))
@@ -0,0 +1,268 @@
+import logging
+import threading
+import time
+
+import pandas as pd
+import streamlit as st
+
+from data_loader import SURVEY_CSV, freeze_frame, load_survey
+from aggregates import AGGREGATES_PATH, GROUP_COLUMNS, group_table, load_aggregates, value_counts, write_aggregates
+from incremental import refresh_aggregates
+from bitmap_index import BitmapIndex
+from figure_cache import COMPACT_SPECS, cached_figures, figure_cache, fingerprint, show_figure
+from images import build_derivatives, picture_html
+from metrics import record_payload, registry, rerun_payloads, span
+
+# Helpers used by more than one chapter page. Everything expensive here is cached
+# once per server process, so switching chapters never reloads the data.
+
+# The dashboard's pages, in order: id -> (label, module). Each page is a module
+# with a function of the same name; main.py shows one per rerun and export.py
+# writes all of them out as static HTML.
+CHAPTERS = {
+    'intro': ("Introduction", 'intro'),
+    'who': ("1. Who Are They?", 'chapter1'),
+    'challenges': ("2. Challenges", 'chapter2'),
+    'pandemic': ("3. Pandemic", 'chapter3'),
+    'support': ("4. Support", 'chapter4'),
+    'impact': ("5. GI Impact", 'chapter5'),
+    'reflections': ("6. Reflections", 'chapter6'),
+}
+
+# Dataframe reading and pre-processing
+download_link = 'https://drive.google.com/file/d/1_0bQfQQLhOGLLUQqBbx9NkyO-ihLSSuz/view?usp=drive_link'
+
+# Only the columns the chapters use are parsed, and the parsed frame is kept in an
+# Arrow sidecar under .cache/ so reruns skip the CSV parse entirely. The frame is
+# loaded once per server process (memory-mapped) and shared read-only by every
+# session, instead of being copied out of st.cache_data on each call.
+@st.cache_resource
+def get_survey():
+    return freeze_frame(load_survey(memory_map=True))
+
+# Every chart is drawn from the precomputed aggregates (python aggregates.py).
+# One store per server process holds them; a background thread merges survey
+# rows appended since (see incremental.py), so a new wave costs a read of the
+# new rows only. Sessions pick up a new version on their next rerun (see
+# check_for_new_rows()); Streamlit has no public API for the server to rerun them.
+REFRESH_SECONDS = 30
+
+class AggregateStore:
+
+    def __init__(self):
+        self.aggregates = None
+        self.version = 0
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        # True when new rows were merged (or the aggregates were rebuilt)
+        with self._lock:
+            aggregates, added = refresh_aggregates(self.aggregates or load_aggregates())
+            if aggregates is None:
+                raise FileNotFoundError(f'no survey data: neither {AGGREGATES_PATH} nor {SURVEY_CSV} was found')
+            if added == 0 and self.aggregates is not None:
+                return False
+            if added != 0:
+                try:
+                    write_aggregates(aggregates)
+                except OSError:
+                    pass  # read-only deployments just keep the result in memory
+            # figure specs are cached under this hash (see figure_cache.py)
+            aggregates['fingerprint'] = fingerprint({k: v for k, v in aggregates.items() if k != 'fingerprint'})
+            self.aggregates = aggregates
+            self.version += 1
+            return True
+
+def _watch(store):
+    while True:
+        time.sleep(REFRESH_SECONDS)
+        try:
+            store.refresh()
+        except Exception:
+            logging.exception('refreshing the survey aggregates failed')
+
+@st.cache_resource
+def aggregate_store():
+    store = AggregateStore()
+    threading.Thread(target=_watch, args=(store,), name='aggregate-refresh', daemon=True).start()
+    return store
+
+def check_for_new_rows():
+    # Compares the store's version with the one this session last drew, and
+    # tells the reader when the charts now include newly merged responses
+    store = aggregate_store()
+    seen = st.session_state.get('aggregates_version')
+    if seen is not None and seen != store.version:
+        st.toast(f"New survey responses were added: the charts now show {store.aggregates['rows']:,} respondents")
+    st.session_state['aggregates_version'] = store.version
+
+# Sidebar cross-filters. Each answer of these columns is a packed bitmap over the
+# respondents (see bitmap_index.py), so a selection re-counts every chart from
+# ANDs and popcounts instead of re-reading the survey. The index covers the rows
+# of the survey CSV; rows merged from the deltas directory are not filterable.
+FILTER_COLUMNS = {
+    'County': 'p34_county',
+    'Age range': 'p_agerange',
+    'Gender': 'p41_gender1',
+    'Ethnicity': 'p38_race1',
+    'Community': 'p36_community',
+    'Discipline': 'discipline',
+}
+
+@st.cache_resource
+def get_bitmap_index():
+    # None when only the aggregates file is deployed, which hides the filters
+    try:
+        return BitmapIndex.from_frame(get_survey())
+    except OSError:
+        return None
+
+# Group comparison: any chart of a counted column or multi-select question can
+# be split by one of aggregates.GROUP_COLUMNS. The group x answer tables are
+# precomputed with the aggregates in one crosstab pass per grouping column.
+GROUP_LABELS = {column: label for label, column in FILTER_COLUMNS.items() if column in GROUP_COLUMNS}
+
+def sidebar():
+    with st.sidebar:
+        st.header("Compare groups")
+        st.selectbox("Split charts by", [None, *GROUP_LABELS], key='compare',
+                     format_func=lambda column: "No comparison" if column is None else GROUP_LABELS[column])
+        st.checkbox("Show percentages within each group", key='compare_normalize')
+
+        index = get_bitmap_index()
+        if index is not None:
+            st.header("Filter respondents")
+            for label, column in FILTER_COLUMNS.items():
+                if column in index.bitmaps:
+                    st.multiselect(label, index.values(column), key=f'filter_{column}')
+
+def active_comparison():
+    # (grouping column, normalize) or None
+    group = st.session_state.get('compare')
+    if group is None:
+        return None
+    return group, bool(st.session_state.get('compare_normalize'))
+
+def active_filters():
+    # Sorted (column, values) pairs, usable as a cache key
+    filters = ((column, tuple(sorted(st.session_state.get(f'filter_{column}') or ())))
+               for column in FILTER_COLUMNS.values())
+    return tuple((column, values) for column, values in filters if values)
+
+@st.cache_resource(max_entries=64)
+def filtered_aggregates(base_fingerprint, filters, groups, _base):
+    index = get_bitmap_index()
+    aggregates = index.aggregates(index.select(dict(filters)), like=_base, groups=groups)
+    aggregates['fingerprint'] = fingerprint(base_fingerprint, filters, groups)
+    return aggregates
+
+def get_aggregates():
+    with span('data.aggregates'):
+        aggregates = aggregate_store().aggregates
+        filters = active_filters()
+        if aggregates is None or not filters or get_bitmap_index() is None:
+            return aggregates
+        comparison = active_comparison()
+        groups = (comparison[0],) if comparison else ()
+        return filtered_aggregates(aggregates['fingerprint'], filters, groups, aggregates)
+
+def create_altair_bar_chart(aggregates, category, title, group=None, normalize=False):
+    # imported here so pages without Altair charts start without it (see main.py)
+    import altair as alt
+
+    # duplicated 'p14_carryingdebt' responses are merged by the cleaning stage (cleaning.py)
+    if group is None:
+        data = value_counts(aggregates, category).reset_index()
+        data.columns = ['Response', 'Count']
+    else:
+        # one bar per group within each response
+        data = group_table(aggregates, group, category, normalize)
+    measure = 'Percentage' if group is not None and normalize else 'Count'
+    series = 'Response' if group is None else 'Group'
+
+    chart = alt.Chart(data).mark_bar().encode(
+        x=alt.X(f'{measure}:Q', title=measure),
+        y=alt.Y('Response:N', title=None, sort='-x'),
+        color=alt.Color(f'{series}:N', legend=alt.Legend(title=''), scale=alt.Scale(scheme='tableau20')),
+        tooltip=[alt.Tooltip(f'{column}:N') for column in dict.fromkeys(['Response', series])] + [alt.Tooltip(f'{measure}:Q')]
+    ).properties(
+        width=300,
+        height=300 if group is None else max(300, 12 * len(data)),
+        title=title
+    ).configure_title(
+        anchor='start'
+    )
+    if group is not None:
+        chart = chart.encode(yOffset='Group:N')
+
+    return chart
+
+def show_bar_chart(aggregates, category, title):
+    show_figure(cached_figures(create_altair_bar_chart, aggregates, category, title, *(active_comparison() or ())))
+
+def show_chart(figure, name, title, use_container_width=True):
+    # The chapter's own chart, or the same answers split by the sidebar's comparison
+    # group (a question missing from the survey has no table to split)
+    comparison = active_comparison()
+    aggregates = get_aggregates()
+    tables = aggregates['by_group'].get(comparison[0], {}) if comparison else {}
+    if comparison is None or name == comparison[0] or not any(name in tables.get(section, ()) for section in ('value_counts', 'multiselect')):
+        show_figure(figure, use_container_width)
+    else:
+        show_figure(cached_figures(create_altair_bar_chart, aggregates, name, title, *comparison))
+
+# ?debug=1 adds tables of this rerun's section timings and of the bytes each
+# chart and image sent to the browser (see metrics.py)
+def debug_panel(spans):
+    if st.query_params.get('debug') != '1':
+        return
+    payloads = rerun_payloads()
+    with st.expander("Debug: section timings of this rerun", expanded=True):
+        st.dataframe(pd.DataFrame({
+            'section': ['\u2003' * s.depth + s.name for s in spans],
+            'start ms': [round(s.start * 1000, 1) for s in spans],
+            'wall ms': [round(s.wall * 1000, 1) for s in spans],
+            'cpu ms': [round(s.cpu * 1000, 1) for s in spans],
+            'allocated KiB': [None if s.allocated is None else round(s.allocated / 1024, 1) for s in spans],
+        }), hide_index=True, use_container_width=True)
+        stats = figure_cache().stats()
+        st.caption(f"{registry.reruns} reruns in this process. Figure cache: {stats['entries']} specs, "
+                   f"{stats['bytes'] / 2 ** 20:.1f} MiB, {stats['hits']} hits, {stats['misses']} misses, "
+                   f"{stats['evictions']} evictions. Totals for Prometheus: /app/static/metrics.prom")
+    if not payloads:
+        return
+    # elements this large are kept in Streamlit's message cache
+    threshold = st.get_option('global.minCachedMessageSize')
+    with st.expander("Debug: bytes sent to the browser by this rerun", expanded=True):
+        st.dataframe(pd.DataFrame({
+            'element': [p.label for p in payloads],
+            'type': [p.kind for p in payloads],
+            'KiB': [round(p.bytes / 1024, 2) for p in payloads],
+            'cacheable': [p.bytes >= threshold for p in payloads],
+        }), hide_index=True, use_container_width=True)
+        st.caption(f"{sum(p.bytes for p in payloads) / 1024:.1f} KiB of chart specs and image markup. "
+                   f"Cacheable elements are sent once per browser and then by reference while they are "
+                   f"unchanged; images and map data are files, downloaded separately, and text is not "
+                   f"counted. Specs are {'compacted' if COMPACT_SPECS else 'sent as built (COMPACT_SPECS=0)'}.")
+
+# Chapter artwork is served as pre-resized WebP/JPEG files from static/img (see
+# images.py), so the browser picks a width and caches it instead of receiving the
+# full-resolution JPEG on every run
+QUARTER_WIDTH = '(max-width: 640px) 100vw, 25vw'
+
+@st.cache_resource
+def image_markup(name, sizes, caption):
+    return picture_html(build_derivatives(name), static_url, sizes=sizes, alt=caption or '', caption=caption)
+
+def show_image(name, sizes='100vw', caption=None):
+    markup = image_markup(name, sizes, caption)
+    record_payload(f'image.{name}', 'markdown', len(markup.encode()))
+    st.markdown(markup, unsafe_allow_html=True)
+
+# Static files (chapter artwork, graph node images, map data) have content-hashed
+# names, so pages only carry their URLs. Any ?v= makes Streamlit's static handler
+# send long-lived cache headers, and a new file gets a new name.
+def static_url(path):
+    base = st.get_option('server.baseUrlPath').strip('/')
+    return f"{'/' + base if base else ''}/app/static/{path}?v=1"
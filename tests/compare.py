@@ -0,0 +1,26 @@
+import numpy as np
+
+
+def comparable(aggregates):
+    # The counts of aggregates without the order of their answers, which only
+    # follows the counts and may settle ties differently, e.g. after a merge
+    result = {'rows': aggregates['rows']}
+    result['value_counts'] = {column: dict(zip(entry['labels'], entry['counts']))
+                              for column, entry in aggregates['value_counts'].items()}
+    options = aggregates['employ_impact']['options']
+    result['employ_impact'] = {frozenset(option for i, option in enumerate(options) if region >> i & 1): count
+                               for region, count in enumerate(aggregates['employ_impact']['regions']) if count}
+    result['multiselect'] = {}
+    for name, entry in aggregates['multiselect'].items():
+        options, cooccurrence = entry['options'], np.array(entry['cooccurrence'])
+        result['multiselect'][name] = {(options[i], options[j]): int(cooccurrence[i, j])
+                                       for i in range(len(options)) for j in range(len(options)) if cooccurrence[i, j]}
+    result['by_group'] = {}
+    for group, entry in aggregates['by_group'].items():
+        tables = {'sizes': dict(zip(entry['groups'], entry['sizes']))}
+        for section, key in (('value_counts', 'labels'), ('multiselect', 'options')):
+            for name, table in entry[section].items():
+                tables[section, name] = {(label, answer): count for label, row in zip(entry['groups'], table['counts'])
+                                         for answer, count in zip(table[key], row) if count}
+        result['by_group'][group] = tables
+    return result
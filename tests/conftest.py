@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'bench')]
+
+from generate import write_survey
+
+# The tests run on a small synthetic survey (see bench/generate.py), which has
+# the dashboard's columns and the label variants the cleaning stage merges
+SURVEY_ROWS = 3000
+
+
+@pytest.fixture(scope='session')
+def survey_csv(tmp_path_factory):
+    return write_survey(SURVEY_ROWS, str(tmp_path_factory.mktemp('survey') / 'survey.csv'), seed=1)
+
+
+@pytest.fixture(scope='session')
+def survey(survey_csv, tmp_path_factory):
+    # The cleaned frame the dashboard loads
+    from data_loader import load_survey
+    return load_survey(survey_csv, str(tmp_path_factory.mktemp('cache')))
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from aggregates import (GROUP_COLUMNS, compute_aggregates, employ_impact_regions, fold_label, folded_labels,
+                        group_table)
+from bitmap_index import BitmapIndex
+from data_loader import EMPLOY_IMPACT_COLUMNS, EMPLOY_IMPACT_OPTIONS
+from setops import MAX_SETS, set_totals
+
+
+def crosstab_counts(df, group, column, rare=()):
+    # {(group, answer): count} of the non-zero cells, the answers in rare counted as 'Other'
+    table = pd.crosstab(df[group], df[column].astype(object).map(fold_label(rare)))
+    return {key: int(count) for key, count in table.stack().items() if count}
+
+
+def table_counts(aggregates, group, column):
+    table = group_table(aggregates, group, column)
+    return {(row.Group, row.Response): int(row.Count) for row in table.itertuples() if row.Count}
+
+
+def test_group_tables_match_crosstab(survey):
+    aggregates = compute_aggregates(survey)
+    for group in GROUP_COLUMNS:
+        for column in aggregates['value_counts']:
+            if column in aggregates['by_group'][group]['value_counts']:
+                rare = folded_labels(aggregates, column)
+                assert table_counts(aggregates, group, column) == crosstab_counts(survey, group, column, rare), \
+                    (group, column)
+
+
+def test_filtered_group_tables_match_crosstab(survey):
+    index = BitmapIndex.from_frame(survey)
+    selection = {'p36_community': ['Urban'], 'p_agerange': ['25-34', '35-44']}
+    aggregates = index.aggregates(index.select(selection), groups=('p41_gender1',))
+    rows = np.logical_and.reduce([survey[column].isin(values) for column, values in selection.items()])
+    filtered = survey[rows]
+    for column in aggregates['by_group']['p41_gender1']['value_counts']:
+        rare = folded_labels(aggregates, column)
+        assert table_counts(aggregates, 'p41_gender1', column) == \
+            crosstab_counts(filtered, 'p41_gender1', column, rare), column
+
+
+def test_unknown_employ_impact_answers_count_as_other():
+    # more distinct answers than a region histogram can have sets
+    slots = {column: [None] * (MAX_SETS + 5) for column in EMPLOY_IMPACT_COLUMNS}
+    slots[EMPLOY_IMPACT_COLUMNS[0]] = [f'answer {i}' for i in range(MAX_SETS + 5)]
+    slots[EMPLOY_IMPACT_COLUMNS[1]][:3] = ['furloughed', 'Other', 'Other']
+    entry = employ_impact_regions(pd.DataFrame(slots, dtype='category'))
+    assert set(entry['options']) <= set(EMPLOY_IMPACT_OPTIONS)
+    totals = dict(zip(entry['options'], set_totals(entry['regions'])))
+    assert totals == {'Other': MAX_SETS + 5, 'furloughed': 1}
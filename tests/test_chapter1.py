@@ -0,0 +1,11 @@
+from aggregates import compute_aggregates, value_counts
+from chapter1 import demographic_figures
+
+
+def test_demographic_pies_pair_labels_with_their_counts(survey):
+    aggregates = compute_aggregates(survey)
+    figures = demographic_figures(aggregates)
+    for key, column in [('ethnicity', 'p38_race1'), ('gender', 'p41_gender1')]:
+        pie = figures[key].data[0]
+        assert dict(zip(pie.labels, pie.values)) == value_counts(aggregates, column).to_dict()
+    assert {'No answer', 'Twospirit'} <= set(figures['gender'].data[0].labels)
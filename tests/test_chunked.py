@@ -0,0 +1,20 @@
+import pandas as pd
+import pytest
+
+from aggregates import compute_aggregates
+from chunked import aggregate_chunks
+from compare import comparable
+
+
+@pytest.mark.parametrize('chunk_rows', [700, 3000])
+def test_chunks_match_in_memory(survey, survey_csv, tmp_path, chunk_rows):
+    chunked = aggregate_chunks(survey_csv, chunk_rows, spill_dir=str(tmp_path))
+    assert comparable(chunked) == comparable(compute_aggregates(survey))
+    # the spilled chunks are removed
+    assert not list(tmp_path.iterdir())
+
+
+def test_parquet_chunks_match_in_memory(survey, survey_csv, tmp_path):
+    path = str(tmp_path / 'survey.parquet')
+    pd.read_csv(survey_csv, dtype=str).to_parquet(path, row_group_size=1000)
+    assert comparable(aggregate_chunks(path, 1000, spill_dir=str(tmp_path))) == comparable(compute_aggregates(survey))
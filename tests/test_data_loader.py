@@ -0,0 +1,25 @@
+import pandas as pd
+import pytest
+
+from data_loader import ReadOnlySeries, freeze_frame
+
+
+def test_frozen_columns_reject_writes(survey):
+    frame = freeze_frame(survey)
+    with pytest.raises(TypeError):
+        frame['p36_community'] = None
+    with pytest.raises(TypeError):
+        frame['p36_community'].fillna('Urban', inplace=True)
+    with pytest.raises(ValueError):
+        frame['p36_community'].cat.codes.to_numpy()[0] = 0
+    assert type(frame['p36_community']) is ReadOnlySeries
+
+
+def test_derived_results_are_plain(survey):
+    frame = freeze_frame(survey)
+    for result in [frame.nunique(), frame.iloc[0], frame.dtypes, frame['p36_community'].value_counts(),
+                   frame[frame['p36_community'] == 'Urban']['p_agerange']]:
+        assert type(result) is pd.Series
+    counts = frame.nunique()
+    counts.iloc[0] = 0
+    assert counts.iloc[0] == 0
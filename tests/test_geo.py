@@ -0,0 +1,51 @@
+import os
+
+import pandas as pd
+
+from aggregates import compute_aggregates, value_counts
+from geo import (GAZETTEER_PATH, GazetteerGeocoder, GeocodeCache, county_key, county_locations, geocode_query,
+                 load_gazetteer)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GAZETTEER = load_gazetteer(os.path.join(ROOT, GAZETTEER_PATH))
+
+
+def test_gazetteer_has_every_county():
+    assert len(GAZETTEER) == 62 and GAZETTEER.index.is_unique and GAZETTEER['fips'].is_unique
+    assert GAZETTEER['fips'].str.fullmatch(r'36\d{3}').all()
+    assert GAZETTEER['latitude'].between(40.4, 45.1).all() and GAZETTEER['longitude'].between(-79.8, -71.8).all()
+
+
+def test_county_key_spellings():
+    assert {county_key(name) for name in ['Kings County ', 'kings county, NY', 'Kings']} == {'kings'}
+    assert county_key('Saint Lawrence County') == county_key('St Lawrence') == 'st. lawrence'
+
+
+def test_counties_join_by_key(tmp_path):
+    counts = pd.Series({'Kings County': 5, 'kings county, NY': 2, 'Saint Lawrence County': 3, 'Atlantis County': 4})
+    locations = county_locations(counts, GAZETTEER, GeocodeCache(str(tmp_path / 'geocode.json'))).set_index('county')
+    # each county has its own row of the gazetteer, whatever else is in the data
+    gazetteer = GAZETTEER.set_index('county')
+    assert locations['count'].to_dict() == {'Kings': 7, 'St. Lawrence': 3}
+    assert locations[['fips', 'latitude', 'longitude']].equals(gazetteer.loc[locations.index, ['fips', 'latitude', 'longitude']])
+
+
+def test_survey_counties_all_found(survey, tmp_path):
+    # the county counts the Chapter 1 map draws
+    counts = value_counts(compute_aggregates(survey), 'p34_county')
+    locations = county_locations(counts, GAZETTEER, GeocodeCache(str(tmp_path / 'geocode.json')))
+    assert locations['count'].sum() == counts.sum()
+
+
+def test_geocode_cache_looks_up_missing_queries_once(tmp_path):
+    path = str(tmp_path / 'geocode.json')
+    queries = [geocode_query('Kings County'), geocode_query('Atlantis')]
+    results = GeocodeCache(path).geocode_many(queries, GazetteerGeocoder(GAZETTEER), min_delay_seconds=0)
+    kings = GAZETTEER.loc['kings']
+    assert results[queries[0]] == (kings['latitude'], kings['longitude']) and results[queries[1]] is None
+
+    class Offline:
+        def geocode(self, query):
+            raise AssertionError(f'{query} was not cached')
+    cached = GeocodeCache(path)
+    assert cached.geocode_many(queries, Offline()) == results
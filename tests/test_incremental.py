@@ -0,0 +1,43 @@
+from aggregates import aggregate_file, value_counts
+from compare import comparable
+from generate import generate_survey
+from incremental import refresh_aggregates
+
+# Large enough that several languages are rare in each wave but not in the whole survey
+ROWS = 6000
+
+
+def test_merged_waves_match_full_rebuild(tmp_path):
+    survey = generate_survey(ROWS, seed=2)
+    survey.to_csv(tmp_path / 'survey.csv', index=False)
+    waves = [survey[:2000], survey[2000:4000], survey[4000:]]
+    waves[0].to_csv(tmp_path / 'wave1.csv', index=False)
+    (tmp_path / 'deltas').mkdir()
+    for i, wave in enumerate(waves[1:], 2):
+        wave.to_csv(tmp_path / 'deltas' / f'wave{i}.csv', index=False)
+
+    merged, added = refresh_aggregates(None, str(tmp_path / 'wave1.csv'), str(tmp_path / 'deltas'))
+    full = aggregate_file(str(tmp_path / 'survey.csv'))
+    assert merged['rows'] == ROWS
+    assert comparable(merged) == comparable(full)
+    # answers rare in the first wave alone are shown once the whole survey has enough of them
+    languages = value_counts(merged, 'p40_language')
+    assert languages.to_dict() == value_counts(full, 'p40_language').to_dict()
+    assert value_counts(aggregate_file(str(tmp_path / 'wave1.csv')), 'p40_language').size < languages.size
+
+
+def test_merged_wave_keeps_the_stored_spelling(tmp_path):
+    survey = generate_survey(4000, seed=3)
+    survey[:2000].to_csv(tmp_path / 'wave1.csv', index=False)
+    # a wave whose respondents mostly wrote their language in lower case
+    wave = survey[2000:].copy()
+    wave['p40_language'] = wave['p40_language'].str.lower()
+    (tmp_path / 'deltas').mkdir()
+    wave.to_csv(tmp_path / 'deltas' / 'wave2.csv', index=False)
+
+    merged, _ = refresh_aggregates(None, str(tmp_path / 'wave1.csv'), str(tmp_path / 'deltas'))
+    labels = merged['value_counts']['p40_language']['labels']
+    assert 'English' in labels and 'english' not in labels
+    assert len({label.casefold() for label in labels}) == len(labels)
+    english = survey['p40_language'].str.casefold().eq('english').sum()
+    assert value_counts(merged, 'p40_language')['English'] == english
@@ -0,0 +1,35 @@
+import os
+
+from figure_cache import FigureCache, FigureSpec, static_files, touch_files
+from maps import MAX_FILES, publish
+
+
+def test_reused_files_outlive_newer_ones(tmp_path):
+    maps_dir = str(tmp_path)
+    hot = publish(b'{"hot":1}', 'json', maps_dir)
+    for i in range(MAX_FILES + 10):
+        publish(f'{{"filtered":{i}}}'.encode(), 'json', maps_dir)
+        # the unfiltered map, drawn again between filtered views
+        if i % 100 == 0:
+            assert publish(b'{"hot":1}', 'json', maps_dir) == hot
+    assert os.path.exists(os.path.join(maps_dir, hot))
+    assert len(os.listdir(maps_dir)) == MAX_FILES
+
+
+def test_cached_specs_of_deleted_files_are_rebuilt(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    published = []
+
+    def build():
+        published.append(publish(b'[1,2,3]', 'json'))
+        spec = f'{{"data":"/app/static/maps/{published[-1]}?v=1"}}'
+        return FigureSpec('deck', spec, 'test', static_files(spec))
+
+    cache = FigureCache()
+    cache.get_or_build('key', build, touch_files)
+    cache.get_or_build('key', build, touch_files)
+    assert len(published) == 1
+    # e.g. pruned by another server process
+    os.remove(os.path.join('static', 'maps', published[0]))
+    cache.get_or_build('key', build, touch_files)
+    assert len(published) == 2 and os.path.exists(os.path.join('static', 'maps', published[0]))
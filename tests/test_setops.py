@@ -0,0 +1,34 @@
+import numpy as np
+
+from aggregates import VENN_SETS, compute_aggregates, venn_regions
+from data_loader import EMPLOY_IMPACT_COLUMNS
+from setops import intersection_sizes, set_totals, upset_table
+
+
+def memberships(survey, sets):
+    # One boolean column per set: the respondent picked it in any slot
+    slots = survey[EMPLOY_IMPACT_COLUMNS].astype(object).to_numpy()
+    return np.stack([(slots == option).any(axis=1) for option in sets], axis=1)
+
+
+def test_venn_regions_match_raw_answers(survey):
+    aggregates = compute_aggregates(survey)
+    for sets in VENN_SETS.values():
+        member = memberships(survey, sets)
+        expected = np.bincount(member @ (1 << np.arange(len(sets))), minlength=1 << len(sets))
+        regions = venn_regions(aggregates, sets)
+        assert regions.tolist() == expected.tolist(), sets
+        assert set_totals(regions).tolist() == member.sum(axis=0).tolist()
+        # respondents in at least the sets of each region
+        assert intersection_sizes(regions)[-1] == member.all(axis=1).sum()
+
+
+def test_upset_rows_match_raw_answers(survey):
+    aggregates = compute_aggregates(survey)
+    options = aggregates['employ_impact']['options']
+    member = memberships(survey, options)
+    table = upset_table(np.array(aggregates['employ_impact']['regions']), options)
+    for sets, count in zip(table['sets'], table['count']):
+        exact = (member == np.isin(options, sets)).all(axis=1)
+        assert exact.sum() == count, sets
+    assert table['count'].sum() == member.any(axis=1).sum()
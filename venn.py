@@ -0,0 +1,26 @@
+import io
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib_venn import venn3
+
+# Same output st.pyplot() produced for the Chapter 3 panels
+FIGSIZE = (6.4, 4.8)
+DPI = 200
+
+
+def render_venn3(subsets, set_labels, set_colors, alpha=0.5, text_color='white', fmt='png'):
+    # Draws on a Figure of its own with the Agg canvas, never through pyplot or
+    # rcParams, so concurrent sessions cannot pick up each other's figures or
+    # styling. Returns PNG or SVG bytes.
+    figure = Figure(figsize=FIGSIZE)
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+    diagram = venn3(subsets=subsets, set_labels=set_labels, set_colors=set_colors, alpha=alpha, ax=ax)
+    for label in diagram.set_labels + diagram.subset_labels:
+        if label is not None:
+            label.set_color(text_color)
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format=fmt, dpi=DPI, bbox_inches='tight', transparent=True)
+    return buffer.getvalue()